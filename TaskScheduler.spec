@@ -12,14 +12,20 @@ from PyInstaller.utils.hooks import collect_submodules, collect_data_files
 block_cipher = None
 
 # Hidden imports required for the application
+# Modules loaded through lazy_import() are only named as strings, so list them here
 hiddenimports = [
     'customtkinter',
+    'tkinter.filedialog',
+    'tkinter.messagebox',
     'apscheduler',
+    'apscheduler.events',
     'apscheduler.schedulers',
     'apscheduler.schedulers.background',
     'apscheduler.triggers',
     'apscheduler.triggers.interval',
     'psutil',
+    'job_store',
+    'async_executor',
     'json',
     'subprocess',
     'threading',
@@ -0,0 +1,177 @@
+"""
+App Logging
+Structured, leveled logging with a non-blocking queue handler
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+
+ROOT_LOGGER = "scheduler"
+
+# Log formats
+LOG_FORMAT_TEXT = "text"   # Human-readable lines in scheduler.log
+LOG_FORMAT_JSON = "json"   # One JSON object per line in scheduler.jsonl
+LOG_FORMATS = (LOG_FORMAT_TEXT, LOG_FORMAT_JSON)
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# Nothing is written until setup_logging() runs (no stderr fallback - the frozen build has no console)
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+_listener = None
+
+
+def get_logger(name):
+    """Get a logger under the scheduler namespace (e.g. get_logger("executor"))"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _extra_fields(record):
+    """User-supplied fields passed with extra={...}"""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class TextFormatter(logging.Formatter):
+    """Plain lines with extra fields appended as key=value"""
+    
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-8s [%(threadName)s] %(name)s: %(message)s")
+    
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record - extra fields become top-level keys"""
+    
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps records structured
+    
+    The stock handler formats the whole line on the calling thread; here only the
+    message arguments are merged (so mutable args can't change later) and the
+    formatting and file I/O happen on the listener thread.
+    """
+    
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def logging_options(config):
+    """Read logging settings from config.json
+    Returns: dict of keyword arguments for setup_logging"""
+    options = {
+        "level": str(config.get("log_level", DEFAULT_LEVEL)).upper(),
+        "log_format": config.get("log_format", LOG_FORMAT_TEXT),
+        "console": bool(config.get("log_console", False)),
+    }
+    try:
+        options["max_bytes"] = int(config.get("log_max_bytes", DEFAULT_MAX_BYTES))
+        options["backup_count"] = int(config.get("log_backup_count", DEFAULT_BACKUP_COUNT))
+    except (TypeError, ValueError):
+        options["max_bytes"] = DEFAULT_MAX_BYTES
+        options["backup_count"] = DEFAULT_BACKUP_COUNT
+    return options
+
+
+def setup_logging(log_dir, level=DEFAULT_LEVEL, log_format=LOG_FORMAT_TEXT, max_bytes=DEFAULT_MAX_BYTES,
+                  backup_count=DEFAULT_BACKUP_COUNT, console=False):
+    """Route scheduler logs through a background thread into a rotating file
+    
+    Callers only put records on an in-memory queue; a QueueListener thread does
+    the formatting and writes. Calling it again replaces the previous setup.
+    Returns: path of the log file
+    """
+    shutdown_logging()
+    
+    if log_format not in LOG_FORMATS:
+        log_format = LOG_FORMAT_TEXT
+    formatter = JsonLinesFormatter() if log_format == LOG_FORMAT_JSON else TextFormatter()
+    
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, "scheduler.jsonl" if log_format == LOG_FORMAT_JSON else "scheduler.log")
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    
+    # Windowed (frozen) builds have no stderr
+    if console and sys.stderr is not None:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [_QueueHandler(log_queue)]
+    root.propagate = False
+    set_level(level)
+    
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    return log_file
+
+
+def set_level(level):
+    """Change the level at runtime - calls below it return after a cached level check"""
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    logging.getLogger(ROOT_LOGGER).setLevel(level)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    logging.getLogger(ROOT_LOGGER).handlers = [logging.NullHandler()]
+    listener.stop()
+    for handler in listener.handlers:
+        try:
+            handler.close()
+        except Exception:
+            pass
+
+
+atexit.register(shutdown_logging)
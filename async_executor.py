@@ -0,0 +1,226 @@
+"""
+Async Executor
+asyncio execution backend - one event-loop thread spawns and supervises every run
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from app_logging import get_logger
+from output_streams import LineDecoder, READ_CHUNK, DRAIN_TIMEOUT, STREAM_STDOUT, STREAM_STDERR
+
+log = get_logger("async_executor")
+
+KILL_GRACE = 2.0  # Seconds from terminate to kill when a run is cancelled
+
+
+def _use_pidfd_watcher(loop):
+    """Before Python 3.12 asyncio waits for each child on a thread of its own (ThreadedChildWatcher)
+    - where Linux has pidfds, wait on them from the loop instead so idle runs cost no thread"""
+    if os.name != "posix" or sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            watcher = asyncio.PidfdChildWatcher()
+            watcher.attach_loop(loop)
+            asyncio.set_child_watcher(watcher)
+    except (AttributeError, NotImplementedError, OSError) as e:
+        log.debug("pidfd child watcher not available: %s", e)
+
+
+class AsyncProcess:
+    """Popen-like handle for a run on the AsyncRunner
+    
+    Has what the executor needs from a Popen (pid, returncode, poll, wait,
+    terminate, kill) and can be used from any thread.
+    """
+    
+    def __init__(self, runner, proc, args):
+        self.args = args
+        self.pid = proc.pid
+        self.returncode = None
+        self._runner = runner
+        self._proc = proc
+        self._done = threading.Event()
+        self._task = None  # The supervising coroutine
+    
+    def poll(self):
+        return self.returncode
+    
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        return self.returncode
+    
+    def terminate(self):
+        self._runner.call_soon(self._signal, "terminate")
+    
+    def kill(self):
+        self._runner.call_soon(self._signal, "kill")
+    
+    def cancel(self, reason="cancelled"):
+        """Stop the run: terminate, kill after KILL_GRACE, then finish as usual (on_exit still runs)"""
+        self.kill_reason = reason
+        self._runner.call_soon(lambda: self._task.cancel() if self._task else None)
+    
+    def _signal(self, method):
+        if self._proc.returncode is None:
+            try:
+                getattr(self._proc, method)()
+            except ProcessLookupError:
+                pass
+
+
+class AsyncRunner:
+    """Spawns and supervises child processes on one asyncio event loop
+    
+    Every run is a coroutine on the loop's thread: StreamReaders pass on its
+    stdout and stderr as blocks of whole lines, it waits for the exit, and it
+    enforces the run's timeout and handles cancellation. A run that is waiting
+    costs no thread, so one loop supervises thousands of children. on_exit
+    callbacks run in order on a single helper thread, so slow completion
+    handling never stalls the loop.
+    """
+    
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-callbacks")
+        self.running = 0  # Runs being supervised (loop thread only)
+    
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                _use_pidfd_watcher(loop)
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(loop, ready), name="asyncio-executor", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+    
+    def _run(self, loop, ready):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+    
+    def call_soon(self, callback, *args):
+        """Run callback on the loop thread"""
+        self._ensure_loop().call_soon_threadsafe(callback, *args)
+    
+    def spawn(self, exe_path, cwd=None, capture=True, **popen_kwargs):
+        """Start exe_path from the loop and wait until it has started (raises OSError like Popen)
+        capture pipes stdout and stderr (stdin closed); without it the child keeps the app's.
+        Returns: AsyncProcess - call supervise() once the caller has registered it"""
+        loop = self._ensure_loop()
+        pipe = asyncio.subprocess.PIPE if capture else None
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.create_subprocess_exec(
+                exe_path,
+                stdout=pipe,
+                stderr=pipe,
+                stdin=asyncio.subprocess.DEVNULL if capture else None,
+                cwd=cwd,
+                **popen_kwargs
+            ),
+            loop
+        )
+        return AsyncProcess(self, future.result(), exe_path)
+    
+    def supervise(self, process, on_output=None, on_exit=None, timeout=None, on_timeout=None, encoding=None):
+        """Follow a spawned run until it has exited and its output is drained
+        on_output(text, stream) gets blocks of whole lines on the loop thread - keep it short.
+        on_exit() runs on the callback thread when the run is over.
+        After timeout seconds on_timeout() runs on a worker thread to stop the run
+        (without one the runner terminates the process itself)."""
+        def start():
+            process._task = self._loop.create_task(
+                self._supervise(process, on_output, on_exit, timeout, on_timeout, encoding)
+            )
+        self.call_soon(start)
+    
+    async def _supervise(self, process, on_output, on_exit, timeout, on_timeout, encoding):
+        proc = process._proc
+        loop = asyncio.get_running_loop()
+        self.running += 1
+        pumps = [
+            loop.create_task(self._pump(reader, stream, on_output, encoding))
+            for reader, stream in ((proc.stdout, STREAM_STDOUT), (proc.stderr, STREAM_STDERR))
+            if reader is not None
+        ]
+        try:
+            try:
+                await asyncio.wait_for(asyncio.shield(proc.wait()), timeout)
+            except asyncio.TimeoutError:
+                log.warning("PID %s hit its timeout (%ss)", proc.pid, timeout)
+                process.kill_reason = "timeout"
+                if on_timeout:
+                    loop.run_in_executor(None, on_timeout)  # May block (process tree kill) - not on the loop
+                else:
+                    await self._stop(proc)
+                await proc.wait()
+            if pumps:
+                # A child that outlives the run may keep a pipe open
+                await asyncio.wait(pumps, timeout=DRAIN_TIMEOUT)
+        except asyncio.CancelledError:
+            await self._stop(proc)
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            process.returncode = proc.returncode
+            process._done.set()
+            self.running -= 1
+            if on_exit:
+                self._callbacks.submit(self._call, on_exit)
+    
+    async def _pump(self, reader, stream, on_output, encoding):
+        """Pass on a pipe's output until EOF"""
+        lines = LineDecoder(encoding)
+        while True:
+            data = await reader.read(READ_CHUNK)
+            text = lines.feed(data, final=not data)
+            if text and on_output:
+                try:
+                    on_output(text, stream)
+                except Exception:
+                    log.exception("Error in output callback")
+            if not data:
+                return
+    
+    async def _stop(self, proc):
+        """terminate, then kill if the process is still there after KILL_GRACE"""
+        if proc.returncode is not None:
+            return
+        try:
+            proc.terminate()
+            await asyncio.wait_for(proc.wait(), KILL_GRACE)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+    
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception:
+            log.exception("Error in run exit callback")
+    
+    def shutdown(self):
+        """Stop the loop - runs still going are left alone, like the threaded backend's daemon threads"""
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+        self._callbacks.shutdown(wait=False)
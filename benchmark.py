@@ -0,0 +1,416 @@
+"""
+Scheduler Benchmark
+Headless throughput/latency benchmark for TaskManager and ProcessExecutor
+
+Usage:
+    python benchmark.py                       # 10, 100 and 1000 tasks, compare with baseline
+    python benchmark.py --scales 10 100       # Pick the scales
+    python benchmark.py --save-baseline       # Store this run as the new baseline
+    python benchmark.py --backend both        # Threaded and asyncio executor side by side
+    python benchmark.py --archive 200         # Log archive: compression ratio and throughput on 200 MB of output
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+
+BASELINE_FILE = "benchmark_baseline.json"
+DEFAULT_SCALES = (10, 100, 1000)
+BACKENDS = ("threads", "asyncio")  # index.EXECUTOR_BACKENDS - not imported here so --child stays light
+
+# Synthetic workload mix: (kind, tasks per 10)
+WORKLOAD_MIX = (
+    ("chatty", 4),   # Prints many lines quickly
+    ("silent", 2),   # Sleeps without output
+    ("fast", 3),     # Exits immediately
+    ("memory", 1),   # Allocates memory, then exits
+)
+
+ARCHIVE_RUN_MB = 2  # Output per synthetic run in the archive benchmark
+ARCHIVE_LEVELS = (1, 6, 9)
+
+CHATTY_LINES = 200
+SILENT_SECONDS = 0.5
+MEMORY_MB = 50
+
+# Metrics compared against the baseline: (key, higher is better)
+COMPARED_METRICS = (
+    ("launches_per_s", True),
+    ("e2e_p50_ms", False),
+    ("e2e_p95_ms", False),
+    ("log_lines_per_s", True),
+    ("persist_p95_ms", False),
+    ("peak_threads", False),
+    ("peak_rss_mb", False),
+)
+
+
+def run_child(kind):
+    """Body of a synthetic task (runs in the child process)"""
+    if kind == "chatty":
+        for i in range(CHATTY_LINES):
+            print(f"line {i} " + "x" * 60, flush=(i == 0))
+    elif kind == "silent":
+        time.sleep(SILENT_SECONDS)
+    elif kind == "memory":
+        block = bytearray(MEMORY_MB * 1024 * 1024)
+        for i in range(0, len(block), 4096):
+            block[i] = 1
+        print(f"allocated {MEMORY_MB} MB", flush=True)
+
+
+def write_task_scripts(directory):
+    """Create one launcher script per workload kind
+    Returns: {kind: script path}"""
+    scripts = {}
+    this_file = os.path.abspath(__file__)
+    for kind, _ in WORKLOAD_MIX:
+        if os.name == "nt":
+            path = os.path.join(directory, f"{kind}.cmd")
+            content = f'@"{sys.executable}" "{this_file}" --child {kind}\r\n'
+        else:
+            path = os.path.join(directory, f"{kind}.sh")
+            content = f'#!/bin/sh\nexec "{sys.executable}" "{this_file}" --child {kind}\n'
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(path, 0o755)
+        scripts[kind] = path
+    return scripts
+
+
+def workload_kinds(count):
+    """Assign a workload kind to each of `count` tasks, interleaved by the mix"""
+    pattern = []
+    for position in range(max(share for _, share in WORKLOAD_MIX)):
+        pattern.extend(kind for kind, share in WORKLOAD_MIX if position < share)
+    return [pattern[i % len(pattern)] for i in range(count)]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class ResourceSampler:
+    """Samples thread count and RSS of this process in the background"""
+    
+    def __init__(self, interval=0.01):
+        import psutil
+        self._error = psutil.Error
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._process = psutil.Process()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            try:
+                self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+            except self._error:
+                pass
+            self._stop.wait(self.interval)
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def run_scale(count, work_dir, max_concurrent, backend=BACKENDS[0]):
+    """Drive TaskManager and ProcessExecutor (on the given executor backend) with `count` synthetic tasks"""
+    from index import TaskManager, ProcessExecutor, OVERLAP_PARALLEL
+    from tracing import LaunchTracer, STAGE_FIRST_OUTPUT, STAGE_SPAWN
+    
+    scripts = write_task_scripts(work_dir)
+    task_manager = TaskManager(
+        filename=os.path.join(work_dir, "tasks.json"),
+        config_filename=os.path.join(work_dir, "config.json")
+    )
+    
+    # Persist latency - add_task saves on every call, so this also covers growth
+    for i, kind in enumerate(workload_kinds(count)):
+        task_manager.add_task(f"{kind}-{i}", scripts[kind], 60)
+    persist_ms = []
+    for _ in range(20):
+        started = time.perf_counter()
+        task_manager.save_tasks()
+        persist_ms.append((time.perf_counter() - started) * 1000)
+    
+    executor = ProcessExecutor()
+    executor.set_backend(backend)
+    tracer = LaunchTracer(history=count)
+    slots = threading.BoundedSemaphore(max_concurrent)
+    done = threading.Event()
+    state = {"lines": 0, "finished": 0, "failed": 0}
+    lock = threading.Lock()
+    e2e_ms = []
+    
+    def record_finished(failed):
+        with lock:
+            state["finished"] += 1
+            state["failed"] += int(failed)
+            if state["finished"] == count:
+                done.set()
+        slots.release()
+    
+    def make_callbacks(trace):
+        def on_output(text, stream=None):
+            with lock:
+                state["lines"] += text.count("\n")
+        
+        def on_completion(returncode=None):
+            trace.finish("no_output")
+            record_finished(returncode not in (0, None))
+        
+        return on_output, on_completion
+    
+    with ResourceSampler() as sampler:
+        started = time.perf_counter()
+        launched = 0
+        for task in task_manager.tasks:
+            slots.acquire()
+            trace = tracer.start(task["id"], task["name"], "benchmark")
+            # Tasks share a few scripts - give each task its own slot instead of per-path dedup
+            decision, slot = executor.admit(task["path"], task_id=task["id"], overlap_policy=OVERLAP_PARALLEL)
+            if slot is None:
+                trace.finish(decision)
+                record_finished(True)
+                continue
+            
+            on_output, on_completion = make_callbacks(trace)
+            result = executor.execute(
+                task["path"], on_output, needs_logging=True,
+                completion_callback=on_completion, task_id=task["id"], slot=slot, trace=trace
+            )
+            if result is None:
+                on_completion(-1)
+            else:
+                launched += 1
+        launch_elapsed = time.perf_counter() - started
+        
+        done.wait(timeout=max(60, count))
+        total_elapsed = time.perf_counter() - started
+    if executor.async_runner:
+        executor.async_runner.shutdown()
+    
+    for trace in tracer.recent:
+        checkpoints = dict(trace.checkpoints)
+        end = checkpoints.get(STAGE_FIRST_OUTPUT, checkpoints.get(STAGE_SPAWN))
+        if end is not None:
+            e2e_ms.append((end - trace.origin) * 1000)
+    
+    return {
+        "tasks": count,
+        "backend": backend,
+        "launched": launched,
+        "failed": state["failed"],
+        "launches_per_s": round(launched / launch_elapsed, 1) if launch_elapsed else 0.0,
+        "e2e_p50_ms": round(percentile(e2e_ms, 50), 2),
+        "e2e_p95_ms": round(percentile(e2e_ms, 95), 2),
+        "e2e_p99_ms": round(percentile(e2e_ms, 99), 2),
+        "log_lines_per_s": round(state["lines"] / total_elapsed, 1),
+        "persist_p50_ms": round(percentile(persist_ms, 50), 2),
+        "persist_p95_ms": round(percentile(persist_ms, 95), 2),
+        "peak_threads": sampler.peak_threads,
+        "peak_rss_mb": round(sampler.peak_rss / (1024 * 1024), 1),
+        "elapsed_s": round(total_elapsed, 2),
+    }
+
+
+def baseline_key(result):
+    """"1000" for the threaded backend (as in older baselines), "1000/asyncio" for the others"""
+    backend = result.get("backend", BACKENDS[0])
+    return str(result["tasks"]) if backend == BACKENDS[0] else f"{result['tasks']}/{backend}"
+
+
+def compare(results, baseline, tolerance):
+    """Compare results with the baseline
+    Returns: list of regression messages"""
+    regressions = []
+    for result in results:
+        base = baseline.get(baseline_key(result))
+        if not base:
+            continue
+        for key, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(key), result.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{baseline_key(result)} tasks: {key} {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def print_table(results):
+    columns = ["tasks", "backend", "launches_per_s", "e2e_p50_ms", "e2e_p95_ms", "e2e_p99_ms", "log_lines_per_s",
+               "persist_p95_ms", "peak_threads", "peak_rss_mb", "failed"]
+    widths = [max(len(c), 8) for c in columns]
+    print("  ".join(c.rjust(w) for c, w in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[c]).rjust(w) for c, w in zip(columns, widths)))
+
+
+def synthetic_log(run, size):
+    """About `size` characters of typical job output: timestamps, paths, counters, a few warnings"""
+    import random
+    rng = random.Random(run)
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        i += 1
+        kind = rng.random()
+        if kind < 0.05:
+            line = f"2024-05-{run % 28 + 1:02d} 10:{i // 60 % 60:02d}:{i % 60:02d} WARNING retrying request {rng.randrange(10**6)} after timeout\n"
+        elif kind < 0.5:
+            line = f"2024-05-{run % 28 + 1:02d} 10:{i // 60 % 60:02d}:{i % 60:02d} INFO converted \\\\server\\scans\\batch{run}\\page_{i:06d}.tif -> page_{i:06d}.pdf ({rng.randrange(20, 900)} KB)\n"
+        else:
+            line = f"progress {i} / {rng.randrange(10**5)} items, {rng.random() * 100:.1f}% done, rate {rng.randrange(1, 500)}/s\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+
+def run_archive_benchmark(total_mb, work_dir):
+    """Write `total_mb` of synthetic run output into a LogArchive per compression level
+    Returns: [{level, raw_mb, stored_mb, ratio, write_mb_per_s, read_mb_per_s, random_read_ms}]"""
+    import random
+    from log_archive import LogArchive
+    
+    runs = max(1, int(total_mb // ARCHIVE_RUN_MB))
+    logs = [synthetic_log(run, ARCHIVE_RUN_MB * 1024 * 1024) for run in range(runs)]
+    results = []
+    for level in ARCHIVE_LEVELS:
+        archive = LogArchive(os.path.join(work_dir, f"level{level}"), level=level)
+        raw = stored = 0
+        started = time.perf_counter()
+        for run, text in enumerate(logs):
+            info = {"run_id": run + 1, "task_id": run % 10, "task_name": f"task{run % 10}", "started": time.time()}
+            run_raw, run_stored = archive.write_run(info, [text[i:i + 65536] for i in range(0, len(text), 65536)])
+            raw += run_raw
+            stored += run_stored
+        write_elapsed = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        for run in range(runs):
+            for _ in archive.read_run(run + 1):
+                pass
+        read_elapsed = time.perf_counter() - started
+        
+        # Random access - one run out of the whole archive
+        samples = []
+        for run_id in random.Random(0).choices(range(1, runs + 1), k=20):
+            started = time.perf_counter()
+            for _ in archive.read_run(run_id):
+                pass
+            samples.append((time.perf_counter() - started) * 1000)
+        
+        results.append({
+            "level": level,
+            "raw_mb": raw / 1024 / 1024,
+            "stored_mb": stored / 1024 / 1024,
+            "ratio": raw / stored if stored else 0.0,
+            "write_mb_per_s": raw / 1024 / 1024 / write_elapsed,
+            "read_mb_per_s": raw / 1024 / 1024 / read_elapsed,
+            "random_read_ms": percentile(samples, 50),
+        })
+    return results
+
+
+def print_archive_table(results):
+    header = f"{'level':>5} {'raw MB':>8} {'stored MB':>10} {'ratio':>7} {'write MB/s':>11} {'read MB/s':>10} {'run read ms':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['level']:>5} {r['raw_mb']:>8.1f} {r['stored_mb']:>10.1f} {r['ratio']:>6.1f}x "
+              f"{r['write_mb_per_s']:>11.1f} {r['read_mb_per_s']:>10.1f} {r['random_read_ms']:>12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scheduler throughput benchmark")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES), help="Task counts to run")
+    parser.add_argument("--max-concurrent", type=int, default=64, help="Processes running at once")
+    parser.add_argument("--backend", choices=BACKENDS + ("both",), default=BACKENDS[0], help="Executor backend")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression (0.25 = 25%%)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--archive", type=float, metavar="MB", help="Benchmark the log archive with this much output instead")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.child:
+        run_child(args.child)
+        return 0
+    
+    if args.archive:
+        work_dir = tempfile.mkdtemp(prefix="scheduler-bench-archive-")
+        try:
+            print(f"Archiving {args.archive:g} MB of run output...", flush=True)
+            results = run_archive_benchmark(args.archive, work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        print()
+        print_archive_table(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=4)
+        return 0
+    
+    backends = BACKENDS if args.backend == "both" else (args.backend,)
+    results = []
+    for count in args.scales:
+        for backend in backends:
+            work_dir = tempfile.mkdtemp(prefix=f"scheduler-bench-{count}-")
+            try:
+                print(f"Running {count} tasks ({backend})...", flush=True)
+                results.append(run_scale(count, work_dir, args.max_concurrent, backend))
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    
+    print()
+    print_table(results)
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({baseline_key(r): r for r in results}, f, indent=4)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} - run with --save-baseline to create one")
+        return 0
+    
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,596 @@
+"""
+Cluster
+Coordinator/worker mode - worker agents on other PCs pull task runs over TCP
+
+Usage (on each worker PC):
+    python cluster.py --coordinator 192.168.1.10 --port 8765 --token SECRET --slots 4
+"""
+
+import argparse
+import hmac
+import itertools
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from app_logging import get_logger
+
+log = get_logger("cluster")
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 8765
+LEASE_SECONDS = 15.0     # A run goes back to the queue if its worker is silent this long
+HEARTBEAT_SECONDS = 3.0  # Workers renew their leases at this interval
+MAX_ATTEMPTS = 3         # Placements per run before it is reported as lost
+UNSENT_OUTPUT = 1000     # Output messages a worker keeps per run while the coordinator is unreachable
+
+# Run states
+RUN_PENDING = "pending"
+RUN_LEASED = "leased"
+RUN_DONE = "done"
+RUN_LOST = "lost"
+RUN_CANCELLED = "cancelled"
+
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def send_message(wfile, message):
+    """Write one newline-delimited JSON message"""
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+def read_message(rfile):
+    """Read one message
+    Returns: dict, or None when the connection closed"""
+    line = rfile.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class RemoteRun:
+    """One run of a task, queued on the coordinator until a worker finishes it"""
+    
+    __slots__ = ("run_id", "task_id", "name", "path", "weight", "context", "state",
+                 "worker_id", "lease_expires", "attempts", "submitted")
+    
+    def __init__(self, run_id, task_id, name, path, weight=1, context=None):
+        self.run_id = run_id
+        self.task_id = task_id
+        self.name = name
+        self.path = path
+        self.weight = max(1, int(weight))
+        self.context = context  # Caller data, e.g. the launch trace
+        self.state = RUN_PENDING
+        self.worker_id = None
+        self.lease_expires = 0.0
+        self.attempts = 0
+        self.submitted = time.monotonic()
+    
+    def job(self):
+        """What a worker needs to start the run"""
+        return {"run_id": self.run_id, "task_id": self.task_id, "name": self.name, "path": self.path}
+
+
+class WorkerInfo:
+    """A connected worker agent and the runs it holds"""
+    
+    __slots__ = ("worker_id", "host", "slots", "load", "runs", "last_seen", "connected")
+    
+    def __init__(self, worker_id, host, slots):
+        self.worker_id = worker_id
+        self.host = host
+        self.slots = max(1, int(slots))
+        self.load = 0.0
+        self.runs = {}  # {run_id: RemoteRun}
+        self.last_seen = time.monotonic()
+        self.connected = True
+    
+    def free(self):
+        """Slots not taken by leased runs"""
+        return self.slots - sum(run.weight for run in self.runs.values())
+
+
+class Coordinator:
+    """Owns the run queue - workers pull runs, hold them under a lease and report back
+    
+    Each run is leased to one worker. Heartbeats renew the lease; if a worker
+    goes silent for `lease_seconds` its runs are queued again for another worker
+    (up to `max_attempts` placements). A worker that comes back still holding a
+    reassigned run is told to cancel it, so a run never finishes twice. Results a
+    worker could not deliver are replayed when it reconnects; they are accepted
+    as long as the run has not been placed on another worker yet.
+    
+    Placement follows reported capacity: a worker only receives runs while it has
+    free slots, and runs with weight > 1 wait for the worker with the most room.
+    """
+    
+    def __init__(self, port=DEFAULT_PORT, token="", host="0.0.0.0", lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, on_started=None, on_output=None, on_finished=None):
+        self.port = port
+        self.token = token or ""
+        self.host = host
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.on_started = on_started    # callable(run, worker_id)
+        self.on_output = on_output      # callable(run, text)
+        self.on_finished = on_finished  # callable(run, returncode, state)
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._runs = {}     # {run_id: RemoteRun} - pending or leased
+        self._workers = {}  # {worker_id: WorkerInfo}
+        self._ids = itertools.count(1)
+        self._server = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Listen for workers and start the lease reaper
+        Returns: the bound port"""
+        coordinator = self
+        
+        class WorkerHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                coordinator._serve(self)
+        
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, int(self.port)), WorkerHandler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="cluster-server", daemon=True).start()
+        threading.Thread(target=self._reap_loop, name="cluster-reaper", daemon=True).start()
+        log.info("Cluster coordinator listening on %s:%s", self.host, self.port)
+        return self.port
+    
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def submit(self, task_id, name, path, weight=1, context=None):
+        """Queue a run for the next worker with room
+        Returns: RemoteRun"""
+        with self._lock:
+            run = RemoteRun(next(self._ids), task_id, name, path, weight, context)
+            self._runs[run.run_id] = run
+            self._pending.append(run)
+        log.debug("Queued cluster run %s for task %s", run.run_id, task_id, extra={"task_id": task_id})
+        return run
+    
+    def cancel(self, run_id):
+        """Drop a queued run, or take a leased one back - its worker is told to stop it on the next heartbeat
+        on_finished reports the run as RUN_CANCELLED. Returns: True if the run was still active"""
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+            if run is None:
+                return False
+            if run.state == RUN_PENDING:
+                self._pending.remove(run)
+            else:
+                worker = self._workers.get(run.worker_id)
+                if worker is not None:
+                    worker.runs.pop(run_id, None)
+            run.state = RUN_CANCELLED
+        log.info("Cluster run %s cancelled", run_id, extra={"task_id": run.task_id})
+        if self.on_finished:
+            self._callback(self.on_finished, run, None, RUN_CANCELLED)
+        return True
+    
+    def active_runs(self, task_id):
+        """Runs of a task that are queued or running on a worker"""
+        with self._lock:
+            return [run for run in self._runs.values() if run.task_id == task_id]
+    
+    def workers(self):
+        """Snapshot of connected workers: [{worker_id, host, slots, free, load, runs}]"""
+        with self._lock:
+            return [
+                {"worker_id": w.worker_id, "host": w.host, "slots": w.slots, "free": w.free(),
+                 "load": w.load, "runs": sorted(w.runs)}
+                for w in self._workers.values()
+            ]
+    
+    def _serve(self, handler):
+        """Message loop for one worker connection"""
+        worker = None
+        try:
+            hello = read_message(handler.rfile)
+            worker = self._hello(hello, handler.client_address[0])
+            if worker is None:
+                send_message(handler.wfile, {"type": "error", "error": "rejected"})
+                return
+            send_message(handler.wfile, {"type": "welcome", "lease": self.lease_seconds, "heartbeat": HEARTBEAT_SECONDS})
+            
+            while not self._stop.is_set():
+                message = read_message(handler.rfile)
+                if message is None:
+                    break
+                reply = self._dispatch(worker, message)
+                if reply is not None:
+                    send_message(handler.wfile, reply)
+        except (OSError, ValueError) as e:
+            log.warning("Cluster connection from %s failed: %s", handler.client_address[0], e)
+        finally:
+            if worker is not None:
+                with self._lock:
+                    worker.connected = False
+                log.info("Worker %s disconnected", worker.worker_id)
+    
+    def _hello(self, message, address):
+        if not message or message.get("type") != "hello" or message.get("version") != PROTOCOL_VERSION:
+            return None
+        if not hmac.compare_digest(str(message.get("token", "")), self.token):
+            log.warning("Worker from %s rejected: bad token", address)
+            return None
+        
+        worker_id = str(message.get("worker") or address)
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if worker is None:
+                worker = self._workers[worker_id] = WorkerInfo(worker_id, message.get("host") or address, message.get("slots", 1))
+            else:
+                # Reconnect - keep the runs it still holds under lease
+                worker.slots = max(1, int(message.get("slots", worker.slots)))
+                worker.connected = True
+                worker.last_seen = time.monotonic()
+        log.info("Worker %s connected from %s (%s slots)", worker_id, address, worker.slots)
+        return worker
+    
+    def _dispatch(self, worker, message):
+        kind = message.get("type")
+        now = time.monotonic()
+        with self._lock:
+            worker.last_seen = now
+        
+        if kind == "heartbeat":
+            return {"type": "ack", "cancel": self._heartbeat(worker, message, now)}
+        if kind == "poll":
+            run = self._lease(worker, now)
+            return {"type": "run", "run": run.job()} if run else {"type": "idle"}
+        if kind == "output":
+            run = self._held_run(worker, message.get("run_id"))
+            if run is not None and self.on_output:
+                self._callback(self.on_output, run, message.get("text", ""))
+            return None
+        if kind == "finished":
+            self._finish(worker, message.get("run_id"), message.get("returncode"))
+            return None
+        return {"type": "error", "error": f"unknown message {kind!r}"}
+    
+    def _heartbeat(self, worker, message, now):
+        """Renew the leases of runs the worker still holds
+        Returns: run ids the worker must cancel (reassigned or unknown)"""
+        cancel = []
+        with self._lock:
+            worker.load = float(message.get("load") or 0.0)
+            for run_id in message.get("running", []):
+                run = worker.runs.get(run_id)
+                if run is None:
+                    cancel.append(run_id)
+                else:
+                    run.lease_expires = now + self.lease_seconds
+        return cancel
+    
+    def _lease(self, worker, now):
+        """Pick the first queued run that fits the worker's free slots"""
+        with self._lock:
+            free = worker.free()
+            others = [w.free() for w in self._workers.values() if w is not worker and w.connected]
+            best_other = max(others, default=0)
+            for run in self._pending:
+                # Oversized runs still start on an idle worker instead of waiting forever
+                fits = run.weight <= free or (not worker.runs and run.weight > worker.slots)
+                if not fits:
+                    continue
+                if run.weight > 1 and best_other > free:
+                    continue  # Leave heavy runs for the worker with the most room
+                self._pending.remove(run)
+                run.state = RUN_LEASED
+                run.worker_id = worker.worker_id
+                run.lease_expires = now + self.lease_seconds
+                run.attempts += 1
+                worker.runs[run.run_id] = run
+                break
+            else:
+                return None
+        
+        log.info("Cluster run %s (%s) placed on %s", run.run_id, run.name, worker.worker_id, extra={"task_id": run.task_id})
+        if self.on_started:
+            self._callback(self.on_started, run, worker.worker_id)
+        return run
+    
+    def _held_run(self, worker, run_id):
+        """The worker's run - or a run requeued after its lease expired that nobody has taken yet
+        (a reconnecting worker replays what it could not deliver)"""
+        with self._lock:
+            run = worker.runs.get(run_id)
+            if run is None:
+                run = self._runs.get(run_id)
+                if run is None or run.state != RUN_PENDING:
+                    return None
+            return run
+    
+    def _finish(self, worker, run_id, returncode):
+        with self._lock:
+            run = worker.runs.pop(run_id, None)
+            if run is None:
+                run = self._runs.get(run_id)
+                if run is None or run.state != RUN_PENDING:
+                    return  # Already placed on another worker - ignore the late result
+                # Requeued while the worker was away, but its result was not lost after all
+                self._pending.remove(run)
+            run.state = RUN_DONE
+            self._runs.pop(run_id, None)
+        log.info("Cluster run %s finished on %s (exit code %s)", run_id, worker.worker_id, returncode,
+                 extra={"task_id": run.task_id})
+        if self.on_finished:
+            self._callback(self.on_finished, run, returncode, RUN_DONE)
+    
+    def _reap_loop(self):
+        while not self._stop.wait(1.0):
+            self.reap()
+    
+    def reap(self):
+        """Requeue runs whose lease expired and forget workers that went away"""
+        now = time.monotonic()
+        lost = []
+        with self._lock:
+            for worker in list(self._workers.values()):
+                for run in [r for r in worker.runs.values() if r.lease_expires < now]:
+                    del worker.runs[run.run_id]
+                    run.worker_id = None
+                    if run.attempts >= self.max_attempts:
+                        run.state = RUN_LOST
+                        self._runs.pop(run.run_id, None)
+                        lost.append(run)
+                    else:
+                        run.state = RUN_PENDING
+                        self._pending.appendleft(run)
+                        log.warning("Lease on cluster run %s expired on %s - requeued", run.run_id, worker.worker_id,
+                                    extra={"task_id": run.task_id})
+                if not worker.connected and not worker.runs and now - worker.last_seen > self.lease_seconds:
+                    del self._workers[worker.worker_id]
+        
+        for run in lost:
+            log.error("Cluster run %s lost after %s attempts", run.run_id, run.attempts, extra={"task_id": run.task_id})
+            if self.on_finished:
+                self._callback(self.on_finished, run, None, RUN_LOST)
+    
+    def _callback(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception:
+            log.exception("Error in cluster callback")
+
+
+class WorkerAgent:
+    """Runs on a worker PC - connects to the coordinator and runs what it hands out
+    
+    Task paths must exist on the worker (same install path or a shared drive).
+    Output is streamed back line by line; the connection is re-established with
+    backoff, and runs keep going while it is down.
+    """
+    
+    def __init__(self, coordinator_host, port=DEFAULT_PORT, token="", worker_id=None, slots=None, poll_interval=1.0):
+        self.coordinator_host = coordinator_host
+        self.port = port
+        self.token = token or ""
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.slots = slots or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.heartbeat_seconds = HEARTBEAT_SECONDS
+        self._processes = {}  # {run_id: Popen}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._unsent = {}  # {run_id: (deque of output messages, [finished message])} - kept while disconnected
+        self._wfile = None
+        self._stop = threading.Event()
+    
+    def run_forever(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._session()
+                backoff = 1.0
+            except (OSError, ValueError) as e:
+                log.warning("Coordinator connection failed: %s (retrying in %.0fs)", e, backoff)
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+    
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            self._kill(process)
+    
+    def _session(self):
+        with socket.create_connection((self.coordinator_host, self.port), timeout=30) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            rfile, wfile = sock.makefile("rb"), sock.makefile("wb")
+            send_message(wfile, {
+                "type": "hello", "version": PROTOCOL_VERSION, "token": self.token,
+                "worker": self.worker_id, "host": socket.gethostname(), "slots": self.slots
+            })
+            welcome = read_message(rfile)
+            if not welcome or welcome.get("type") != "welcome":
+                raise ValueError(f"coordinator refused the worker: {welcome}")
+            self.heartbeat_seconds = min(welcome.get("heartbeat", HEARTBEAT_SECONDS), welcome.get("lease", LEASE_SECONDS) / 3)
+            log.info("Connected to coordinator %s:%s as %s", self.coordinator_host, self.port, self.worker_id)
+            self._wfile = wfile
+            self._replay()
+            
+            try:
+                last_heartbeat = 0.0
+                while not self._stop.is_set():
+                    if time.monotonic() - last_heartbeat >= self.heartbeat_seconds:
+                        reply = self._request(rfile, {"type": "heartbeat", "running": self._running_ids(), "load": self._load()})
+                        for run_id in reply.get("cancel", []):
+                            self._cancel(run_id)
+                        last_heartbeat = time.monotonic()
+                    
+                    if len(self._running_ids()) < self.slots:
+                        reply = self._request(rfile, {"type": "poll"})
+                        if reply.get("type") == "run":
+                            self._start(reply["run"])
+                            continue  # Ask again right away while slots are free
+                    self._stop.wait(self.poll_interval)
+            finally:
+                self._wfile = None
+    
+    def _request(self, rfile, message):
+        if not self._send(message):
+            raise OSError("coordinator connection lost")
+        reply = read_message(rfile)
+        if reply is None:
+            raise OSError("coordinator closed the connection")
+        return reply
+    
+    def _send(self, message):
+        """Send without waiting for a reply
+        Returns: False if the connection is down (the message is dropped)"""
+        with self._send_lock:
+            return self._write(message)
+    
+    def _write(self, message):
+        if self._wfile is None:
+            return False
+        try:
+            send_message(self._wfile, message)
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def _send_run(self, run_id, message):
+        """Send a run's output or result - kept for replay if the connection is down
+        Once a run has unsent messages, later ones queue behind them so the order holds."""
+        with self._send_lock:
+            if run_id not in self._unsent and self._write(message):
+                return
+            output, finished = self._unsent.setdefault(run_id, (deque(maxlen=UNSENT_OUTPUT), []))
+            if message["type"] == "finished":
+                finished.append(message)
+            else:
+                output.append(message)
+    
+    def _replay(self):
+        """Deliver what runs sent while the coordinator was unreachable (right after hello)"""
+        with self._send_lock:
+            for run_id in list(self._unsent):
+                output, finished = self._unsent[run_id]
+                while output:
+                    if not self._write(output[0]):
+                        raise OSError("connection lost while replaying run output")
+                    output.popleft()
+                if finished:
+                    if not self._write(finished[0]):
+                        raise OSError("connection lost while replaying run results")
+                    log.info("Delivered the result of run %s after reconnecting", run_id)
+                del self._unsent[run_id]
+    
+    def _running_ids(self):
+        with self._lock:
+            return list(self._processes)
+    
+    def _load(self):
+        try:
+            return round(os.getloadavg()[0] / (os.cpu_count() or 1), 2)
+        except (AttributeError, OSError):
+            return 0.0
+    
+    def _start(self, job):
+        run_id, path = job["run_id"], os.path.normpath(job["path"])
+        command = [sys.executable, "-u", path] if path.lower().endswith(".py") else [path]
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                creationflags=CREATE_NO_WINDOW,
+                text=True,
+                bufsize=1,
+                encoding="utf-8",
+                errors="replace",
+                cwd=os.path.dirname(path) or None
+            )
+        except OSError as e:
+            log.error("Could not start %s: %s", path, e)
+            self._send_run(run_id, {"type": "output", "run_id": run_id, "text": f"[x] Could not start on {self.worker_id}: {e}\n"})
+            self._send_run(run_id, {"type": "finished", "run_id": run_id, "returncode": -1})
+            return
+        
+        with self._lock:
+            self._processes[run_id] = process
+        log.info("Started run %s: %s (PID %s)", run_id, job.get("name"), process.pid)
+        threading.Thread(target=self._watch, args=(run_id, process), daemon=True).start()
+    
+    def _watch(self, run_id, process):
+        """Stream a run's output to the coordinator and report its exit code"""
+        try:
+            for line in process.stdout:
+                self._send_run(run_id, {"type": "output", "run_id": run_id, "text": line})
+        except (OSError, ValueError):
+            pass
+        returncode = process.wait()
+        with self._lock:
+            self._processes.pop(run_id, None)
+        # Kept and replayed after reconnecting if the connection is down
+        self._send_run(run_id, {"type": "finished", "run_id": run_id, "returncode": returncode})
+    
+    def _cancel(self, run_id):
+        with self._lock:
+            process = self._processes.pop(run_id, None)
+        if process is not None:
+            log.warning("Run %s was reassigned by the coordinator - stopping it", run_id)
+            self._kill(process)
+    
+    def _kill(self, process):
+        """Terminate the process and its children"""
+        try:
+            import psutil
+            parent = psutil.Process(process.pid)
+            for child in parent.children(recursive=True):
+                try:
+                    child.kill()
+                except psutil.Error:
+                    pass
+            parent.kill()
+        except Exception:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scheduler cluster worker")
+    parser.add_argument("--coordinator", required=True, help="Host of the scheduler running the coordinator")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Coordinator port (cluster_port)")
+    parser.add_argument("--token", default=os.environ.get("SCHEDULER_CLUSTER_TOKEN", ""), help="Shared secret (cluster_token)")
+    parser.add_argument("--slots", type=int, default=None, help="Concurrent run slots (default: CPU count)")
+    parser.add_argument("--id", dest="worker_id", help="Worker name (default: hostname + random suffix)")
+    args = parser.parse_args(argv)
+    
+    from app_logging import setup_logging
+    setup_logging(os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"), console=True)
+    
+    agent = WorkerAgent(args.coordinator, args.port, args.token, args.worker_id, args.slots)
+    try:
+        agent.run_forever()
+    except KeyboardInterrupt:
+        agent.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
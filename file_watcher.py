@@ -0,0 +1,341 @@
+"""
+File Watcher
+Directory watch triggers - inotify on Linux, polling everywhere else
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from app_logging import get_logger
+
+log = get_logger("file_watcher")
+
+POLL_INTERVAL = 0.25  # Seconds between directory listings (polling backend)
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008  # File opened for writing was closed
+IN_MOVED_TO = 0x00000080     # File moved into the watched directory
+IN_Q_OVERFLOW = 0x00004000   # Event queue overflowed - rescan
+IN_IGNORED = 0x00008000      # Watch was removed
+IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, "O_NONBLOCK") else 0
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class FileWatch:
+    """A task's watch on a directory"""
+    
+    __slots__ = ("task_id", "directory", "patterns", "ignore", "callback", "debounce")
+    
+    def __init__(self, task_id, directory, patterns, callback, debounce, ignore=()):
+        self.task_id = task_id
+        self.directory = directory
+        self.patterns = [p.lower() for p in patterns] or ["*"]
+        self.ignore = {name.lower() for name in ignore}  # File names that never trigger (the task's own files)
+        self.callback = callback  # callable(task_id, [file paths])
+        self.debounce = debounce
+    
+    def matches(self, filename):
+        name = filename.lower()
+        return name not in self.ignore and any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+
+class FileWatcher:
+    """Base watcher - keeps the watch list and debounces bursts of events
+    
+    Events for a task are collected until no new matching file has shown up for
+    `debounce` seconds (or 5x debounce passed since the first one), then the
+    task's callback fires once with every file seen.
+    """
+    
+    backend = "base"
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._watches = {}  # {task_id: FileWatch}
+        self._pending = {}  # {task_id: [first_event, last_event, set(paths)]}
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def watch(self, task_id, directory, patterns=None, callback=None, debounce=0.5, fire_existing=False, ignore=()):
+        """Start watching a directory for a task (replaces an existing watch)
+        With fire_existing=True, files already waiting in the directory trigger one run.
+        Files named in ignore never trigger, whatever the patterns."""
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        directory = os.path.normpath(directory)
+        watch = FileWatch(task_id, directory, patterns or ["*"], callback, max(0.0, float(debounce)), ignore)
+        
+        with self._lock:
+            self.unwatch(task_id)
+            self._add_directory(directory)  # Raises OSError if the directory can't be watched
+            self._watches[task_id] = watch
+        
+        if fire_existing:
+            for filename in self._list_files(directory):
+                if watch.matches(filename):
+                    self._queue_event(watch, os.path.join(directory, filename))
+        
+        self.start()
+    
+    def unwatch(self, task_id):
+        """Stop watching for a task"""
+        with self._lock:
+            watch = self._watches.pop(task_id, None)
+            self._pending.pop(task_id, None)
+            if watch and not any(w.directory == watch.directory for w in self._watches.values()):
+                self._remove_directory(watch.directory)
+    
+    def start(self):
+        """Start the watcher thread (no-op if already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"file-watcher-{self.backend}", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop.set()
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=2)
+    
+    def watched_tasks(self):
+        with self._lock:
+            return list(self._watches)
+    
+    def _add_directory(self, directory):
+        pass
+    
+    def _remove_directory(self, directory):
+        pass
+    
+    def _wake(self):
+        pass
+    
+    def _run(self):
+        raise NotImplementedError
+    
+    def _list_files(self, directory):
+        try:
+            with os.scandir(directory) as entries:
+                return [entry.name for entry in entries if entry.is_file()]
+        except OSError:
+            return []
+    
+    def _on_file(self, directory, filename):
+        """Route a file event to every task watching the directory"""
+        with self._lock:
+            watches = [w for w in self._watches.values() if w.directory == directory and w.matches(filename)]
+        for watch in watches:
+            self._queue_event(watch, os.path.join(directory, filename))
+    
+    def _queue_event(self, watch, path):
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(watch.task_id)
+            if pending is None:
+                self._pending[watch.task_id] = [now, now, {path}]
+            else:
+                pending[1] = now
+                pending[2].add(path)
+        self._wake()
+    
+    def _next_timeout(self, default):
+        """Seconds until the earliest pending debounce expires"""
+        now = time.monotonic()
+        timeout = default
+        with self._lock:
+            for task_id, (first, last, _) in self._pending.items():
+                watch = self._watches.get(task_id)
+                if watch is None:
+                    continue
+                due = min(last + watch.debounce, first + watch.debounce * 5)
+                timeout = min(timeout, max(0.0, due - now))
+        return timeout
+    
+    def _fire_due(self):
+        """Invoke callbacks whose debounce window has passed"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for task_id, (first, last, paths) in list(self._pending.items()):
+                watch = self._watches.get(task_id)
+                if watch is None:
+                    del self._pending[task_id]
+                elif now >= min(last + watch.debounce, first + watch.debounce * 5):
+                    del self._pending[task_id]
+                    due.append((watch, sorted(paths)))
+        
+        for watch, paths in due:
+            try:
+                watch.callback(watch.task_id, paths)
+            except Exception:
+                log.exception("File watch callback failed for task %s", watch.task_id)
+
+
+class InotifyWatcher(FileWatcher):
+    """Linux inotify backend - one descriptor for all watched directories"""
+    
+    backend = "inotify"
+    
+    def __init__(self):
+        super().__init__()
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wd_dirs = {}  # {wd: directory}
+        self._dir_wds = {}  # {directory: wd}
+        self._wake_r, self._wake_w = os.pipe()
+    
+    def _add_directory(self, directory):
+        if directory in self._dir_wds:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        self._wd_dirs[wd] = directory
+        self._dir_wds[directory] = wd
+    
+    def _remove_directory(self, directory):
+        wd = self._dir_wds.pop(directory, None)
+        if wd is not None:
+            self._wd_dirs.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+    
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+    
+    def _run(self):
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd, self._wake_r], [], [], self._next_timeout(60.0))
+            if self._wake_r in readable:
+                os.read(self._wake_r, 4096)
+            if self._fd in readable:
+                self._read_events()
+            self._fire_due()
+    
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            
+            if mask & IN_Q_OVERFLOW:
+                log.warning("inotify queue overflowed - rescanning watched directories")
+                self._rescan()
+                continue
+            with self._lock:
+                directory = self._wd_dirs.get(wd)
+            if directory and name and not mask & IN_IGNORED:
+                self._on_file(directory, os.fsdecode(name))
+    
+    def _rescan(self):
+        """Events were lost - treat every matching file as new"""
+        with self._lock:
+            directories = set(self._dir_wds)
+        for directory in directories:
+            for filename in self._list_files(directory):
+                self._on_file(directory, filename)
+
+
+class PollingWatcher(FileWatcher):
+    """Portable backend - compares directory listings every poll_interval seconds
+    
+    A new or changed file fires once its size and mtime are the same in two
+    polls in a row, so a file that is still being written (a copy, a download)
+    does not start the task half-way through.
+    """
+    
+    backend = "polling"
+    
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self._snapshots = {}  # {directory: {name: (mtime, size)}}
+        self._unsettled = {}  # {directory: names that changed in the last poll}
+        self._wake_event = threading.Event()
+    
+    def _add_directory(self, directory):
+        if directory not in self._snapshots:
+            self._snapshots[directory] = self._snapshot(directory)
+    
+    def _remove_directory(self, directory):
+        self._snapshots.pop(directory, None)
+        self._unsettled.pop(directory, None)
+    
+    def _wake(self):
+        self._wake_event.set()
+    
+    def _snapshot(self, directory):
+        result = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        result[entry.name] = (stat.st_mtime, stat.st_size)
+        except OSError:
+            pass
+        return result
+    
+    def _run(self):
+        next_poll = time.monotonic()
+        while not self._stop.is_set():
+            if time.monotonic() >= next_poll:
+                self._poll()
+                next_poll = time.monotonic() + self.poll_interval
+            
+            timeout = min(self._next_timeout(self.poll_interval), max(0.0, next_poll - time.monotonic()))
+            self._wake_event.wait(timeout)
+            self._wake_event.clear()
+            self._fire_due()
+    
+    def _poll(self):
+        with self._lock:
+            directories = list(self._snapshots)
+        for directory in directories:
+            current = self._snapshot(directory)
+            with self._lock:
+                if directory not in self._snapshots:
+                    continue
+                previous = self._snapshots[directory]
+                self._snapshots[directory] = current
+                unsettled = self._unsettled.get(directory, set())
+                settled = [name for name in unsettled if name in current and current[name] == previous.get(name)]
+                self._unsettled[directory] = {
+                    name for name, signature in current.items() if previous.get(name) != signature
+                }
+            for name in settled:
+                self._on_file(directory, name)
+
+
+def create_file_watcher(poll_interval=POLL_INTERVAL):
+    """Create the best available watcher for this platform"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(poll_interval)
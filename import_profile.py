@@ -0,0 +1,91 @@
+"""
+Import Profile
+Reports where interpreter startup time goes, using python -X importtime
+
+Usage:
+    python import_profile.py                  # Profile `import index`
+    python import_profile.py --module tracing --top 30 --repeat 5
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+def profile_once(module, interpreter=sys.executable):
+    """Import a module in a fresh interpreter
+    Returns: list of (module name, self us, cumulative us, parent module)"""
+    result = subprocess.run(
+        [interpreter, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+    
+    rows = []
+    pending = {}  # {depth: row indexes waiting for their parent} - children are listed before the parent
+    for line in result.stderr.splitlines():
+        # import time:      self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        for child in pending.pop(depth + 1, ()):
+            rows[child] = rows[child][:3] + (name,)
+        pending.setdefault(depth, []).append(len(rows))
+        rows.append((name, self_us, cumulative_us, None))
+    return rows
+
+
+def profile(module, repeat=3, interpreter=sys.executable):
+    """Best of `repeat` runs per imported module (the first run also warms the disk cache)
+    Returns: {module name: (self us, cumulative us, parent module)}"""
+    best = {}
+    for _ in range(max(1, repeat)):
+        for name, self_us, cumulative_us, parent in profile_once(module, interpreter):
+            previous = best.get(name)
+            if previous is None or cumulative_us < previous[1]:
+                best[name] = (self_us, cumulative_us, parent)
+    return best
+
+
+def print_report(module, timings, top):
+    total_us = timings.get(module, (0, sum(t[0] for t in timings.values()), None))[1]
+    print(f"import {module}: {total_us / 1000:.1f} ms, {len(timings)} modules")
+    
+    # Direct imports of the profiled module, then the slowest modules overall
+    top_level = sorted(((name, t) for name, t in timings.items() if t[2] == module), key=lambda item: -item[1][1])
+    print("\nDirect imports by cumulative time:")
+    for name, (self_us, cumulative_us, _) in top_level[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    
+    by_self = sorted(timings.items(), key=lambda item: -item[1][0])
+    print("\nModules by self time:")
+    for name, (self_us, cumulative_us, _) in by_self[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time profile of the scheduler")
+    parser.add_argument("--module", default="index", help="Module to import (default: index)")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the best time from")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter to profile with")
+    args = parser.parse_args(argv)
+    
+    try:
+        timings = profile(args.module, args.repeat, args.python)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print_report(args.module, timings, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
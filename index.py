@@ -4,28 +4,108 @@ Built with CustomTkinter + APScheduler
 Manages and executes .exe files with dedicated logging
 """
 
+import time
+STARTUP_BEGIN = time.perf_counter()  # Reference point for the startup profile
+
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import filedialog, messagebox
+import tkinter.font as tkfont
 import json
 import os
 import sys
+import shutil
+import tempfile
 import subprocess
 import threading
 import queue
-from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-import psutil
-import time
+import itertools
+from datetime import datetime, timedelta
+from lazy_import import lazy_import, load_times
+from app_logging import get_logger, setup_logging, logging_options
+import metrics
+from process_registry import ProcessRegistry
+from task_graph import DagScheduler
+from file_watcher import create_file_watcher
+from python_pool import PythonWorkerPool, find_interpreter
+from leader import LeaderElection
+from retry import RetryTracker, OUTCOME_RETRY, OUTCOME_FAILED, OUTCOME_TRIPPED
+from process_watchdog import ProcessWatchdog, TIMEOUT_IDLE, TIMEOUT_TOTAL
+from run_history import RunHistory
+from log_store import LogStore
+from log_archive import LogArchive
+from log_viewer import MappedLog, STDERR_MARK
+from liveness import LivenessSampler, LIVE_STALLED, LIVE_STATES
+import pty_capture
+from pty_capture import CAPTURE_PIPE, CAPTURE_PTY
+import output_streams
+from output_streams import OutputReader, STREAM_STDOUT, STREAM_STDERR, STREAMS, DEFAULT_RETENTION
+from tracing import (
+    LaunchTracer, NULL_TRACE, STAGE_ADMISSION, STAGE_METADATA, STAGE_UI, STAGE_SPAWN, STAGE_FIRST_OUTPUT
+)
+from scheduling import (
+    MISFIRE_ONCE, DEFAULT_MAX_CATCHUP, TRIGGER_FILE, format_time, plan_resume, catchup_runs,
+    get_misfire_policy, get_trigger_type, job_misfire_options
+)
+
+# Loaded on first use - keeps them off the path to the first window
+filedialog = lazy_import("tkinter.filedialog")
+messagebox = lazy_import("tkinter.messagebox")
+psutil = lazy_import("psutil")
+aps_background = lazy_import("apscheduler.schedulers.background")
+aps_interval = lazy_import("apscheduler.triggers.interval")
+aps_events = lazy_import("apscheduler.events")
+job_store = lazy_import("job_store")  # SQLite job store - imports APScheduler
+async_executor = lazy_import("async_executor")  # asyncio backend - asyncio is ~60 ms to import
+
+log = get_logger("app")
+
+# Metrics - served on http://127.0.0.1:<metrics_port>/metrics when metrics_port is set in config.json
+LAUNCHES = metrics.counter("scheduler_launches_total", "Process launch attempts by result", ["result"])
+LAUNCH_SECONDS = metrics.histogram("scheduler_launch_seconds", "Time from execute() until the process was started")
+RUNNING_PROCESSES = metrics.gauge("scheduler_running_processes", "Processes currently running")
+PENDING_RUNS = metrics.gauge("scheduler_pending_runs", "Runs queued behind a running instance")
+THREADS = metrics.gauge("scheduler_threads", "Live threads in the scheduler process")
+PERSIST_SECONDS = metrics.histogram("scheduler_persist_seconds", "Time to write tasks.json")
+PERSIST_ERRORS = metrics.counter("scheduler_persist_errors_total", "Failed writes of tasks.json")
+LOG_LINES = metrics.counter("scheduler_log_lines_total", "Lines appended to log panels")
+LOG_CHARS = metrics.counter("scheduler_log_chars_total", "Characters appended to log panels")
+OUTPUT_LINES = metrics.counter("scheduler_output_lines_total", "Lines captured from processes by stream", ["stream"])
+JOB_EVENTS = metrics.counter("scheduler_job_events_total", "APScheduler job events by type", ["event"])
+JOB_LATENESS = metrics.histogram(
+    "scheduler_job_lateness_seconds", "Seconds from a job's scheduled time until its run returned",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0)
+)
+LAUNCH_STAGE_SECONDS = metrics.histogram(
+    "scheduler_launch_stage_seconds", "Launch latency by stage, from trigger to first output", ["stage"]
+)
+RUN_LIVENESS = metrics.gauge("scheduler_runs_by_liveness", "Running processes by liveness (busy / stalled)", ["state"])
+RUN_TIMEOUTS = metrics.counter("scheduler_run_timeouts_total", "Runs killed for exceeding a timeout", ["reason"])
+THREADS.set_function(threading.active_count)
+
+# APScheduler event constant -> metric label
+JOB_EVENT_NAMES = {
+    "EVENT_JOB_EXECUTED": "executed",
+    "EVENT_JOB_ERROR": "error",
+    "EVENT_JOB_MISSED": "missed",
+    "EVENT_JOB_MAX_INSTANCES": "max_instances",
+}
+
+# Hide console windows of captured apps (Windows only - 0 elsewhere)
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
 
-# Debug mode - set to False for production
-DEBUG = False
+# Overlap policies - what happens when a run fires while the previous one is still running
+OVERLAP_SKIP = "skip"          # Drop the new run (default)
+OVERLAP_QUEUE = "queue"        # Keep one pending run, start it when the slot frees
+OVERLAP_REPLACE = "replace"    # Kill the running instance and start the new run
+OVERLAP_PARALLEL = "parallel"  # Allow up to max_instances concurrent runs per task
+OVERLAP_POLICIES = (OVERLAP_SKIP, OVERLAP_QUEUE, OVERLAP_REPLACE, OVERLAP_PARALLEL)
 
-def debug_print(msg):
-    """Conditional debug logging"""
-    if DEBUG:
-        print(msg)
+# Executor backends - how runs are spawned and supervised (executor_backend in config.json)
+BACKEND_THREADS = "threads"  # Popen plus a completion thread per run (default)
+BACKEND_ASYNCIO = "asyncio"  # One event-loop thread spawns and supervises every run (async_executor.py)
+EXECUTOR_BACKENDS = (BACKEND_THREADS, BACKEND_ASYNCIO)
+
+TASK_ROW_BATCH = 25  # Task rows built per idle callback while the task list fills in
 
 # Set appearance
 ctk.set_appearance_mode("dark")
@@ -48,10 +128,11 @@ class TaskManager:
         self.filename = os.path.join(app_dir, filename)
         self.config_filename = os.path.join(app_dir, config_filename)
         
-        debug_print(f"[DEBUG] App directory: {app_dir}")
-        debug_print(f"[DEBUG] Tasks file: {self.filename}")
-        debug_print(f"[DEBUG] Config file: {self.config_filename}")
+        log.debug("App directory: %s", app_dir)
+        log.debug("Tasks file: %s", self.filename)
+        log.debug("Config file: %s", self.config_filename)
         
+        self.read_only = False  # Standby instance - tasks.json belongs to the leader
         self.tasks = self.load_tasks()
         self.config = self.load_config()
     
@@ -62,7 +143,7 @@ class TaskManager:
                 with open(self.filename, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError) as e:
-                debug_print(f"Error loading tasks: {e}")
+                log.error("Error loading tasks: %s", e)
                 # Backup corrupted file
                 if os.path.exists(self.filename):
                     backup_name = f"{self.filename}.backup"
@@ -80,7 +161,7 @@ class TaskManager:
                 with open(self.config_filename, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError) as e:
-                debug_print(f"Error loading config: {e}")
+                log.error("Error loading config: %s", e)
                 return {"last_exe_path": None}
         return {"last_exe_path": None}
     
@@ -90,7 +171,7 @@ class TaskManager:
             with open(self.config_filename, 'w', encoding='utf-8') as f:
                 json.dump(self.config, f, indent=4)
         except IOError as e:
-            debug_print(f"Error saving config: {e}")
+            log.error("Error saving config: %s", e)
     
     def set_last_exe_path(self, path):
         """Save the last selected exe path"""
@@ -102,26 +183,42 @@ class TaskManager:
         return self.config.get("last_exe_path")
     
     def save_tasks(self):
-        """Save tasks to JSON file with error handling and atomic write"""
-        temp_filename = f"{self.filename}.tmp"
+        """Save tasks to JSON file with error handling and atomic write
+        
+        Readers (another instance, an editor) always see either the old or the new
+        file - tasks.json is never missing or half-written. A read-only (standby)
+        instance never writes it: the leader would overwrite its changes.
+        """
+        if self.read_only:
+            return
+        # Per-process/thread temp name so concurrent writers never share one
+        temp_filename = f"{self.filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        started = time.perf_counter()
         try:
             # Write to temporary file first
             with open(temp_filename, 'w', encoding='utf-8') as f:
                 json.dump(self.tasks, f, indent=4)
             
-            # Atomic rename (Windows safe)
+            # Keep the previous version as a backup without moving tasks.json away
             if os.path.exists(self.filename):
-                backup_filename = f"{self.filename}.bak"
                 try:
-                    if os.path.exists(backup_filename):
-                        os.remove(backup_filename)
-                    os.rename(self.filename, backup_filename)
-                except:
+                    shutil.copyfile(self.filename, f"{self.filename}.bak")
+                except OSError:
                     pass
             
-            os.rename(temp_filename, self.filename)
+            # Atomic replace - retried briefly because Windows refuses while a reader has the file open
+            for attempt in range(5):
+                try:
+                    os.replace(temp_filename, self.filename)
+                    break
+                except PermissionError:
+                    if attempt == 4:
+                        raise
+                    time.sleep(0.05)
+            PERSIST_SECONDS.observe(time.perf_counter() - started)
         except IOError as e:
-            debug_print(f"Error saving tasks: {e}")
+            PERSIST_ERRORS.inc()
+            log.error("Error saving tasks: %s", e)
             # Cleanup temp file if it exists
             if os.path.exists(temp_filename):
                 try:
@@ -144,7 +241,12 @@ class TaskManager:
             "interval": interval,
             "status": "Idle",
             "last_run": None,
-            "enabled": True  # Tasks enabled by default
+            "enabled": True,  # Tasks enabled by default
+            "overlap_policy": OVERLAP_SKIP,
+            "max_instances": 1,
+            "misfire_policy": MISFIRE_ONCE,
+            "max_catchup": DEFAULT_MAX_CATCHUP,
+            "next_run": None
         }
         self.tasks.append(task)
         self.save_tasks()
@@ -175,6 +277,13 @@ class TaskManager:
         self.tasks = [t for t in self.tasks if t["id"] != task_id]
         self.save_tasks()
     
+    def set_next_run(self, task_id, next_run):
+        """Record the next scheduled run time (persisted with the next save)"""
+        for task in self.tasks:
+            if task["id"] == task_id:
+                task["next_run"] = next_run
+                break
+    
     def update_status(self, task_id, status, last_run=None):
         """Update task status"""
         for task in self.tasks:
@@ -190,25 +299,115 @@ class ProcessExecutor:
     """Handles process execution - lightweight mode"""
     
     def __init__(self):
-        self.running_processes = {}  # {exe_path: process_object}
-        self.heartbeat_threads = {}  # Track heartbeat threads per task
+        self.registry = ProcessRegistry()  # Lock-protected {slot_key: entries}
+        self.pending_runs = {}  # {slot_key: callable} - at most one queued run per slot
+        self.overlap_stats = {}  # {task_id: {"missed": n, "coalesced": n, "replaced": n}}
+        self._overlap_lock = threading.Lock()
+        self.python_pool = None  # PythonWorkerPool for warm .py launches (python_pool_size in config.json)
+        self.watchdog = ProcessWatchdog()  # Per-task timeout / idle_timeout enforcement
+        self.liveness = LivenessSampler()  # Busy vs stalled from output, CPU time and I/O
+        self.capture_mode = CAPTURE_PIPE  # Default for tasks without a capture option (capture_mode in config.json)
+        self.output_reader = OutputReader()  # One thread reads the output of every captured run
+        self.async_runner = None  # AsyncRunner while the asyncio backend is selected
+    
+    def set_backend(self, backend):
+        """Select how runs are spawned and supervised - BACKEND_THREADS or BACKEND_ASYNCIO
+        Runs already started stay on the backend that started them."""
+        if backend not in EXECUTOR_BACKENDS:
+            log.warning("Unknown executor_backend %r - using %s", backend, BACKEND_THREADS)
+            backend = BACKEND_THREADS
+        if backend == BACKEND_ASYNCIO:
+            if self.async_runner is None:
+                self.async_runner = async_executor.AsyncRunner()
+        else:
+            self.async_runner = None
     
     def is_running(self, exe_path):
         """Check if a process is already running"""
+        return self.registry.is_running(os.path.normpath(exe_path))
+    
+    def running_snapshot(self):
+        """Get a consistent list of running processes (for UI and shutdown)"""
+        return self.registry.snapshot()
+    
+    def slot_key(self, exe_path, task_id=None, overlap_policy=OVERLAP_SKIP):
+        """Get the dedup key - the exe path, or the task id for parallel instances"""
+        if overlap_policy == OVERLAP_PARALLEL and task_id is not None:
+            return f"task:{task_id}"
+        return os.path.normpath(exe_path)
+    
+    def _count_overlap(self, task_id, name):
+        """Increment an overlap counter for a task"""
+        with self._overlap_lock:
+            stats = self.overlap_stats.setdefault(task_id, {"missed": 0, "coalesced": 0, "replaced": 0})
+            stats[name] += 1
+    
+    def get_overlap_stats(self, task_id):
+        """Get missed/coalesced/replaced run counts for a task"""
+        with self._overlap_lock:
+            return dict(self.overlap_stats.get(task_id, {"missed": 0, "coalesced": 0, "replaced": 0}))
+    
+    def admit(self, exe_path, task_id=None, overlap_policy=OVERLAP_SKIP, max_instances=1, rerun=None):
+        """Apply the task's overlap policy and reserve a slot if the run may start
+        Returns: (decision, slot) - decision is 'run', 'replaced', 'queued', 'coalesced' or 'skipped';
+        slot is the reserved ProcessInfo to pass to execute() (None unless the run may start)"""
+        if overlap_policy not in OVERLAP_POLICIES:
+            overlap_policy = OVERLAP_SKIP
+        
         exe_path = os.path.normpath(exe_path)
+        key = self.slot_key(exe_path, task_id, overlap_policy)
+        limit = 1
+        if overlap_policy == OVERLAP_PARALLEL:
+            try:
+                limit = max(1, int(max_instances))
+            except (TypeError, ValueError):
+                limit = 1
+        
+        slot = self.registry.try_acquire(key, task_id=task_id, exe_path=exe_path, limit=limit)
+        if slot is not None:
+            return "run", slot
+        
+        if overlap_policy == OVERLAP_REPLACE:
+            # Cancel the running instance(s); reservations still launching are left alone
+            for entry in self.registry.entries(key):
+                if entry.process is not None:
+                    log.info("[OVERLAP] Replacing PID %s for %s", entry.pid, os.path.basename(exe_path), extra={"task_id": task_id})
+                    self.kill_process_tree(entry.process)
+                    self.registry.release(key, slot_id=entry.slot_id)
+            
+            slot = self.registry.try_acquire(key, task_id=task_id, exe_path=exe_path, limit=limit)
+            if slot is not None:
+                self._count_overlap(task_id, "replaced")
+                return "replaced", slot
+        
+        elif overlap_policy == OVERLAP_QUEUE and rerun is not None:
+            with self._overlap_lock:
+                coalesced = key in self.pending_runs
+                self.pending_runs[key] = rerun  # Newest trigger wins
+            
+            # The running instance may have finished while we were queueing
+            if not self.registry.is_running(key):
+                self._start_pending(key)
+            
+            if coalesced:
+                self._count_overlap(task_id, "coalesced")
+                return "coalesced", None
+            return "queued", None
         
-        if exe_path in self.running_processes:
-            proc = self.running_processes[exe_path]
-            if proc.poll() is None:  # Still running
-                return True
-            else:
-                del self.running_processes[exe_path]
-        return False
+        self._count_overlap(task_id, "missed")
+        return "skipped", None
+    
+    def _start_pending(self, key):
+        """Start the queued run for a slot once it frees up (queue policy)"""
+        with self._overlap_lock:
+            rerun = self.pending_runs.pop(key, None)
+        if rerun is not None:
+            threading.Thread(target=rerun, daemon=True).start()
     
     def is_console_app(self, exe_path):
         """Detect if exe is a console application (needs log capture)"""
         if not os.path.exists(exe_path):
-            debug_print(f"Executable not found: {exe_path}")
+            log.warning("Executable not found: %s", exe_path)
             return False
             
         try:
@@ -245,18 +444,31 @@ class ProcessExecutor:
                     # CUI (Console) = 3, GUI = 2
                     return subsystem == 3
         except (IOError, OSError, struct.error) as e:
-            debug_print(f"Error reading PE header from {exe_path}: {e}")
+            log.error("Error reading PE header from %s: %s", exe_path, e)
         
         return False  # Default to GUI (no log capture)
     
-    def execute(self, exe_path, log_callback=None, needs_logging=None, completion_callback=None, process_ref_callback=None):
+    def execute(self, exe_path, log_callback=None, needs_logging=None, completion_callback=None, process_ref_callback=None, task_id=None, slot=None, trace=NULL_TRACE, warm_start=True, timeout=None, idle_timeout=None, stall_after=None, capture=None):
         """Execute an .exe file - GUI apps run normally, console apps get logged
+        Pass the slot returned by admit() to launch into an already reserved slot.
+        .py scripts run in a warm pool worker when the pool is enabled and warm_start is set.
+        timeout / idle_timeout (seconds) kill the process tree when exceeded - idle_timeout needs captured output.
+        Every run is tracked by the liveness sampler; stall_after overrides its stall window.
+        On the asyncio backend (set_backend) the event loop spawns and supervises piped and GUI runs.
+        capture "pty" runs a console app on a pseudo-terminal so it flushes every line (stdout and stderr merged).
+        log_callback(text, stream) gets output tagged "stdout" / "stderr" and the executor's own messages untagged.
+        The trace (see tracing.py) is marked at spawn and first output, then finished.
         Returns: process object if executed, None if already running, 'skipped' if overlap detected"""
+        started = time.perf_counter()
         
         # Validate exe_path
         if not exe_path or not isinstance(exe_path, str):
             if log_callback:
                 log_callback(f"[x] Invalid executable path\n")
+            if slot is not None:
+                self.registry.release(slot.key, slot_id=slot.slot_id)
+            LAUNCHES.labels("invalid").inc()
+            trace.finish("invalid")
             return None
             
         exe_path = os.path.normpath(exe_path)
@@ -264,72 +476,148 @@ class ProcessExecutor:
         if not os.path.exists(exe_path):
             if log_callback:
                 log_callback(f"[x] Executable not found: {exe_path}\n")
+            if slot is not None:
+                self.registry.release(slot.key, slot_id=slot.slot_id)
+            LAUNCHES.labels("not_found").inc()
+            trace.finish("not_found")
             return None
         
-        if self.is_running(exe_path):
-            if log_callback:
-                log_callback(f"[!] Process already running, skipping execution\n")
-            return "skipped"  # Return 'skipped' to distinguish from error
+        if slot is None:
+            # Atomically claim the dedup slot (check + reserve under one lock)
+            slot = self.registry.try_acquire(exe_path, task_id=task_id, exe_path=exe_path)
+            if slot is None:
+                if log_callback:
+                    log_callback(f"[!] Process already running, skipping execution\n")
+                LAUNCHES.labels("skipped").inc()
+                trace.finish("skipped")
+                return "skipped"  # Return 'skipped' to distinguish from error
+        key = slot.key
         
         # Auto-detect if logging is needed
         if needs_logging is None:
             needs_logging = self.is_console_app(exe_path)
         
+        use_pty = (capture or self.capture_mode) == CAPTURE_PTY and log_callback is not None
+        if use_pty and not pty_capture.available():
+            log.warning("PTY capture needs pywinpty on Windows - using pipes for %s", os.path.basename(exe_path))
+            use_pty = False
+        on_loop = False  # Spawned by the AsyncRunner, which then streams, waits and enforces the timeout
+        
         try:
             if needs_logging:
-                # Console app - capture output, no window
-                process = subprocess.Popen(
-                    exe_path,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    stdin=subprocess.DEVNULL,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                    text=True,
-                    bufsize=1,
-                    cwd=os.path.dirname(exe_path)
-                )
+                if warm_start and self.python_pool and exe_path.lower().endswith(".py"):
+                    # Python script - hand it to a pre-started interpreter
+                    process = self.python_pool.run(exe_path, cwd=os.path.dirname(exe_path))
+                    use_pty = False
+                elif use_pty:
+                    # Console app on a pseudo-terminal - it sees a console and line-buffers
+                    process = pty_capture.spawn(exe_path, cwd=os.path.dirname(exe_path))
+                elif self.async_runner:
+                    # Console app on the event loop - capture output, no window
+                    process = self.async_runner.spawn(
+                        exe_path, cwd=os.path.dirname(exe_path), creationflags=CREATE_NO_WINDOW
+                    )
+                    on_loop = True
+                else:
+                    # Console app - capture output, no window
+                    process = subprocess.Popen(
+                        exe_path,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        stdin=subprocess.DEVNULL,
+                        creationflags=CREATE_NO_WINDOW,
+                        text=True,
+                        bufsize=1,
+                        cwd=os.path.dirname(exe_path)
+                    )
+                self.registry.attach(key, process, slot.slot_id)
+                LAUNCH_SECONDS.observe(time.perf_counter() - started)
+                trace.mark(STAGE_SPAWN)
                 
-                if log_callback:
-                    # Stream output to log
-                    threading.Thread(
-                        target=self._stream_output,
-                        args=(process.stdout, log_callback),
-                        daemon=True
-                    ).start()
-                    
-                    threading.Thread(
-                        target=self._stream_output,
-                        args=(process.stderr, log_callback),
-                        daemon=True
-                    ).start()
+                process.stream_lines = dict.fromkeys(STREAMS, 0)
+                if on_loop:
+                    self._supervise_async(process, exe_path, log_callback, completion_callback, key, trace, timeout)
+                else:
+                    drained = None
+                    if log_callback and (use_pty or output_streams.selectable()):
+                        # The shared output reader streams both pipes (or the PTY) - no reader threads per run
+                        drained = threading.Event()
+                        if use_pty:
+                            sources = [(pty_capture.pty_source(process), STREAM_STDOUT)]
+                        else:
+                            sources = [(process.stdout, STREAM_STDOUT), (process.stderr, STREAM_STDERR)]
+                        self.output_reader.add(
+                            sources,
+                            lambda text, stream: self._on_output(text, stream, log_callback, trace, process),
+                            on_close=drained.set,
+                            encoding=getattr(process.stdout, "encoding", None),
+                            strip_ansi=use_pty
+                        )
+                    elif log_callback:
+                        # Windows pipes can't be selected - one thread per stream
+                        threading.Thread(
+                            target=self._stream_output,
+                            args=(process.stdout, log_callback, STREAM_STDOUT, trace, process),
+                            daemon=True
+                        ).start()
+                        
+                        threading.Thread(
+                            target=self._stream_output,
+                            args=(process.stderr, log_callback, STREAM_STDERR, trace, process),
+                            daemon=True
+                        ).start()
                     
-                    threading.Thread(
-                        target=self._monitor_completion,
-                        args=(process, exe_path, log_callback, completion_callback),
-                        daemon=True
-                    ).start()
+                    if log_callback:
+                        threading.Thread(
+                            target=self._monitor_completion,
+                            args=(process, exe_path, log_callback, completion_callback, key, trace, drained),
+                            daemon=True
+                        ).start()
+                    else:
+                        # No logging, just monitor completion
+                        trace.finish()
+                        threading.Thread(
+                            target=self._monitor_completion_simple,
+                            args=(process, exe_path, completion_callback, key),
+                            daemon=True
+                        ).start()
+            else:
+                # GUI app - let it show its own window
+                if self.async_runner:
+                    process = self.async_runner.spawn(exe_path, cwd=os.path.dirname(exe_path) or None, capture=False)
+                    on_loop = True
+                else:
+                    process = subprocess.Popen(
+                        exe_path,
+                        cwd=os.path.dirname(exe_path) or None
+                    )
+                self.registry.attach(key, process, slot.slot_id)
+                LAUNCH_SECONDS.observe(time.perf_counter() - started)
+                trace.mark(STAGE_SPAWN)
+                trace.finish()  # GUI output is not captured
+                
+                # Just track completion
+                if on_loop:
+                    self._supervise_async(process, exe_path, None, completion_callback, key, trace, timeout)
                 else:
-                    # No logging, just monitor completion
                     threading.Thread(
                         target=self._monitor_completion_simple,
-                        args=(process, exe_path, completion_callback),
+                        args=(process, exe_path, completion_callback, key),
                         daemon=True
                     ).start()
-            else:
-                # GUI app - let it show its own window
-                process = subprocess.Popen(
-                    exe_path,
-                    cwd=os.path.dirname(exe_path) or None
+            
+            self.liveness.track(process, task_id, stall_after)
+            if on_loop:
+                timeout = None  # The event loop enforces it
+            if timeout or idle_timeout:
+                self.watchdog.watch(
+                    process,
+                    timeout=timeout,
+                    idle_timeout=idle_timeout if needs_logging and log_callback else None,
+                    on_timeout=lambda reason: self._on_timeout(process, key, reason, log_callback)
                 )
-                
-                # Just track completion
-                threading.Thread(
-                    target=self._monitor_completion_simple,
-                    args=(process, exe_path, completion_callback),
-                    daemon=True
-                ).start()
             
-            self.running_processes[exe_path] = process
+            LAUNCHES.labels("started").inc()
             
             # Send process reference back if callback provided
             if process_ref_callback:
@@ -338,20 +626,61 @@ class ProcessExecutor:
             return process
             
         except (FileNotFoundError, OSError, PermissionError) as e:
+            # Launch failed - free the reserved slot
+            self.registry.release(key, slot_id=slot.slot_id)
+            LAUNCHES.labels("failed").inc()
+            trace.finish("failed")
             if log_callback:
                 log_callback(f"[x] Error executing process: {str(e)}\n")
-            debug_print(f"Error executing {exe_path}: {e}")
+            log.exception("Error executing %s: %s", exe_path, e)
             return None
+        except Exception:
+            # Never leave a reserved slot behind on unexpected errors
+            self.registry.release(key, slot_id=slot.slot_id)
+            LAUNCHES.labels("failed").inc()
+            trace.finish("failed")
+            raise
+    
+    def _on_output(self, text, stream, log_callback, trace=NULL_TRACE, process=None):
+        """Pass captured output on to the log, counting lines per stream (stderr lines are the error signal)"""
+        lines = text.count("\n") or 1
+        OUTPUT_LINES.labels(stream).inc(lines)
+        process.stream_lines[stream] += lines
+        self.watchdog.touch(process)
+        self.liveness.touch(process)
+        if not trace.finished:
+            trace.mark(STAGE_FIRST_OUTPUT)
+            trace.finish()
+        log_callback(text, stream)
+    
+    def _supervise_async(self, process, exe_path, log_callback, completion_callback, key, trace, timeout):
+        """Hand a run started by the AsyncRunner to its event loop
+        The loop streams the output, enforces the run timeout and runs the usual completion
+        handler once the process is gone - a waiting run holds no thread."""
+        if log_callback:
+            on_output = lambda text, stream: self._on_output(text, stream, log_callback, trace, process)
+            on_exit = lambda: self._monitor_completion(process, exe_path, log_callback, completion_callback, key, trace)
+        else:
+            trace.finish()
+            on_output = None
+            on_exit = lambda: self._monitor_completion_simple(process, exe_path, completion_callback, key)
+        self.async_runner.supervise(
+            process,
+            on_output=on_output,
+            on_exit=on_exit,
+            timeout=timeout,
+            on_timeout=lambda: self._on_timeout(process, key, TIMEOUT_TOTAL, log_callback)
+        )
     
-    def _stream_output(self, pipe, log_callback, stream_name="stream"):
+    def _stream_output(self, pipe, log_callback, stream_name=STREAM_STDOUT, trace=NULL_TRACE, process=None):
         """Stream output from process (lightweight) with proper error handling"""
         try:
             for line in iter(pipe.readline, ''):
                 if line:
-                    log_callback(line)
+                    self._on_output(line, stream_name, log_callback, trace, process)
         except (IOError, OSError) as e:
             # Pipe closed or broken - process likely terminated
-            debug_print(f"Stream error in {stream_name}: {e}")
+            log.error("Stream error in %s: %s", stream_name, e)
         finally:
             # Ensure pipe is closed
             try:
@@ -359,89 +688,119 @@ class ProcessExecutor:
             except:
                 pass
     
-    def _monitor_completion(self, process, exe_path, log_callback, completion_callback=None):
-        """Monitor process completion with logging"""
+    def _monitor_completion(self, process, exe_path, log_callback, completion_callback=None, key=None, trace=NULL_TRACE, drained=None):
+        """Monitor process completion with logging
+        drained is set once the output reader has passed on the last output."""
+        key = key or exe_path
         try:
             process.wait()
-            if exe_path in self.running_processes:
-                del self.running_processes[exe_path]
-            log_callback(f"\n[+] Process completed (Exit code: {process.returncode})\n")
+            if drained is not None:
+                drained.wait(output_streams.DRAIN_TIMEOUT)  # A child that outlives the app may keep a pipe open
+            self.watchdog.unwatch(process)
+            self.liveness.untrack(process)
+            trace.finish("no_output")
+            self.registry.release(key, process)
+            errors = process.stream_lines[STREAM_STDERR]
+            summary = f", {errors} stderr line{'s' if errors != 1 else ''}" if errors else ""
+            log_callback(f"\n[+] Process completed (Exit code: {process.returncode}{summary})\n")
         except Exception as e:
-            debug_print(f"Error monitoring completion for {exe_path}: {e}")
+            log.error("Error monitoring completion for %s: %s", exe_path, e)
         finally:
             if completion_callback:
                 try:
-                    completion_callback()
+                    completion_callback(process.returncode)
                 except Exception as e:
-                    debug_print(f"Error in completion callback: {e}")
+                    log.exception("Error in completion callback: %s", e)
+            self._start_pending(key)
     
-    def _monitor_completion_simple(self, process, exe_path, completion_callback=None):
+    def _monitor_completion_simple(self, process, exe_path, completion_callback=None, key=None):
         """Monitor process completion without logging (lightweight)"""
+        key = key or exe_path
         try:
-            debug_print(f"[MONITOR] Starting completion monitor for {os.path.basename(exe_path)}")
+            log.debug("[MONITOR] Starting completion monitor for %s", os.path.basename(exe_path))
             process.wait()
-            debug_print(f"[MONITOR] Process {os.path.basename(exe_path)} completed with code {process.returncode}")
-            if exe_path in self.running_processes:
-                del self.running_processes[exe_path]
+            self.watchdog.unwatch(process)
+            self.liveness.untrack(process)
+            log.debug("[MONITOR] Process %s completed with code %s", os.path.basename(exe_path), process.returncode)
+            self.registry.release(key, process)
         except Exception as e:
-            debug_print(f"Error monitoring completion for {exe_path}: {e}")
+            log.error("Error monitoring completion for %s: %s", exe_path, e)
         finally:
             if completion_callback:
                 try:
-                    debug_print(f"[MONITOR] Calling completion callback for {os.path.basename(exe_path)}")
-                    completion_callback()
+                    log.debug("[MONITOR] Calling completion callback for %s", os.path.basename(exe_path))
+                    completion_callback(process.returncode)
                 except Exception as e:
-                    debug_print(f"Error in completion callback: {e}")
+                    log.exception("Error in completion callback: %s", e)
+            self._start_pending(key)
+    
+    def _on_timeout(self, process, key, reason, log_callback=None):
+        """Kill a run that exceeded its timeout and free its slot for the next run"""
+        RUN_TIMEOUTS.labels(reason).inc()
+        if log_callback:
+            what = "No output for too long" if reason == TIMEOUT_IDLE else "Run time limit reached"
+            log_callback(f"\n[x] {what} - terminating process tree\n")
+        self.kill_process_tree(process, reason=reason)
+        # The monitor thread may still be draining pipes - release the slot now
+        self.registry.release(key, process)
+    
+    def kill_process_tree(self, proc, timeout=2, reason="cancelled"):
+        """Terminate a process and all of its children (graceful, then forced)
+        The reason is kept on the process as kill_reason for the completion handler."""
+        if proc.poll() is not None:
+            return
+        proc.kill_reason = reason
+        
+        try:
+            # Use psutil to kill entire process tree
+            parent = psutil.Process(proc.pid)
+            children = parent.children(recursive=True)
+            
+            # Terminate children first
+            for child in children:
+                try:
+                    child.terminate()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            
+            # Terminate parent
+            parent.terminate()
+            
+            # Wait for graceful shutdown
+            gone, alive = psutil.wait_procs([parent] + children, timeout=timeout)
+            
+            # Force kill any processes still alive
+            for p in alive:
+                try:
+                    p.kill()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        except psutil.NoSuchProcess:
+            pass
+        except Exception as e:
+            log.error("Error terminating process tree: %s", e)
+            # Fallback to basic terminate
+            try:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            except:
+                pass
     
     def force_cleanup(self, exe_path):
         """Force cleanup of a process from tracking - kills entire process tree"""
         exe_path = os.path.normpath(exe_path)
-        if exe_path in self.running_processes:
-            proc = self.running_processes[exe_path]
+        for entry in self.registry.entries(exe_path):
+            if entry.process is None:
+                continue  # Still launching
             
             # Ensure process is actually dead - kill entire tree
-            if proc.poll() is None:
-                try:
-                    # Use psutil to kill entire process tree
-                    parent = psutil.Process(proc.pid)
-                    children = parent.children(recursive=True)
-                    
-                    # Terminate children first
-                    for child in children:
-                        try:
-                            child.terminate()
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            pass
-                    
-                    # Terminate parent
-                    parent.terminate()
-                    
-                    # Wait for graceful shutdown
-                    gone, alive = psutil.wait_procs([parent] + children, timeout=2)
-                    
-                    # Force kill any processes still alive
-                    for p in alive:
-                        try:
-                            p.kill()
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            pass
-                except psutil.NoSuchProcess:
-                    pass
-                except Exception as e:
-                    debug_print(f"Error terminating process tree: {e}")
-                    # Fallback to basic terminate
-                    try:
-                        proc.terminate()
-                        try:
-                            proc.wait(timeout=1)
-                        except subprocess.TimeoutExpired:
-                            proc.kill()
-                    except:
-                        pass
+            self.kill_process_tree(entry.process)
             
-            # Remove from tracking
-            if exe_path in self.running_processes:
-                del self.running_processes[exe_path]
+            # Remove from tracking (only if the slot still belongs to this process)
+            self.registry.release(exe_path, entry.process)
 
 
 class VerticalLogContainer:
@@ -500,15 +859,220 @@ class VerticalLogContainer:
         return None
 
 
-class LogTab(ctk.CTkScrollableFrame):
-    """Individual log tab for console tasks only (lightweight)"""
+class TaskLog:
+    """What the app needs from a task's log, whatever shows it: append_log, the process and close_process"""
     
-    def __init__(self, parent, task_name, on_close_callback=None, executor=None, exe_path=None):
+    def close_process(self):
+        """Gracefully terminate the running process (only if explicitly requested)"""
+        # Only terminate if process exists and we're not auto-closing
+        if self.process and not self.auto_closing:
+            try:
+                # Try graceful termination first
+                self.append_log(f"\n[!] Terminating process gracefully...\n")
+                self.process.kill_reason = "cancelled"
+                self.process.terminate()
+                
+                # Wait briefly for graceful shutdown
+                try:
+                    self.process.wait(timeout=1.0)
+                    self.append_log(f"[+] Process terminated successfully\n")
+                except subprocess.TimeoutExpired:
+                    # If graceful didn't work, force kill
+                    self.append_log(f"[!] Force killing process...\n")
+                    self.process.kill()
+                    self.process.wait()  # Wait for kill to complete
+                    self.append_log(f"[+] Process killed\n")
+                
+                # Force cleanup from executor's tracking
+                if self.executor and self.exe_path:
+                    self.executor.force_cleanup(self.exe_path)
+            except (OSError, PermissionError) as e:
+                self.append_log(f"\n[x] Error terminating process: {str(e)}\n")
+            except Exception as e:
+                log.error("Unexpected error terminating process: %s", e)
+        
+        # Call the callback to close the tab
+        if self.on_close_callback:
+            try:
+                self.on_close_callback()
+            except Exception as e:
+                log.error("Error in close callback: %s", e)
+
+
+class LogView(ctk.CTkFrame):
+    """A virtualized view of a MappedLog
+    
+    The textbox holds only the lines in view and the scrollbar spans the whole
+    log, so the widget costs the same for ten lines or ten million. Follows the
+    newest line until scrolled back; add_controls() puts a "jump to time" entry
+    and an End button in a header.
+    """
+    
+    def __init__(self, parent, source):
+        super().__init__(parent, fg_color="#0d0d0d", corner_radius=8)
+        
+        self.source = source
+        self.top = 0  # First line in view
+        self.dropped = source.dropped  # Lines the source had trimmed when top was set
+        self.follow = True  # Keep the newest line in view
+        self.render_pending = False
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y", pady=5)
+        
+        self.log_text = ctk.CTkTextbox(
+            self,
+            wrap="none",
+            font=("Consolas", 10),
+            fg_color="#0d0d0d",
+            border_width=0,
+            corner_radius=8,
+            activate_scrollbars=False
+        )
+        self.log_text.pack(side="left", fill="both", expand=True)
+        self.log_text.tag_config(STREAM_STDERR, foreground="#f87171")
+        self.line_height = tkfont.Font(font=self.log_text._textbox.cget("font")).metrics("linespace")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.log_text.bind(sequence, self.on_wheel)
+        self.log_text.bind("<Configure>", lambda e: self.schedule_render())
+    
+    def add_controls(self, header):
+        """Time entry and End button, packed from the right of header"""
+        end_btn = ctk.CTkButton(
+            header,
+            text="⤓ End",
+            width=50,
+            height=25,
+            corner_radius=4,
+            font=("Segoe UI", 10),
+            fg_color="#2d2d2d",
+            hover_color="#3d3d3d",
+            command=self.scroll_to_end
+        )
+        end_btn.pack(side="right", padx=(5, 0), pady=5)
+        
+        # Jump to the first line written at a time of day
+        self.time_entry = ctk.CTkEntry(
+            header,
+            width=70,
+            height=25,
+            corner_radius=4,
+            font=("Consolas", 10),
+            placeholder_text="HH:MM:SS"
+        )
+        self.time_entry.pack(side="right", padx=(5, 0), pady=5)
+        self.time_entry.bind("<Return>", lambda e: self.jump_to_time())
+        self.time_border = self.time_entry.cget("border_color")
+    
+    def set_source(self, source):
+        """Show another log, from its newest line"""
+        self.source = source
+        self.dropped = source.dropped
+        self.follow = True
+        self.render()
+    
+    def schedule_render(self):
+        """Redraw soon (any thread) - a burst of output costs one redraw per 50 ms"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.after(50, self.render)
+    
+    def visible_rows(self):
+        return max(1, self.log_text.winfo_height() // self.line_height)
+    
+    def render(self):
+        """Put the lines in view into the textbox and update the scrollbar"""
+        self.render_pending = False
+        if self.source.closed:
+            return
+        try:
+            total = len(self.source)
+            rows = self.visible_rows()
+            # Lines trimmed from the start of the log since the last draw move the rest up
+            self.top -= self.source.dropped - self.dropped
+            self.dropped = self.source.dropped
+            if self.follow:
+                self.top = total - rows
+            self.top = max(0, min(self.top, total - rows))
+            
+            self.log_text.configure(state="normal")
+            self.log_text.delete("1.0", "end")
+            for i, line in enumerate(self.source.lines(self.top, rows)):
+                prefix = "\n" if i else ""
+                if line.startswith(STDERR_MARK):
+                    self.log_text.insert("end", prefix + line[1:], STREAM_STDERR)
+                else:
+                    self.log_text.insert("end", prefix + line)
+            self.log_text.configure(state="disabled")
+            
+            if total > rows:
+                self.scrollbar.set(self.top / total, (self.top + rows) / total)
+            else:
+                self.scrollbar.set(0, 1)
+        except Exception as e:
+            log.error("Error drawing log: %s", e)
+    
+    def scroll_to(self, line):
+        """Show the log from line number `line`; following resumes once the last line is in view"""
+        self.top = max(0, line)
+        self.follow = self.top + self.visible_rows() >= len(self.source)
+        self.render()
+    
+    def scroll_to_end(self):
+        self.follow = True
+        self.render()
+    
+    def on_scrollbar(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units" | "pages")"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.source)))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+    
+    def on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_to(self.top + (-3 if up else 3))
+        return "break"  # Don't scroll the panel container as well
+    
+    def jump_to_time(self):
+        """Scroll to the first line written at the time of day in the entry (today, or yesterday if still to come)"""
+        text = self.time_entry.get().strip()
+        for fmt in ("%H:%M:%S", "%H:%M"):
+            try:
+                clock = datetime.strptime(text, fmt).time()
+                break
+            except ValueError:
+                continue
+        else:
+            self.time_entry.configure(border_color="#ef4444")
+            return
+        
+        self.time_entry.configure(border_color=self.time_border)
+        when = datetime.combine(datetime.now().date(), clock)
+        if when > datetime.now():
+            when -= timedelta(days=1)
+        self.scroll_to(self.source.line_at_time(when.timestamp()))
+
+
+class LogTab(TaskLog, ctk.CTkScrollableFrame):
+    """Individual log tab for console tasks only (lightweight)
+    
+    Output is spooled to a file (log_viewer.MappedLog) and shown through a
+    LogView, so a panel keeps its output (up to log_retention lines per stream)
+    in constant memory.
+    """
+    
+    def __init__(self, parent, task_name, on_close_callback=None, executor=None, exe_path=None, spool_path=None,
+                 retention=None):
         super().__init__(parent, fg_color="#1a1a1a")
         
         self.task_name = task_name
-        self.log_buffer = []  # Lightweight buffer
-        self.max_lines = 500  # Limit log size for performance
+        self.log = MappedLog(
+            spool_path or os.path.join(tempfile.gettempdir(), f"schedulerv2_{id(self)}.log"),
+            truncate=True,
+            limits=retention
+        )
         self.process = None  # Store process reference
         self.on_close_callback = on_close_callback
         self.executor = executor  # ProcessExecutor reference
@@ -541,80 +1105,147 @@ class LogTab(ctk.CTkScrollableFrame):
         close_btn.pack(side="right", padx=5, pady=5)
         
         # Log text widget
-        self.log_text = ctk.CTkTextbox(
-            self,
-            wrap="word",
-            font=("Consolas", 10),
-            fg_color="#0d0d0d",
-            border_width=0,
-            corner_radius=8
-        )
-        self.log_text.pack(fill="both", expand=True, padx=5, pady=5)
+        self.view = LogView(self, self.log)
+        self.view.pack(fill="both", expand=True, padx=5, pady=5)
+        self.view.add_controls(header)
         
         # Add initial message
         self.append_log(f"📋 Console Log: {task_name}\n")
         self.append_log(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
     
-    def append_log(self, text):
-        """Append text to log (thread-safe, memory-limited)"""
-        def _append():
-            try:
-                self.log_text.configure(state="normal")
-                self.log_text.insert("end", text)
-                
-                # Keep only last N lines for performance
-                content = self.log_text.get("1.0", "end-1c")
-                lines = content.split('\n')
-                if len(lines) > self.max_lines:
-                    # Calculate lines to remove
-                    lines_to_remove = len(lines) - self.max_lines
-                    self.log_text.delete("1.0", f"{lines_to_remove + 1}.0")
-                
-                self.log_text.see("end")
-                self.log_text.configure(state="disabled")
-            except Exception as e:
-                debug_print(f"Error appending log: {e}")
-        
-        # Ensure UI update happens on main thread
-        if threading.current_thread() is threading.main_thread():
-            _append()
-        else:
-            self.after(0, _append)
+    def append_log(self, text, stream=None):
+        """Append text to log (thread-safe)
+        The text goes to the spool file right away and the view is redrawn soon after.
+        stderr text is shown in red."""
+        LOG_LINES.inc(text.count("\n") or 1)
+        LOG_CHARS.inc(len(text))
+        self.log.append(text, stream)
+        self.view.schedule_render()
     
-    def close_process(self):
-        """Gracefully terminate the running process (only if explicitly requested)"""
-        # Only terminate if process exists and we're not auto-closing
-        if self.process and not self.auto_closing:
-            try:
-                # Try graceful termination first
-                self.append_log(f"\n[!] Terminating process gracefully...\n")
-                self.process.terminate()
-                
-                # Wait briefly for graceful shutdown
-                try:
-                    self.process.wait(timeout=1.0)
-                    self.append_log(f"[+] Process terminated successfully\n")
-                except subprocess.TimeoutExpired:
-                    # If graceful didn't work, force kill
-                    self.append_log(f"[!] Force killing process...\n")
-                    self.process.kill()
-                    self.process.wait()  # Wait for kill to complete
-                    self.append_log(f"[+] Process killed\n")
-                
-                # Force cleanup from executor's tracking
-                if self.executor and self.exe_path:
-                    self.executor.force_cleanup(self.exe_path)
-            except (OSError, PermissionError) as e:
-                self.append_log(f"\n[x] Error terminating process: {str(e)}\n")
-            except Exception as e:
-                debug_print(f"Unexpected error terminating process: {e}")
+    def destroy(self):
+        self.log.close(delete=True)
+        super().destroy()
+
+
+class CompactLogTask(TaskLog):
+    """A task's log in the compact view - no widgets of its own
+    
+    Output goes to the task's spool file (shown when the view is filtered to
+    the task) and, prefixed with the task name, to the view's shared log.
+    """
+    
+    def __init__(self, container, task_name, on_close_callback=None, executor=None, exe_path=None, spool_path=None):
+        self.container = container
+        self.task_name = task_name
+        self.log = MappedLog(spool_path, truncate=True, limits=container.retention)
+        self.prefix = f"[{task_name}] "
+        self.process = None
+        self.on_close_callback = on_close_callback
+        self.executor = executor
+        self.exe_path = exe_path
+        self.auto_closing = False
+    
+    def append_log(self, text, stream=None):
+        """Append text to log (thread-safe)"""
+        LOG_LINES.inc(text.count("\n") or 1)
+        LOG_CHARS.inc(len(text))
+        self.log.append(text, stream)
+        prefixed = "".join(self.prefix + line for line in text.splitlines(True))
+        self.container.shared.append(prefixed, stream)
+        self.container.view.schedule_render()
+
+
+class CompactLogContainer:
+    """Compact log view: every task's output in one LogView, filtered per task
+    
+    Same add/get/delete by name as VerticalLogContainer, but tasks get a
+    CompactLogTask instead of a panel, so the widget count stays the same
+    however many tasks are running ("log_view": "compact" in config.json).
+    """
+    
+    ALL_TASKS = "All tasks"
+    
+    def __init__(self, parent, spool_dir, retention=None):
+        self.spool_dir = spool_dir
+        self.retention = retention  # {stream: lines} kept per log (log_retention in config.json)
+        self.tasks = {}  # {task_name: CompactLogTask}
+        self.shared = MappedLog(os.path.join(spool_dir, "all_tasks.log"), truncate=True, limits=retention)
         
-        # Call the callback to close the tab
-        if self.on_close_callback:
-            try:
-                self.on_close_callback()
-            except Exception as e:
-                debug_print(f"Error in close callback: {e}")
+        frame = ctk.CTkFrame(parent, fg_color="#1a1a1a", corner_radius=8)
+        frame.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        header = ctk.CTkFrame(frame, fg_color="#1a1a1a")
+        header.pack(fill="x", padx=5, pady=(5, 0))
+        
+        self.filter_menu = ctk.CTkOptionMenu(
+            header,
+            values=[self.ALL_TASKS],
+            width=180,
+            height=25,
+            font=("Segoe UI", 11),
+            command=self.set_filter
+        )
+        self.filter_menu.pack(side="left", padx=5, pady=5)
+        
+        # Stops the run of the task the view is filtered to
+        self.stop_btn = ctk.CTkButton(
+            header,
+            text="✕",
+            width=25,
+            height=25,
+            corner_radius=4,
+            font=("Segoe UI", 10, "bold"),
+            fg_color="#ef4444",
+            hover_color="#dc2626",
+            state="disabled",
+            command=self.stop_selected
+        )
+        self.stop_btn.pack(side="right", padx=5, pady=5)
+        
+        self.view = LogView(frame, self.shared)
+        self.view.pack(fill="both", expand=True, padx=5, pady=5)
+        self.view.add_controls(header)
+    
+    def add_task(self, name, on_close_callback=None, executor=None, exe_path=None, spool_path=None):
+        if name in self.tasks:
+            return self.tasks[name]
+        task_log = CompactLogTask(
+            self, name, on_close_callback=on_close_callback, executor=executor, exe_path=exe_path,
+            spool_path=spool_path
+        )
+        self.tasks[name] = task_log
+        self.filter_menu.configure(values=[self.ALL_TASKS] + list(self.tasks))
+        return task_log
+    
+    def delete(self, name):
+        """Remove a task from the view"""
+        task_log = self.tasks.pop(name, None)
+        if task_log is None:
+            return
+        if self.filter_menu.get() == name:
+            self.filter_menu.set(self.ALL_TASKS)
+            self.set_filter(self.ALL_TASKS)
+        task_log.log.close(delete=True)
+        self.filter_menu.configure(values=[self.ALL_TASKS] + list(self.tasks))
+        
+        if not self.tasks:
+            # Nothing running - start the shared log afresh so it doesn't grow for the whole session
+            self.shared.close(delete=True)
+            self.shared = MappedLog(os.path.join(self.spool_dir, "all_tasks.log"), truncate=True, limits=self.retention)
+            self.view.set_source(self.shared)
+    
+    def get(self, name):
+        return self.tasks.get(name)
+    
+    def set_filter(self, choice):
+        task_log = self.tasks.get(choice)
+        self.stop_btn.configure(state="normal" if task_log else "disabled")
+        self.view.set_source(task_log.log if task_log else self.shared)
+    
+    def stop_selected(self):
+        task_log = self.tasks.get(self.filter_menu.get())
+        if task_log:
+            task_log.close_process()
 
 
 class AddTaskDialog(ctk.CTkToplevel):
@@ -764,6 +1395,118 @@ class AddTaskDialog(ctk.CTkToplevel):
         self.destroy()
 
 
+class LogSearchDialog(ctk.CTkToplevel):
+    """Search the stored output of past runs by text, task and time range"""
+    
+    RANGES = {"Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400, "All time": None}
+    
+    def __init__(self, parent, log_store, tasks):
+        super().__init__(parent)
+        
+        self.log_store = log_store
+        self.task_ids = {"All tasks": None}
+        self.task_ids.update((task["name"], task["id"]) for task in tasks)
+        
+        # Configure window
+        self.title("Search Logs")
+        self.geometry("760x520")
+        self.transient(parent)
+        
+        content = ctk.CTkFrame(self, fg_color="transparent")
+        content.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Query row
+        query_frame = ctk.CTkFrame(content, fg_color="transparent")
+        query_frame.pack(fill="x", pady=(0, 10))
+        
+        self.query_entry = ctk.CTkEntry(query_frame, height=35, corner_radius=8, placeholder_text="Search text")
+        self.query_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.query_entry.bind("<Return>", lambda event: self.search())
+        
+        self.task_menu = ctk.CTkOptionMenu(query_frame, values=list(self.task_ids), width=150, height=35)
+        self.task_menu.pack(side="left", padx=(0, 10))
+        
+        self.range_menu = ctk.CTkOptionMenu(query_frame, values=list(self.RANGES), width=130, height=35)
+        self.range_menu.set("Last 24 hours")
+        self.range_menu.pack(side="left", padx=(0, 10))
+        
+        search_btn = ctk.CTkButton(query_frame, text="Search", width=80, height=35, corner_radius=8, command=self.search)
+        search_btn.pack(side="right")
+        
+        self.summary_label = ctk.CTkLabel(content, text="", font=("Segoe UI", 11), text_color="#94a3b8")
+        self.summary_label.pack(anchor="w", pady=(0, 5))
+        
+        self.results = ctk.CTkScrollableFrame(content, fg_color="#1a1a1a", corner_radius=8)
+        self.results.pack(fill="both", expand=True)
+        
+        self.query_entry.focus_set()
+    
+    def search(self):
+        """Run the search and list the matching log segments"""
+        for child in self.results.winfo_children():
+            child.destroy()
+        
+        seconds = self.RANGES[self.range_menu.get()]
+        started = time.perf_counter()
+        hits = self.log_store.search(
+            self.query_entry.get(),
+            task_id=self.task_ids.get(self.task_menu.get()),
+            since=time.time() - seconds if seconds else None
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        self.summary_label.configure(text=f"{len(hits)} match{'es' if len(hits) != 1 else ''} in {elapsed:.0f} ms")
+        
+        for hit in hits:
+            row = ctk.CTkFrame(self.results, fg_color="#0d0d0d", corner_radius=8)
+            row.pack(fill="x", pady=3, padx=3)
+            
+            when = datetime.fromtimestamp(hit["started"]).strftime('%Y-%m-%d %H:%M:%S')
+            ctk.CTkLabel(
+                row,
+                text=f"{when}  {hit['task_name'] or hit['task_id']}  [{hit['stream']}]",
+                font=("Segoe UI", 11, "bold"),
+                text_color="#f87171" if hit["stream"] == STREAM_STDERR else "#ffffff"
+            ).pack(anchor="w", padx=10, pady=(5, 0))
+            
+            ctk.CTkLabel(
+                row,
+                text=" ".join(hit["snippet"].split()),
+                font=("Consolas", 10),
+                text_color="#94a3b8",
+                wraplength=560,
+                justify="left"
+            ).pack(side="left", anchor="w", padx=10, pady=(0, 5))
+            
+            ctk.CTkButton(
+                row,
+                text="Export",
+                width=70,
+                height=28,
+                corner_radius=6,
+                fg_color="#2d2d2d",
+                hover_color="#3d3d3d",
+                command=lambda run_id=hit["run_id"]: self.export(run_id)
+            ).pack(side="right", padx=10, pady=5)
+    
+    def export(self, run_id):
+        """Save a run's whole log to a text file"""
+        info = self.log_store.run_info(run_id) or {}
+        when = datetime.fromtimestamp(info["started"]).strftime('%Y%m%d_%H%M%S') if info.get("started") else str(run_id)
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Log",
+            defaultextension=".log",
+            initialfile=f"{info.get('task_name') or 'run'}_{when}.log",
+            filetypes=[("Log files", "*.log"), ("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            self.log_store.export_run(run_id, filename)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not export the log:\n{e}", parent=self)
+
+
 class SchedulerApp(ctk.CTk):
     """Main application window"""
     
@@ -776,26 +1519,283 @@ class SchedulerApp(ctk.CTk):
         
         # Initialize managers
         self.task_manager = TaskManager()
+        setup_logging(
+            os.path.join(os.path.dirname(self.task_manager.filename), "logs"),
+            **logging_options(self.task_manager.config)
+        )
         self.executor = ProcessExecutor()
-        self.scheduler = BackgroundScheduler()
-        self.scheduler.start()
+        self.retries = RetryTracker()
+        self.run_history = RunHistory(os.path.join(os.path.dirname(self.task_manager.filename), "logs", "run_history.jsonl"))
+        # Log panels spool to logs/live/<pid>, so instances sharing the folder keep apart
+        live_dir = os.path.join(os.path.dirname(self.task_manager.filename), "logs", "live")
+        self.remove_stale_spools(live_dir)
+        self.spool_dir = os.path.join(live_dir, str(os.getpid()))
+        self.log_retention = dict(DEFAULT_RETENTION, **(self.task_manager.config.get("log_retention") or {}))
+        # Searchable output of every console run (log_store in config.json), compressed into
+        # logs/archive when it finishes and dropped from the search index after log_search_days
+        self.log_store = None
+        config = self.task_manager.config
+        if config.get("log_store", True):
+            logs_dir = os.path.join(os.path.dirname(self.task_manager.filename), "logs")
+            archive = LogArchive(os.path.join(logs_dir, "archive")) if config.get("log_archive", True) else None
+            max_mb = config.get("log_archive_max_mb", 2048)
+            self.log_store = LogStore(
+                os.path.join(logs_dir, "logs.db"),
+                archive=archive,
+                search_days=config.get("log_search_days", 7),
+                archive_days=config.get("log_archive_days", 30),
+                archive_max_bytes=max_mb * 1024 * 1024 if max_mb else None
+            )
+        self.dag = DagScheduler(
+            launch=self.launch_dependent_task,
+            max_parallel=self.task_manager.config.get("dag_max_parallel", 4),
+            on_report=self.on_dag_report
+        )
+        self.scheduler = None  # Started by start_scheduler() once the window is up
+        self.job_event_names = {}
+        self.first_run_logged = False
+        self.election = None  # Set by start_scheduler() when leader_election is on
+        self.file_watcher = create_file_watcher()
+        self.scanned_watches = set()  # File-triggered tasks whose waiting files were already checked (watch_existing)
+        
+        # Launch latency tracing - optional Chrome trace file in logs/
+        config = self.task_manager.config
+        self.tracer = LaunchTracer(
+            trace_file=os.path.join(os.path.dirname(self.task_manager.filename), "logs", "launch_trace.json")
+            if config.get("launch_trace_file") else None,
+            enabled=config.get("launch_tracing", True),
+            on_finish=self.on_launch_traced
+        )
+        
+        # Warm Python workers for .py tasks
+        pool_size = config.get("python_pool_size", 0)
+        if pool_size:
+            interpreter = find_interpreter(config.get("python_interpreter"))
+            if interpreter:
+                self.executor.python_pool = PythonWorkerPool(
+                    interpreter, size=pool_size, preload=config.get("python_pool_preload", [])
+                )
+                self.executor.python_pool.start()
+            else:
+                log.warning("python_pool_size is set but no Python interpreter was found (set python_interpreter)")
+        
+        # Gauges are computed only when the endpoint is scraped
+        RUNNING_PROCESSES.set_function(lambda: len(self.executor.running_snapshot()))
+        PENDING_RUNS.set_function(lambda: len(self.executor.pending_runs))
+        for state in LIVE_STATES:
+            RUN_LIVENESS.labels(state).set_function(lambda state=state: self.executor.liveness.count(state))
+        self.executor.liveness.stall_after = config.get("stall_after", self.executor.liveness.stall_after)
+        self.executor.capture_mode = config.get("capture_mode", CAPTURE_PIPE)
+        self.executor.set_backend(config.get("executor_backend", BACKEND_THREADS))
+        self.executor.liveness.on_change = self.on_liveness_change
+        self.metrics_server = None
+        metrics_port = self.task_manager.config.get("metrics_port")
+        if metrics_port:
+            try:
+                self.metrics_server = metrics.start_metrics_server(metrics_port)
+            except (OSError, ValueError) as e:
+                log.warning("Could not start metrics endpoint on port %s: %s", metrics_port, e)
+        
+        # Cluster coordinator - tasks with "run_on": "cluster" are pulled by worker agents (cluster.py)
+        self.coordinator = None
+        cluster_port = config.get("cluster_port")
+        if cluster_port:
+            from cluster import Coordinator
+            token = config.get("cluster_token", "")
+            if not token:
+                log.warning("cluster_token is not set - the coordinator only accepts local workers")
+            self.coordinator = Coordinator(
+                port=cluster_port,
+                token=token,
+                host="0.0.0.0" if token else "127.0.0.1",
+                lease_seconds=config.get("cluster_lease_seconds", 15),
+                on_started=self.on_remote_started,
+                on_output=self.on_remote_output,
+                on_finished=self.on_remote_finished
+            )
+            try:
+                self.coordinator.start()
+            except OSError as e:
+                log.warning("Could not start cluster coordinator on port %s: %s", cluster_port, e)
+                self.coordinator = None
         
         # UI components
         self.task_rows = {}
         self.log_tabs = {}
-        self.heartbeat_threads = {}  # Track heartbeat threads per task
         self.selected_task_id = None
         self.scheduler_paused = False
+        self.missed_while_paused = {}  # {task_id: scheduled runs skipped while paused}
+        self.catchup_remaining = {}  # {task_id: catch-up runs still to start}
+        self.missed_files = {}  # {task_id: files that arrived while the task was running}
+        self.queued_remote = {}  # {task_id: True} - cluster runs waiting for the active one (queue overlap policy)
         self.control_button = None
+        self.row_stream = iter(())  # Tasks still waiting for their row
+        self.rows_logged = False
         
         # Build UI
         self.build_ui()
         
-        # Load existing tasks
+        # Load existing tasks - rows are built in batches once the window is up
         self.load_tasks()
         
         # Handle window close
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Import APScheduler and schedule the tasks after the first paint
+        self.after_idle(self.start_scheduler)
+    
+    def start_scheduler(self):
+        """Create the background scheduler and schedule every enabled task"""
+        window_ready = time.perf_counter()
+        # Interval jobs live in jobs.db, so they survive a restart; their target is
+        # job_store.fire_task(task_id), which comes back to run_scheduled_task()
+        self.job_store = job_store.SQLiteJobStore(os.path.join(os.path.dirname(self.task_manager.filename), "jobs.db"))
+        job_store.set_task_runner(self.run_scheduled_task)
+        self.scheduler = aps_background.BackgroundScheduler(jobstores={"default": self.job_store})
+        self.job_event_names = {getattr(aps_events, name): label for name, label in JOB_EVENT_NAMES.items()}
+        mask = 0
+        for code in self.job_event_names:
+            mask |= code
+        self.scheduler.add_listener(self.on_job_event, mask)
+        
+        # Only the instance holding the lease schedules - a second copy on the same
+        # tasks.json stands by and takes over if the leader goes away
+        config = self.task_manager.config
+        if config.get("leader_election", True):
+            self.election = LeaderElection(
+                os.path.join(os.path.dirname(self.task_manager.filename), "scheduler_lease.db"),
+                lease_seconds=config.get("leader_lease_seconds", 10),
+                on_elected=lambda: self.after(0, self.on_elected),
+                on_demoted=lambda: self.after(0, self.on_demoted)
+            )
+            self.election.start()
+            self.set_read_only(not self.is_active())
+            self.show_scheduler_status()
+        
+        # Jobs added before start() are queued and registered in one pass when it starts,
+        # instead of waking the scheduler thread for every task. A standby starts paused -
+        # jobs.db is shared with the leader, whose jobs it must not fire.
+        with self.job_store.batch():
+            self.schedule_all()
+            self.scheduler.start(paused=not self.is_active())
+        self.record_next_runs()
+        
+        lazy = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, (seconds, _) in sorted(load_times().items()))
+        log.info(
+            "Startup: first window %.0f ms, scheduler ready %.0f ms after import (lazy loads: %s)",
+            (window_ready - STARTUP_BEGIN) * 1000, (time.perf_counter() - STARTUP_BEGIN) * 1000, lazy or "none"
+        )
+    
+    def schedule_all(self):
+        """Bring the job store in line with tasks.json and schedule every enabled task
+        
+        A stored job that still matches its task (same interval and misfire options,
+        next fire time still ahead) is kept as it is. Other enabled tasks are scheduled,
+        resuming on the stored job's cadence if there was one, else on next_run from
+        tasks.json. Jobs of deleted, disabled, dependent and file-triggered tasks are
+        removed. All of it is one job store transaction.
+        """
+        if not self.is_active():
+            return
+        stored = self.job_store.job_states()
+        keep = set()
+        kept = 0
+        with self.job_store.batch():
+            for task in self.task_manager.tasks:
+                if not task.get("enabled", True):
+                    continue
+                job_id = f"task_{task['id']}"
+                state = stored.get(job_id)
+                if self.needs_interval_job(task):
+                    keep.add(job_id)
+                    if self.job_matches_task(task, state):
+                        kept += 1
+                        continue
+                    if state and state.get("next_run_time"):
+                        # The store is written as jobs fire - fresher than tasks.json
+                        task["next_run"] = format_time(state["next_run_time"])
+                self.schedule_task(task, resume=True)
+            
+            removed = [job_id for job_id in stored if job_id not in keep]
+            self.job_store.remove_jobs(removed)
+        log.info(
+            "Job store: %d jobs kept, %d scheduled, %d removed",
+            kept, len(keep) - kept, len(removed)
+        )
+    
+    def needs_interval_job(self, task):
+        """Dependent tasks are started by their upstream tasks and file-triggered tasks by the file watcher"""
+        return not self.dag.has_dependencies(task["id"]) and get_trigger_type(task) != TRIGGER_FILE
+    
+    def job_matches_task(self, task, state):
+        """True if a stored job (state dict from the job store) still fires the task as configured and isn't overdue"""
+        if not state or state.get("next_run_time") is None:
+            return False
+        options = job_misfire_options(task)
+        return (
+            state.get("func") == job_store.JOB_TARGET
+            and state.get("args") == (task["id"],)
+            and getattr(state.get("trigger"), "interval", None) == timedelta(minutes=task["interval"])
+            and state.get("coalesce") == options["coalesce"]
+            and state.get("misfire_grace_time") == options["misfire_grace_time"]
+            and state["next_run_time"] > datetime.now(state["next_run_time"].tzinfo)
+        )
+    
+    def is_active(self):
+        """True if this instance schedules tasks (leader, or leader election is off)"""
+        return self.election is None or self.election.is_leader
+    
+    def on_elected(self):
+        """Took over the leader lease - reload what the previous leader saved and start scheduling"""
+        self.set_read_only(False)
+        self.task_manager.tasks = self.task_manager.load_tasks()
+        self.dag.set_tasks(self.task_manager.tasks)
+        self.refresh_task_list()
+        self.schedule_all()
+        self.record_next_runs()
+        self.scheduler.resume()
+        self.show_scheduler_status()
+    
+    def on_demoted(self):
+        """Lost the leader lease - stop firing jobs, another instance has taken over
+        The jobs stay in jobs.db: the new leader fires them."""
+        if self.scheduler:
+            self.scheduler.pause()
+        for task in self.task_manager.tasks:
+            self.file_watcher.unwatch(task["id"])
+        self.set_read_only(True)
+        self.show_scheduler_status()
+    
+    def set_read_only(self, read_only):
+        """Standby mode: tasks can be viewed and executed, but not added, edited, toggled or deleted
+        The leader owns tasks.json and rewrites it from memory, so a standby's edits would be lost."""
+        self.task_manager.read_only = read_only
+        state = "disabled" if read_only else "normal"
+        for button in self.edit_buttons:
+            button.configure(state=state)
+        for row in self.task_rows.values():
+            row["checkbox"].configure(state=state)
+    
+    def refuse_standby_edit(self):
+        """Tell the user why a standby can't change tasks
+        Returns: True if this instance is a standby (the edit must not happen)"""
+        if self.is_active():
+            return False
+        holder = self.election.holder()
+        where = f" on {holder['host']}" if holder else ""
+        messagebox.showinfo("Standby", f"This instance is on standby and read-only.\n\nEdit tasks on the leader{where}.")
+        return True
+    
+    def show_scheduler_status(self):
+        """Status bar text: running, paused or standby"""
+        if not self.is_active():
+            holder = self.election.holder()
+            where = f" - leader on {holder['host']} (PID {holder['pid']})" if holder else ""
+            self.status_label.configure(text=f"◌ Standby{where}", text_color="#94a3b8")
+        elif self.scheduler_paused:
+            self.status_label.configure(text="⏸ Scheduler Paused", text_color="#fbbf24")
+        else:
+            self.status_label.configure(text="● Scheduler Running", text_color="#4ade80")
     
     def build_ui(self):
         """Build the user interface"""
@@ -904,6 +1904,7 @@ class SchedulerApp(ctk.CTk):
             command=self.delete_task
         )
         delete_btn.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.edit_buttons = [add_btn, edit_btn, delete_btn]  # Disabled on a standby (set_read_only)
         
         execute_btn = ctk.CTkButton(
             action_frame,
@@ -929,8 +1930,25 @@ class SchedulerApp(ctk.CTk):
             font=("Segoe UI", 20, "bold")
         ).pack(side="left", anchor="w")
         
-        # Vertical log container (stacks logs vertically)
-        self.log_container = VerticalLogContainer(right_panel)
+        if self.log_store:
+            search_btn = ctk.CTkButton(
+                log_header,
+                text="Search Logs",
+                width=110,
+                height=36,
+                corner_radius=8,
+                font=("Segoe UI", 12),
+                fg_color="#2d2d2d",
+                hover_color="#3d3d3d",
+                command=self.open_log_search
+            )
+            search_btn.pack(side="right", anchor="e")
+        
+        # Vertical log container (stacks logs vertically), or one shared view in compact mode
+        if self.task_manager.config.get("log_view") == "compact":
+            self.log_container = CompactLogContainer(right_panel, self.spool_dir, self.log_retention)
+        else:
+            self.log_container = VerticalLogContainer(right_panel)
         
         # Status bar
         status_bar = ctk.CTkFrame(right_panel, fg_color="#1a1a1a", height=60, corner_radius=0)
@@ -962,7 +1980,7 @@ class SchedulerApp(ctk.CTk):
         )
         self.control_button.pack(side="right", padx=20, pady=10)
     
-    def add_task_row(self, task):
+    def add_task_row(self, task, update_scrollbar=True):
         """Add a task row to the table"""
         row = ctk.CTkFrame(
             self.task_list,
@@ -990,7 +2008,8 @@ class SchedulerApp(ctk.CTk):
             border_width=1,
             fg_color="#00A6FF",
             hover_color="#0090DD",
-            command=lambda: self.toggle_task_enabled(task["id"], checkbox_var.get())
+            command=lambda: self.toggle_task_enabled(task["id"], checkbox_var.get()),
+            state="disabled" if self.task_manager.read_only else "normal"
         )
         checkbox.pack(side="left", padx=(15, 5))
         
@@ -1008,6 +2027,10 @@ class SchedulerApp(ctk.CTk):
         # Format interval as time
         interval_min = task["interval"]
         time_str = f"{interval_min} min" if interval_min < 60 else f"{interval_min // 60}h {interval_min % 60}m"
+        if self.dag.has_dependencies(task["id"]):
+            time_str = "After deps"
+        elif get_trigger_type(task) == TRIGGER_FILE:
+            time_str = "On file"
         
         time_label = ctk.CTkLabel(
             row,
@@ -1041,7 +2064,8 @@ class SchedulerApp(ctk.CTk):
         }
         
         # Update scrollbar visibility
-        self.update_scrollbar_visibility()
+        if update_scrollbar:
+            self.update_scrollbar_visibility()
     
     def update_scrollbar_visibility(self):
         """Show/hide scrollbar based on content size"""
@@ -1062,7 +2086,7 @@ class SchedulerApp(ctk.CTk):
             # Ignore errors if canvas/scrollbar not ready
             pass
         except Exception as e:
-            debug_print(f"Unexpected error updating scrollbar: {e}")
+            log.error("Unexpected error updating scrollbar: %s", e)
     
     def select_task(self, task_id):
         """Select a task"""
@@ -1077,6 +2101,8 @@ class SchedulerApp(ctk.CTk):
     
     def add_task(self):
         """Add a new task"""
+        if self.refuse_standby_edit():
+            return
         dialog = AddTaskDialog(self, task_manager=self.task_manager)
         self.wait_window(dialog)
         
@@ -1086,11 +2112,14 @@ class SchedulerApp(ctk.CTk):
                 dialog.result["path"],
                 dialog.result["interval"]
             )
+            self.dag.set_tasks(self.task_manager.tasks)
             self.add_task_row(task)
             self.schedule_task(task)
     
     def edit_task(self):
         """Edit selected task"""
+        if self.refuse_standby_edit():
+            return
         if not self.selected_task_id:
             messagebox.showwarning("Warning", "Please select a task to edit")
             return
@@ -1113,7 +2142,11 @@ class SchedulerApp(ctk.CTk):
             )
             
             # Reschedule
-            self.scheduler.remove_job(f"task_{task['id']}")
+            self.dag.set_tasks(self.task_manager.tasks)
+            try:
+                self.scheduler.remove_job(f"task_{task['id']}")
+            except:
+                pass  # Dependent tasks have no interval job
             self.schedule_task(updated_task)
             
             # Refresh UI
@@ -1121,6 +2154,8 @@ class SchedulerApp(ctk.CTk):
     
     def delete_task(self):
         """Delete selected task and its log panel"""
+        if self.refuse_standby_edit():
+            return
         if not self.selected_task_id:
             messagebox.showwarning("Warning", "Please select a task to delete")
             return
@@ -1133,6 +2168,7 @@ class SchedulerApp(ctk.CTk):
                 self.scheduler.remove_job(f"task_{task_id}")
             except:
                 pass
+            self.file_watcher.unwatch(task_id)
             
             # Remove log tab if it exists
             if task_id in self.log_tabs:
@@ -1147,11 +2183,16 @@ class SchedulerApp(ctk.CTk):
             
             # Remove from manager
             self.task_manager.delete_task(task_id)
+            self.dag.set_tasks(self.task_manager.tasks)
             
             # Refresh UI
             self.refresh_task_list()
             self.selected_task_id = None
     
+    def open_log_search(self):
+        """Open the log search window"""
+        LogSearchDialog(self, self.log_store, self.task_manager.tasks)
+    
     def execute_task(self):
         """Execute selected task immediately"""
         if not self.selected_task_id:
@@ -1171,19 +2212,49 @@ class SchedulerApp(ctk.CTk):
         self.task_rows.clear()
         
         # Reload tasks
-        for task in self.task_manager.tasks:
-            self.add_task_row(task)
+        self.stream_task_rows(self.task_manager.tasks)
+    
+    def stream_task_rows(self, tasks):
+        """Build the rows for tasks a batch per idle callback, so the window stays responsive
+        while a long task list fills in"""
+        self.row_stream = iter(list(tasks))
+        self.after_idle(self.add_row_batch)
+    
+    def add_row_batch(self):
+        batch = list(itertools.islice(self.row_stream, TASK_ROW_BATCH))
+        for task in batch:
+            if task["id"] not in self.task_rows:  # Added meanwhile (add_task)
+                self.add_task_row(task, update_scrollbar=False)
+        self.update_scrollbar_visibility()
+        
+        if len(batch) == TASK_ROW_BATCH:
+            self.after_idle(self.add_row_batch)
+        elif not self.rows_logged:
+            self.rows_logged = True
+            log.info("Startup: %d task rows %.0f ms after import", len(self.task_rows), (time.perf_counter() - STARTUP_BEGIN) * 1000)
     
     def load_tasks(self):
-        """Load and schedule all tasks"""
-        for task in self.task_manager.tasks:
-            self.add_task_row(task)
-            # Only schedule enabled tasks
-            if task.get("enabled", True):
-                self.schedule_task(task)
+        """Load all tasks into the task list"""
+        # Build the dependency graph first - dependent tasks are not interval-scheduled
+        cycle = self.dag.set_tasks(self.task_manager.tasks)
+        if cycle:
+            names = {t["id"]: t["name"] for t in self.task_manager.tasks}
+            cycle_text = " → ".join(str(names.get(task_id, task_id)) for task_id in cycle)
+            self.after(500, lambda: messagebox.showwarning(
+                "Dependency Cycle",
+                f"Task dependencies form a cycle and were ignored for these tasks:\n\n{cycle_text}"
+            ))
+        
+        # Rows only - start_scheduler() schedules the tasks once the window is up
+        self.stream_task_rows(self.task_manager.tasks)
     
     def toggle_task_enabled(self, task_id, enabled):
         """Toggle task enabled/disabled state"""
+        if self.refuse_standby_edit():
+            if task_id in self.task_rows:
+                self.task_rows[task_id]["checkbox_var"].set(not enabled)
+            return
+        
         # Update task manager
         self.task_manager.toggle_enabled(task_id, enabled)
         
@@ -1202,7 +2273,8 @@ class SchedulerApp(ctk.CTk):
         if task:
             job_id = f"task_{task_id}"
             if enabled:
-                # Schedule the task
+                # Schedule the task - a fresh start for the circuit breaker
+                self.retries.reset(task_id)
                 self.schedule_task(task)
             else:
                 # Unschedule the task
@@ -1210,54 +2282,296 @@ class SchedulerApp(ctk.CTk):
                     self.scheduler.remove_job(job_id)
                 except:
                     pass  # Job might not exist
+                self.file_watcher.unwatch(task_id)
+    
+    def remove_stale_spools(self, live_dir):
+        """Delete the spool folders of instances that are no longer running (crashed or killed)"""
+        try:
+            names = os.listdir(live_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(live_dir, name)
+            if name.isdigit() and int(name) != os.getpid() and not psutil.pid_exists(int(name)):
+                shutil.rmtree(path, ignore_errors=True)
     
     def create_log_panel(self, task_name, task_id, exe_path=None):
-        """Create a vertical log panel"""
-        panel = self.log_container.add(task_name)
+        """Create a vertical log panel (or the task's entry in the compact view)"""
+        spool_path = os.path.join(self.spool_dir, f"task_{task_id}.log")
         
         # Create callback for when close button is clicked
         def on_panel_close():
             self.auto_close_panel(task_id)
         
+        if isinstance(self.log_container, CompactLogContainer):
+            log_panel = self.log_container.add_task(
+                task_name,
+                on_close_callback=on_panel_close,
+                executor=self.executor,
+                exe_path=exe_path,
+                spool_path=spool_path
+            )
+            self.log_tabs[task_id] = log_panel
+            return log_panel
+        
+        panel = self.log_container.add(task_name)
         log_panel = LogTab(
             panel, 
             task_name, 
             on_close_callback=on_panel_close,
             executor=self.executor,
-            exe_path=exe_path
+            exe_path=exe_path,
+            spool_path=spool_path,
+            retention=self.log_retention
         )
         log_panel.pack(fill="both", expand=True)
         self.log_tabs[task_id] = log_panel
         return log_panel
     
-    def schedule_task(self, task):
-        """Schedule a task for automatic execution"""
+    def schedule_task(self, task, resume=False):
+        """Schedule a task for automatic execution
+        
+        With resume=True the task continues on the cadence of its persisted next_run,
+        and runs that were due while the app was closed go through its misfire policy.
+        """
+        if self.scheduler is None or not self.is_active():
+            return  # start_scheduler() / on_elected() schedule every enabled task
+        
         job_id = f"task_{task['id']}"
         
-        self.scheduler.add_job(
-            func=lambda: self.run_task(task),
-            trigger=IntervalTrigger(minutes=task["interval"]),
+        if not self.needs_interval_job(task):
+            try:
+                self.scheduler.remove_job(job_id)
+            except:
+                pass
+            if get_trigger_type(task) == TRIGGER_FILE and not self.dag.has_dependencies(task["id"]):
+                self.watch_task_files(task)
+            else:
+                self.file_watcher.unwatch(task["id"])
+            return
+        
+        self.file_watcher.unwatch(task["id"])
+        
+        start_date, missed = plan_resume(task) if resume else (None, 0)
+        
+        job = self.scheduler.add_job(
+            func=job_store.fire_task,
+            args=(task["id"],),
+            trigger=aps_interval.IntervalTrigger(minutes=task["interval"], start_date=start_date),
             id=job_id,
-            replace_existing=True
+            replace_existing=True,
+            **job_misfire_options(task)
         )
+        if not job.pending:  # Queued jobs get their fire time when the scheduler starts
+            self.task_manager.set_next_run(task["id"], format_time(job.next_run_time))
+        
+        if missed:
+            # Start catch-up runs once the main loop is running
+            self.after(0, lambda: self.start_catchup(task, missed))
+    
+    def run_scheduled_task(self, task_id):
+        """Interval job target (through job_store.fire_task) - runs the task as it is now"""
+        task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+        if task is None or not task.get("enabled", True):
+            log.warning("Job fired for a deleted or disabled task %s - removing it", task_id)
+            try:
+                self.scheduler.remove_job(f"task_{task_id}")
+            except Exception:
+                pass
+            return
+        self.run_task(task, scheduled=True)
+    
+    def watch_task_files(self, task):
+        """Start watching a file-triggered task's directory
+        watch_dir and watch_pattern are required - the task's own folder with "*" would see every
+        file the task writes and start it again. Waiting files trigger a run only with watch_existing,
+        and only the first time the task is watched, not on every re-watch (edit, toggle, election)."""
+        watch_dir = task.get("watch_dir")
+        patterns = task.get("watch_pattern")
+        if not watch_dir or not patterns:
+            log.warning("[WATCH] Task %s has a file trigger without watch_dir and watch_pattern - not watching", task["id"])
+            self.file_watcher.unwatch(task["id"])
+            return
+        fire_existing = task.get("watch_existing", False) and task["id"] not in self.scanned_watches
+        try:
+            self.file_watcher.watch(
+                task["id"],
+                watch_dir,
+                patterns=patterns,
+                callback=self.on_watched_files,
+                debounce=task.get("debounce", 0.5),
+                fire_existing=fire_existing,
+                ignore=[os.path.basename(task["path"])]
+            )
+            self.scanned_watches.add(task["id"])
+            log.info("[WATCH] Task %s watching %s (%s)", task['id'], watch_dir, self.file_watcher.backend)
+        except (OSError, TypeError, ValueError) as e:
+            log.warning("Error watching %s for task %s: %s", watch_dir, task['id'], e)
     
-    def run_task(self, task):
-        """Run a task (lightweight - only log console apps)"""
+    def on_watched_files(self, task_id, files):
+        """Run a file-triggered task when matching files appeared (watcher thread)"""
+        task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+        if not task or not task.get("enabled", True):
+            return
+        log.debug("[WATCH] %s new file(s) for task %s", len(files), task_id)
+        if self.run_task(task, scheduled=True, source="file"):
+            return
+        if task.get("overlap_policy", OVERLAP_SKIP) == OVERLAP_QUEUE or not self.task_running(task):
+            return  # The queued run picks the files up, or the run was not due (paused, standby)
+        # Skipped because the task is still running - run again for these files once it has finished
+        self.missed_files.setdefault(task_id, set()).update(files)
+        if not self.task_running(task):
+            self.continue_file_trigger(task_id)  # It finished in the meantime
+    
+    def task_running(self, task):
+        """True while a run of the task is going (locally or on a cluster worker)"""
+        if task.get("run_on") == "cluster" and self.coordinator:
+            return bool(self.coordinator.active_runs(task["id"]))
+        key = self.executor.slot_key(task["path"], task["id"], task.get("overlap_policy", OVERLAP_SKIP))
+        return self.executor.registry.is_running(key)
+    
+    def continue_file_trigger(self, task_id):
+        """Run a file-triggered task again for files that arrived during its last run"""
+        files = self.missed_files.pop(task_id, None)
+        if files:
+            threading.Thread(target=self.on_watched_files, args=(task_id, sorted(files)), daemon=True).start()
+    
+    def on_job_event(self, event):
+        """APScheduler listener - counts job events and how late runs start"""
+        JOB_EVENTS.labels(self.job_event_names.get(event.code, "other")).inc()
+        scheduled = getattr(event, "scheduled_run_time", None)
+        if scheduled is not None and event.code != aps_events.EVENT_JOB_MISSED:
+            JOB_LATENESS.observe(max(0.0, (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()))
+    
+    def on_launch_traced(self, trace):
+        """Feed finished launch traces into the stage latency histogram"""
+        for stage, _, duration in trace.spans():
+            LAUNCH_STAGE_SECONDS.labels(stage).observe(duration)
+    
+    def record_next_runs(self):
+        """Copy every job's next fire time into its task (read from the job store in one query)"""
+        next_runs = self.job_store.next_run_times()
+        for task in self.task_manager.tasks:
+            next_run = next_runs.get(f"task_{task['id']}")
+            if next_run is not None:
+                task["next_run"] = format_time(next_run.astimezone())
+    
+    def record_next_run(self, task_id):
+        """Copy the job's next fire time into the task so it survives a restart
+        Returns: the job's next fire time (None if the task has no interval job)"""
+        if self.scheduler is None:
+            return None
+        try:
+            job = self.scheduler.get_job(f"task_{task_id}")
+            if job:
+                self.task_manager.set_next_run(task_id, format_time(job.next_run_time))
+                return job.next_run_time
+        except Exception as e:
+            log.error("Error recording next run for task %s: %s", task_id, e)
+        return None
+    
+    def start_catchup(self, task, missed):
+        """Start catch-up runs for missed intervals according to the task's misfire policy"""
+        runs = catchup_runs(task, missed)
+        log.info(
+            "[MISFIRE] Task %s missed %s run(s) - policy '%s', starting %s",
+            task['id'], missed, get_misfire_policy(task), runs, extra={"task_id": task['id']}
+        )
+        if runs <= 0:
+            return
+        
+        # Catch-up runs go back-to-back: the next one starts when the previous completes
+        self.catchup_remaining[task["id"]] = runs - 1
+        self.run_task(task, source="catchup")
+    
+    def continue_catchup(self, task_id):
+        """Start the next catch-up run, if any are left"""
+        remaining = self.catchup_remaining.pop(task_id, 0)
+        if remaining > 0:
+            self.catchup_remaining[task_id] = remaining - 1
+            threading.Thread(target=self.run_queued_task, args=(task_id,), daemon=True).start()
+    
+    def launch_dependent_task(self, task_id):
+        """Start a task whose upstream tasks finished (called by the DAG scheduler)"""
+        task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+        if not task or not task.get("enabled", True):
+            return False
+        return self.run_task(task, source="dag")
+    
+    def on_dag_report(self, report):
+        """Record the critical-path timing report of a finished DAG run"""
+        log.info("[DAG] %s", report)
+        report_file = os.path.join(os.path.dirname(self.task_manager.filename), "dag_reports.log")
+        try:
+            with open(report_file, 'a', encoding='utf-8') as f:
+                f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {report}\n\n")
+        except IOError as e:
+            log.error("Error writing DAG report: %s", e)
+    
+    def run_task(self, task, scheduled=False, source=None):
+        """Run a task (lightweight - only log console apps)
+        source names what started the run for launch tracing (manual, interval, file, dag, ...)
+        Returns: True if a run was started"""
+        lateness = 0.0
+        if scheduled:
+            next_run_time = self.record_next_run(task["id"])
+            if next_run_time is not None:
+                # The interval job has already moved on - this run was due one interval earlier
+                due = next_run_time - timedelta(minutes=task["interval"])
+                lateness = (datetime.now(due.tzinfo) - due).total_seconds()
+        
         # Skip if scheduler is paused
         if self.scheduler_paused:
-            return
+            if scheduled:
+                # Remember the missed run - handled by the misfire policy on resume
+                self.missed_while_paused[task["id"]] = self.missed_while_paused.get(task["id"], 0) + 1
+            return False
+        
+        # A standby (or a leader whose lease ran out) never fires scheduled runs
+        if scheduled and not self.is_active():
+            log.info("[RUN_TASK] Not the leader - scheduled run of task %s dropped", task["id"])
+            return False
         
         exe_path = task["path"]
         task_id = task["id"]
+        source = source or ("interval" if scheduled else "manual")
+        trace = self.tracer.start(task_id, task["name"], source, lateness)
+        if scheduled and not self.first_run_logged:
+            self.first_run_logged = True
+            log.info("Startup: first scheduled run %.0f ms after import", (time.perf_counter() - STARTUP_BEGIN) * 1000)
+        
+        if task.get("run_on") == "cluster" and self.coordinator:
+            return self.run_remote_task(task, trace)
+        
+        log.debug("[RUN_TASK] Executing task %s: %s", task_id, os.path.basename(exe_path))
+        
+        # Admission - apply the task's overlap policy and reserve a slot atomically.
+        # Runs that cannot start now are skipped, queued or coalesced here.
+        decision, slot = self.executor.admit(
+            exe_path,
+            task_id=task_id,
+            overlap_policy=task.get("overlap_policy", OVERLAP_SKIP),
+            max_instances=task.get("max_instances", 1),
+            rerun=lambda: self.run_queued_task(task_id)
+        )
+        trace.mark(STAGE_ADMISSION)
+        if slot is None:
+            log.info("[RUN_TASK] Run for task %s not started (%s)", task_id, decision, extra={"task_id": task_id})
+            trace.finish(decision)
+            self.report_overlap(task_id, decision)
+            return False
         
-        debug_print(f"[RUN_TASK] Executing task {task_id}: {os.path.basename(exe_path)}")
+        # Open a DAG run if other tasks depend on this one
+        self.dag.task_started(task_id)
         
         # Check if this is a console app that needs logging
         needs_logging = self.executor.is_console_app(exe_path)
-        debug_print(f"[RUN_TASK] Detected as {'CONSOLE' if needs_logging else 'GUI'} app")
+        log.debug("[RUN_TASK] Detected as %s app", 'CONSOLE' if needs_logging else 'GUI')
+        trace.mark(STAGE_METADATA)
         
         log_tab = None
         log_callback = None
+        launched = {}  # The process, once started - its kill_reason marks cancelled runs
         
         if needs_logging:
             # Create log tab only for console apps
@@ -1273,48 +2587,59 @@ class SchedulerApp(ctk.CTk):
             log_tab.append_log(f"\n{'='*50}\n")
             log_tab.append_log(f"{timestamp}  Process started\n")
             log_tab.append_log(f"{'='*50}\n")
+            if decision == "replaced":
+                log_tab.append_log(f"[!] Previous run cancelled and replaced\n")
+            
+            if self.log_store:
+                launched["log_run_id"] = self.log_store.start_run(task_id, task["name"], source)
             
             # Create log callback
-            def log_callback_fn(text):
+            def log_callback_fn(text, stream=None):
+                if self.log_store:
+                    self.log_store.append(launched["log_run_id"], text, stream)
                 try:
-                    log_tab.append_log(text)
+                    log_tab.append_log(text, stream)
                 except:
                     pass
             
             log_callback = log_callback_fn
         
-        # If the same executable is already running, skip starting another instance
-        # and avoid flipping the status back-and-forth.
-        if self.executor.is_running(exe_path):
-            debug_print(f"[RUN_TASK] Detected existing running process for {exe_path} - skipping new start")
-            # Ensure UI shows Running
-            self.update_task_status(task_id, "Running")
-            # Inform user in log if available
-            if needs_logging and task_id in self.log_tabs:
-                try:
-                    self.log_tabs[task_id].append_log(f"\n[!] Scheduled run skipped - process already running\n\n")
-                except:
-                    pass
-            return
-
         # Update status IMMEDIATELY before execution
         self.update_task_status(task_id, "Running")
+        trace.mark(STAGE_UI)
         
         # Create completion callback to auto-close tab
-        def on_completion():
-            # Only set Idle if there is no other running process for the same exe_path.
+        def on_completion(returncode=None):
+            kill_reason = getattr(launched.get("process"), "kill_reason", None)
+            stream_lines = getattr(launched.get("process"), "stream_lines", None)
+            entry = self.run_history.record(
+                task_id, task["name"], launched.get("started"), returncode, kill_reason, source,
+                stderr_lines=stream_lines[STREAM_STDERR] if stream_lines else None
+            )
+            if "log_run_id" in launched:
+                self.log_store.finish_run(launched["log_run_id"], returncode)
+            if entry["outcome"] == "timeout" and log_tab:
+                log_tab.append_log(f"[x] Timed out after {entry['duration']:.0f}s ({kill_reason.replace('_', ' ')})\n")
+            decision = self.retries.record(task, returncode, kill_reason)
+            self.handle_run_outcome(task, returncode, decision)
+            
+            # Let dependent tasks start (exit code 0 counts as success) - they wait while a retry is pending
+            if decision.outcome != OUTCOME_RETRY:
+                self.dag.task_finished(task_id, returncode == 0)
+            
+            # Only set Idle if there is no other running process in the same slot.
             # This avoids flipping the status to Idle when a new instance started
             # between the moment this callback was queued and the actual completion.
             try:
-                if self.executor.is_running(exe_path):
-                    debug_print(f"[COMPLETION] Process for {exe_path} still running - not setting Idle for task {task_id}")
+                if self.executor.registry.is_running(slot.key):
+                    log.debug("[COMPLETION] Process for %s still running - not setting Idle for task %s", exe_path, task_id)
                     return
             except Exception:
                 # If the check fails for any reason, proceed conservatively and set Idle
-                debug_print(f"[COMPLETION] Error checking running state for {exe_path}; proceeding to set Idle")
-
+                log.warning("[COMPLETION] Error checking running state for %s; proceeding to set Idle", exe_path)
+            
             # Update status back to Idle
-            debug_print(f"[COMPLETION] Setting task {task_id} to Idle")
+            log.debug("[COMPLETION] Setting task %s to Idle", task_id)
             self.update_task_status(task_id, "Idle")
             self.task_manager.update_status(
                 task_id,
@@ -1322,101 +2647,217 @@ class SchedulerApp(ctk.CTk):
                 datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             )
             
-            # Auto-close the tab after a brief delay (2 seconds)
+            # Continue a misfire catch-up sequence, or pick up files that arrived during the run
+            self.continue_catchup(task_id)
+            self.continue_file_trigger(task_id)
+            
+            # Auto-close the tab after a brief delay (2 seconds), unless a queued
+            # run has picked the panel up again in the meantime
+            def close_if_idle():
+                if not self.executor.registry.is_running(slot.key):
+                    self.auto_close_panel(task_id)
+            
             if needs_logging and task_id in self.log_tabs:
-                self.after(2000, lambda: self.auto_close_panel(task_id))
+                self.after(2000, close_if_idle)
         
         # Create callback to receive process reference
         def on_process_created(process):
+            launched["process"] = process
+            launched["started"] = datetime.now()
             if task_id in self.log_tabs:
                 self.log_tabs[task_id].process = process
         
-        # Heartbeat for tif2pdf specifically
-        is_tif2pdf = 'tif2pdf' in exe_path.lower()
-        heartbeat_state = {'active': False}
-        heartbeat_count = [0]
-        
-        # Prevent overlapping heartbeat threads for this task
-        if needs_logging and is_tif2pdf:
-            existing_thread = self.heartbeat_threads.get(task_id)
-            if existing_thread and existing_thread.is_alive():
-                # Already running, do not start another heartbeat or process
-                if needs_logging and task_id in self.log_tabs:
-                    self.log_tabs[task_id].append_log(f"\n[!] Second execution attempt blocked - process already running\n\n")
-                return
-            heartbeat_state['active'] = True
-            def heartbeat():
-                """Show periodic heartbeat - simple counter"""
-                heartbeat_started = False
-                while heartbeat_state['active'] and task_id in self.log_tabs:
-                    time.sleep(1)
-                    if not heartbeat_state['active'] or task_id not in self.log_tabs:
-                        break
-                    heartbeat_count[0] += 1
-                    try:
-                        log_tab = self.log_tabs[task_id]
-                        text_widget = log_tab.log_text
-                        text_widget.configure(state="normal")
-                        if not heartbeat_started:
-                            text_widget.insert("end", f"[⏳ {heartbeat_count[0]}s]")
-                            heartbeat_started = True
-                        else:
-                            content = text_widget.get("1.0", "end")
-                            lines = content.split('\n')
-                            for i in range(len(lines) - 1, -1, -1):
-                                if lines[i].strip().startswith("[⏳"):
-                                    line_num = i + 1
-                                    text_widget.delete(f"{line_num}.0", f"{line_num}.end")
-                                    text_widget.insert(f"{line_num}.0", f"[⏳ {heartbeat_count[0]}s]")
-                                    break
-                        text_widget.configure(state="disabled")
-                        text_widget.see("end")
-                    except Exception:
-                        pass
-            t = threading.Thread(target=heartbeat, daemon=True)
-            self.heartbeat_threads[task_id] = t
-            t.start()
-        
-        # Wrap completion callback to stop heartbeat and clean up thread reference
-        original_completion = on_completion
-        def on_completion_with_heartbeat_stop():
-            # Only stop the heartbeat if there is no other running process for this exe.
-            if is_tif2pdf:
-                try:
-                    if not self.executor.is_running(exe_path):
-                        heartbeat_state['active'] = False
-                        # Clean up thread reference if present
-                        if task_id in self.heartbeat_threads:
-                            del self.heartbeat_threads[task_id]
-                    else:
-                        debug_print(f"[HEARTBEAT] Another process for {exe_path} is running - keeping heartbeat alive for task {task_id}")
-                except Exception:
-                    # If check fails, stop heartbeat to avoid orphan threads
-                    heartbeat_state['active'] = False
-                    if task_id in self.heartbeat_threads:
-                        del self.heartbeat_threads[task_id]
-
-            original_completion()
-        
         # Execute in thread
         def execute_thread():
             result = self.executor.execute(
                 exe_path, 
                 log_callback, 
                 needs_logging, 
-                completion_callback=on_completion_with_heartbeat_stop,
-                process_ref_callback=on_process_created
+                completion_callback=on_completion,
+                process_ref_callback=on_process_created,
+                task_id=task_id,
+                slot=slot,
+                trace=trace,
+                warm_start=task.get("warm_start", True),
+                timeout=task.get("timeout"),
+                idle_timeout=task.get("idle_timeout"),
+                stall_after=task.get("stall_after"),
+                capture=task.get("capture")
             )
             
-            # If process was skipped (already running), handle it
-            if result == "skipped":
-                # DO NOT change status - keep it as Running since process is still running
-                # DO NOT close the log tab - let the original process continue logging
-                # Just append a skip message to inform user
-                if needs_logging and task_id in self.log_tabs:
-                    self.log_tabs[task_id].append_log(f"\n[!] Second execution attempt blocked - process already running\n\n")
+            # Launch failed - the slot was released, don't leave the task stuck in Running
+            if result is None:
+                on_completion()
         
         threading.Thread(target=execute_thread, daemon=True).start()
+        return True
+    
+    def run_remote_task(self, task, trace=NULL_TRACE):
+        """Queue a run on the cluster coordinator - the next worker with free slots picks it up
+        Returns: True if a run was queued"""
+        task_id = task["id"]
+        
+        # Runs already queued or running on a worker count against the overlap policy
+        overlap_policy = task.get("overlap_policy", OVERLAP_SKIP)
+        limit = task.get("max_instances", 1) if overlap_policy == OVERLAP_PARALLEL else 1
+        active = self.coordinator.active_runs(task_id)
+        replaced = []
+        if len(active) >= limit:
+            if overlap_policy == OVERLAP_REPLACE:
+                replaced = active
+            else:
+                queued = overlap_policy == OVERLAP_QUEUE
+                if queued:
+                    self.queued_remote[task_id] = True  # One pending run - started when the active one finishes
+                decision = "queued" if queued else "skipped"
+                log.info("[CLUSTER] Run for task %s not started (%s)", task_id, decision, extra={"task_id": task_id})
+                trace.finish(decision)
+                if task_id in self.log_tabs:
+                    message = "run queued until it finishes" if queued else "run skipped"
+                    self.log_tabs[task_id].append_log(f"\n[!] Cluster run still active - {message}\n\n")
+                return False
+        trace.mark(STAGE_ADMISSION)
+        
+        self.dag.task_started(task_id)
+        if task_id not in self.log_tabs:
+            self.create_log_panel(task["name"], task_id, exe_path=task["path"])
+        
+        run = self.coordinator.submit(task_id, task["name"], task["path"], weight=task.get("weight", 1), context=trace)
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        self.log_tabs[task_id].append_log(f"\n{'='*50}\n{timestamp}  Cluster run #{run.run_id} queued\n{'='*50}\n")
+        # Cancelled after the new run is queued, so the task never shows Idle in between
+        for old in replaced:
+            if self.coordinator.cancel(old.run_id):
+                self.log_tabs[task_id].append_log(f"[!] Cluster run #{old.run_id} cancelled and replaced\n")
+        self.update_task_status(task_id, "Running")
+        trace.mark(STAGE_UI)
+        return True
+    
+    def on_remote_started(self, run, worker_id):
+        """A worker picked up a cluster run (called from the coordinator's threads)"""
+        run.context.mark(STAGE_SPAWN)
+        if run.task_id in self.log_tabs:
+            self.log_tabs[run.task_id].append_log(f"Started on worker {worker_id} (attempt {run.attempts})\n")
+    
+    def on_remote_output(self, run, text):
+        run.context.mark(STAGE_FIRST_OUTPUT)
+        run.context.finish()
+        if run.task_id in self.log_tabs:
+            self.log_tabs[run.task_id].append_log(text)
+    
+    def on_remote_finished(self, run, returncode, state):
+        """A cluster run finished on its worker, or was lost after its last reassignment"""
+        run.context.finish("no_output")
+        task_id = run.task_id
+        if task_id in self.log_tabs:
+            messages = {"lost": "Run lost - no worker finished it", "cancelled": "Run cancelled"}
+            message = messages.get(state, f"Exit code {returncode}")
+            self.log_tabs[task_id].append_log(f"\n[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
+        
+        task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+        # A lost run never reported an exit code - retried like a timeout, not like a launch failure.
+        # A replaced run is cancelled: neither retried nor counted as a failure
+        kill_reason = state if state in ("lost", "cancelled") else None
+        decision = self.retries.record(task, returncode, kill_reason) if task else None
+        if decision:
+            self.handle_run_outcome(task, returncode, decision)
+        if decision is None or decision.outcome != OUTCOME_RETRY:
+            self.dag.task_finished(task_id, returncode == 0)
+        if self.coordinator.active_runs(task_id):
+            return
+        
+        self.update_task_status(task_id, "Idle")
+        self.task_manager.update_status(task_id, "Idle", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        self.continue_catchup(task_id)
+        self.continue_file_trigger(task_id)
+        if self.queued_remote.pop(task_id, None):
+            threading.Thread(target=self.run_queued_task, args=(task_id,), daemon=True).start()
+        
+        def close_if_idle():
+            if not self.coordinator.active_runs(task_id):
+                self.auto_close_panel(task_id)
+        
+        self.after(2000, close_if_idle)
+    
+    def on_liveness_change(self, task_id, state):
+        """A run turned stalled or busy again (called from the liveness sampler thread)"""
+        task_state = self.executor.liveness.task_state(task_id)
+        if task_state is None:
+            return  # Finished in the meantime
+        
+        stalled = task_state == LIVE_STALLED
+        self.update_task_status(task_id, "Stalled" if stalled else "Running")
+        if task_id in self.log_tabs:
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            message = "No output, CPU or disk activity - process looks stalled" if stalled else "Activity resumed"
+            self.log_tabs[task_id].append_log(f"[{timestamp}] {'[!]' if stalled else '[+]'} {message}\n")
+    
+    def handle_run_outcome(self, task, returncode, decision):
+        """Schedule a retry or trip the circuit breaker after a failed run (any thread)"""
+        task_id = task["id"]
+        log_tab = self.log_tabs.get(task_id)
+        
+        if decision.outcome == OUTCOME_RETRY:
+            log.warning("[RETRY] Task %s failed (exit code %s) - retry %s in %.1fs",
+                        task_id, returncode, decision.attempt, decision.delay, extra={"task_id": task_id})
+            if log_tab:
+                log_tab.append_log(f"[!] Retry {decision.attempt} in {decision.delay:.0f}s (exit code {returncode})\n")
+            self.after(int(decision.delay * 1000), lambda: self.run_retry(task_id))
+        elif decision.outcome == OUTCOME_TRIPPED:
+            log.error("[RETRY] Task %s failed %s times in a row - disabled by the circuit breaker",
+                      task_id, decision.failures, extra={"task_id": task_id})
+            if log_tab:
+                log_tab.append_log(f"[x] {decision.failures} failures in a row - task disabled (re-enable to reset)\n")
+            self.after(0, lambda: self.trip_circuit(task_id))
+        elif decision.outcome == OUTCOME_FAILED and decision.attempt:
+            log.error("[RETRY] Task %s still failing after %s retries", task_id, decision.attempt, extra={"task_id": task_id})
+            if log_tab:
+                log_tab.append_log(f"[x] Giving up after {decision.attempt} retries\n")
+    
+    def run_retry(self, task_id):
+        """Start a retry of a failed run
+        A retry that does not start (task disabled or deleted, standby, admission refused)
+        ends the failed run for good, so dependent tasks stop waiting for it."""
+        task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+        started = False
+        if task and task.get("enabled", True) and self.is_active():
+            started = self.run_task(task, source="retry")
+        if not started:
+            log.info("[RETRY] Retry of task %s did not start", task_id, extra={"task_id": task_id})
+            self.dag.task_finished(task_id, False)
+    
+    def trip_circuit(self, task_id):
+        """Circuit breaker - disable a task that keeps failing"""
+        row = self.task_rows.get(task_id)
+        if row:
+            row["checkbox_var"].set(False)
+        self.toggle_task_enabled(task_id, False)
+    
+    def run_queued_task(self, task_id):
+        """Start a queued run once the previous one finished (queue overlap policy)"""
+        # Resolve the current task definition - it may have been edited or deleted
+        task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+        if task and task.get("enabled", True):
+            self.run_task(task, source="queued")
+    
+    def report_overlap(self, task_id, decision):
+        """Report a run that did not start because the previous one is still running"""
+        stats = self.executor.get_overlap_stats(task_id)
+        messages = {
+            "skipped": f"[!] Scheduled run skipped - process already running (missed runs: {stats['missed']})",
+            "queued": "[!] Process already running - run queued until it finishes",
+            "coalesced": f"[!] Run already queued - merged with pending run (coalesced runs: {stats['coalesced']})"
+        }
+        
+        # Ensure UI shows Running
+        self.update_task_status(task_id, "Running")
+        
+        # Inform user in log if available
+        if task_id in self.log_tabs:
+            try:
+                self.log_tabs[task_id].append_log(f"\n{messages.get(decision, messages['skipped'])}\n\n")
+            except:
+                pass
     
     def update_task_status(self, task_id, status):
         """Thread-safe update task status in UI"""
@@ -1426,10 +2867,10 @@ class SchedulerApp(ctk.CTk):
                     status_label = self.task_rows[task_id]["status_label"]
                     status_label.configure(
                         text=status,
-                        text_color="#4ade80" if status == "Running" else "#94a3b8"
+                        text_color={"Running": "#4ade80", "Stalled": "#fbbf24"}.get(status, "#94a3b8")
                     )
             except Exception as e:
-                debug_print(f"Error updating status for task {task_id}: {e}")
+                log.error("Error updating status for task %s: %s", task_id, e)
         
         # Ensure update happens on main thread
         if threading.current_thread() is threading.main_thread():
@@ -1448,11 +2889,12 @@ class SchedulerApp(ctk.CTk):
                     self.log_container.delete(task["name"])
                     del self.log_tabs[task_id]
                 except Exception as e:
-                    debug_print(f"Error closing panel for task {task_id}: {e}")
+                    log.error("Error closing panel for task %s: %s", task_id, e)
     
     def toggle_scheduler(self):
         """Toggle scheduler pause/resume"""
         self.scheduler_paused = not self.scheduler_paused
+        self.show_scheduler_status()
         
         if self.scheduler_paused:
             # Paused
@@ -1461,10 +2903,6 @@ class SchedulerApp(ctk.CTk):
                 fg_color="#22c55e",
                 hover_color="#16a34a"
             )
-            self.status_label.configure(
-                text="⏸ Scheduler Paused",
-                text_color="#fbbf24"
-            )
         else:
             # Running
             self.control_button.configure(
@@ -1472,29 +2910,72 @@ class SchedulerApp(ctk.CTk):
                 fg_color="#ef4444",
                 hover_color="#dc2626"
             )
-            self.status_label.configure(
-                text="● Scheduler Running",
-                text_color="#4ade80"
-            )
+            
+            # Handle runs missed while paused according to each task's misfire policy
+            missed_runs, self.missed_while_paused = self.missed_while_paused, {}
+            for task_id, missed in missed_runs.items():
+                task = next((t for t in self.task_manager.tasks if t["id"] == task_id), None)
+                if task and task.get("enabled", True):
+                    self.start_catchup(task, missed)
     
     def on_closing(self):
         """Handle window close - Save all tasks and state"""
         try:
-            # Save all current tasks to tasks.json
-            self.task_manager.save_tasks()
-            debug_print("✓ Tasks saved to disk")
+            # A standby leaves tasks.json to the leader
+            if self.is_active():
+                # Persist next run times so jobs resume on their cadence after restart
+                for task in self.task_manager.tasks:
+                    self.record_next_run(task["id"])
+                
+                # Save all current tasks to tasks.json
+                self.task_manager.save_tasks()
+                log.info("Tasks saved to disk")
+        except Exception as e:
+            log.warning("Error saving tasks on close: %s", e)
+        
+        try:
+            self.file_watcher.stop()
         except Exception as e:
-            debug_print(f"Warning: Error saving tasks on close: {e}")
+            log.warning("Error stopping file watcher: %s", e)
+        
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+        
+        if self.coordinator:
+            self.coordinator.stop()
+        
+        if self.executor.python_pool:
+            self.executor.python_pool.shutdown()
+        
+        if self.executor.async_runner:
+            self.executor.async_runner.shutdown()
+        
+        if self.log_store:
+            self.log_store.flush(timeout=2)
+        
+        try:
+            summary = self.tracer.summary_text()
+            if summary:
+                log.info("Launch latency by stage:\n%s", summary)
+            self.tracer.close()
+        except Exception as e:
+            log.warning("Error closing launch tracer: %s", e)
+        
+        # Hand the lease to a standby right away
+        if self.election:
+            self.election.release()
         
         try:
             # Shutdown scheduler gracefully
-            self.scheduler.shutdown(wait=True)
-            debug_print("✓ Scheduler shut down")
+            if self.scheduler:
+                self.scheduler.shutdown(wait=True)
+            log.info("Scheduler shut down")
         except Exception as e:
-            debug_print(f"Warning: Error shutting down scheduler: {e}")
+            log.warning("Error shutting down scheduler: %s", e)
         
         # Close application
         self.destroy()
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
 
 
 if __name__ == "__main__":
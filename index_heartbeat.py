@@ -6,19 +6,30 @@ Manages and executes .exe files with dedicated logging
 
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import filedialog, messagebox
 import json
 import os
 import sys
+import struct
 import subprocess
 import threading
 import queue
 from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-import psutil
 import time
+from lazy_import import lazy_import
+from app_logging import get_logger, setup_logging, logging_options
+from process_registry import ProcessRegistry
+from process_watchdog import ProcessWatchdog, TIMEOUT_IDLE
+from run_history import RunHistory
+from liveness import LivenessSampler, LIVE_STALLED
 
+log = get_logger("app")
+
+# Loaded on first use - keeps dialogs, psutil and APScheduler off the startup path
+filedialog = lazy_import("tkinter.filedialog")
+messagebox = lazy_import("tkinter.messagebox")
+psutil = lazy_import("psutil")
+aps_background = lazy_import("apscheduler.schedulers.background")
+aps_interval = lazy_import("apscheduler.triggers.interval")
 
 
 # Set appearance
@@ -58,7 +69,7 @@ class TaskManager:
                 with open(self.filename, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError) as e:
-                print(f"Error loading tasks: {e}")
+                log.error("Error loading tasks: %s", e)
                 # Backup corrupted file
                 if os.path.exists(self.filename):
                     backup_name = f"{self.filename}.backup"
@@ -76,13 +87,13 @@ class TaskManager:
                 with open(self.config_filename, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError) as e:
-                print(f"Error loading config: {e}")
+                log.error("Error loading config: %s", e)
                 return {"last_exe_path": None}
         return {"last_exe_path": None}
     
     def cleanup_orphaned_processes(self):
         """Check for orphaned processes from previous crashed sessions - returns list if found"""
-        print("[CLEANUP] Checking for crashed/force-closed sessions...")
+        log.info("[CLEANUP] Checking for crashed/force-closed sessions...")
         
         # Create path for crash marker file
         crash_marker_file = f"{self.filename}.running"
@@ -91,25 +102,26 @@ class TaskManager:
         
         # If marker file exists, it means the app was force-closed or crashed
         if os.path.exists(crash_marker_file):
-            print(f"[CLEANUP] Found crash marker file - app was not properly closed!")
+            log.warning("[CLEANUP] Found crash marker file - app was not properly closed!")
             
             # All current tasks are potentially orphaned
             # (they were being run when app crashed)
             orphaned_tasks = self.tasks.copy()
             
             if orphaned_tasks:
-                print(f"[CLEANUP] Found {len(orphaned_tasks)} task(s) from crashed session")
-                for task in orphaned_tasks:
-                    print(f"  - {task['name']}")
+                log.warning(
+                    "[CLEANUP] Found %s task(s) from crashed session: %s",
+                    len(orphaned_tasks), ", ".join(task['name'] for task in orphaned_tasks)
+                )
             
             # Remove the crash marker file
             try:
                 os.remove(crash_marker_file)
-                print("[CLEANUP] Removed crash marker file")
+                log.info("[CLEANUP] Removed crash marker file")
             except:
                 pass
         else:
-            print("[CLEANUP] No crash detected - normal startup")
+            log.info("[CLEANUP] No crash detected - normal startup")
         
         return orphaned_tasks
     
@@ -119,9 +131,9 @@ class TaskManager:
         try:
             with open(crash_marker_file, 'w') as f:
                 f.write(f"App started at {datetime.now().isoformat()}\n")
-            print(f"[CRASH_MARKER] Created marker file: {crash_marker_file}")
+            log.info("[CRASH_MARKER] Created marker file: %s", crash_marker_file)
         except Exception as e:
-            print(f"[CRASH_MARKER] Error creating marker: {e}")
+            log.error("[CRASH_MARKER] Error creating marker: %s", e)
     
     def remove_crash_marker(self):
         """Remove the crash marker file on clean shutdown"""
@@ -129,9 +141,9 @@ class TaskManager:
         try:
             if os.path.exists(crash_marker_file):
                 os.remove(crash_marker_file)
-                print(f"[CRASH_MARKER] Removed marker file on clean shutdown")
+                log.info("[CRASH_MARKER] Removed marker file on clean shutdown")
         except Exception as e:
-            print(f"[CRASH_MARKER] Error removing marker: {e}")
+            log.error("[CRASH_MARKER] Error removing marker: %s", e)
     
     def save_config(self):
         """Save configuration to JSON file with error handling"""
@@ -140,7 +152,7 @@ class TaskManager:
                 with open(self.config_filename, 'w', encoding='utf-8') as f:
                     json.dump(self.config, f, indent=4)
             except IOError as e:
-                print(f"Error saving config: {e}")
+                log.error("Error saving config: %s", e)
     
     def set_last_exe_path(self, path):
         """Save the last selected exe path"""
@@ -172,7 +184,7 @@ class TaskManager:
                 
                 os.rename(temp_filename, self.filename)
             except IOError as e:
-                print(f"Error saving tasks: {e}")
+                log.error("Error saving tasks: %s", e)
                 # Cleanup temp file if it exists
                 if os.path.exists(temp_filename):
                     try:
@@ -235,24 +247,20 @@ class ProcessExecutor:
     """Handles process execution - lightweight mode"""
     
     def __init__(self):
-        self.running_processes = {}  # {exe_path: process_object}
+        self.registry = ProcessRegistry()  # Lock-protected {exe_path: entry}
     
     def is_running(self, exe_path):
         """Check if a process is already running"""
-        exe_path = os.path.normpath(exe_path)
-        
-        if exe_path in self.running_processes:
-            proc = self.running_processes[exe_path]
-            if proc.poll() is None:  # Still running
-                return True
-            else:
-                del self.running_processes[exe_path]
-        return False
+        return self.registry.is_running(os.path.normpath(exe_path))
+    
+    def running_snapshot(self):
+        """Get a consistent list of running processes (for UI and shutdown)"""
+        return self.registry.snapshot()
     
     def is_console_app(self, exe_path):
         """Detect if exe is a console application (needs log capture)"""
         if not os.path.exists(exe_path):
-            print(f"Executable not found: {exe_path}")
+            log.warning("Executable not found: %s", exe_path)
             return False
             
         try:
@@ -263,7 +271,6 @@ class ProcessExecutor:
             
             # For .exe files, check PE subsystem (Windows specific)
             if ext == '.exe':
-                import struct
                 with open(exe_path, 'rb') as f:
                     # Read DOS header
                     dos_header = f.read(64)
@@ -289,7 +296,7 @@ class ProcessExecutor:
                     # CUI (Console) = 3, GUI = 2
                     return subsystem == 3
         except (IOError, OSError, struct.error) as e:
-            print(f"Error reading PE header from {exe_path}: {e}")
+            log.error("Error reading PE header from %s: %s", exe_path, e)
         
         return False  # Default to GUI (no log capture)
     
@@ -310,7 +317,7 @@ class ProcessExecutor:
             return True
             
         except (IOError, OSError) as e:
-            print(f"Error checking file size for {exe_path}: {e}")
+            log.error("Error checking file size for %s: %s", exe_path, e)
             return False
     
     def is_resource_heavy(self, exe_path):
@@ -323,7 +330,7 @@ class ProcessExecutor:
             return False
     
     
-    def execute(self, exe_path, log_callback=None, needs_logging=None, completion_callback=None, process_ref_callback=None):
+    def execute(self, exe_path, log_callback=None, needs_logging=None, completion_callback=None, process_ref_callback=None, task_id=None):
         """Execute an .exe file - captures output without blocking the exe
         
         For resource-heavy apps: uses non-blocking pipes to avoid performance impact
@@ -343,7 +350,8 @@ class ProcessExecutor:
                 log_callback(f"[x] Executable not found: {exe_path}\n")
             return None
         
-        if self.is_running(exe_path):
+        # Atomically claim the dedup slot (check + reserve under one lock)
+        if self.registry.try_acquire(exe_path, task_id=task_id, exe_path=exe_path) is None:
             if log_callback:
                 log_callback(f"[!] Process already running, skipping execution\n")
             return "skipped"
@@ -358,7 +366,7 @@ class ProcessExecutor:
         try:
             if needs_logging:
                 # Console app - capture output
-                print(f"[EXECUTE] Running console app {os.path.basename(exe_path)}")
+                log.debug("[EXECUTE] Running console app %s", os.path.basename(exe_path))
                 
                 # Standard pipe-based execution
                 startupinfo = subprocess.STARTUPINFO()
@@ -375,6 +383,7 @@ class ProcessExecutor:
                     bufsize=1,
                     cwd=os.path.dirname(exe_path)
                 )
+                self.registry.attach(exe_path, process)
                 
                 if log_callback:
                     # Start output reader thread (non-blocking)
@@ -399,11 +408,12 @@ class ProcessExecutor:
                     ).start()
             else:
                 # GUI app - run without capturing output
-                print(f"[EXECUTE] Running GUI app {os.path.basename(exe_path)}")
+                log.debug("[EXECUTE] Running GUI app %s", os.path.basename(exe_path))
                 process = subprocess.Popen(
                     exe_path,
                     cwd=os.path.dirname(exe_path) or None
                 )
+                self.registry.attach(exe_path, process)
                 
                 # Just track completion
                 threading.Thread(
@@ -412,8 +422,6 @@ class ProcessExecutor:
                     daemon=True
                 ).start()
             
-            self.running_processes[exe_path] = process
-            
             # Send process reference back if callback provided
             if process_ref_callback:
                 process_ref_callback(process)
@@ -421,10 +429,16 @@ class ProcessExecutor:
             return process
             
         except (FileNotFoundError, OSError, PermissionError) as e:
+            # Launch failed - free the reserved slot
+            self.registry.release(exe_path)
             if log_callback:
                 log_callback(f"[x] Error executing process: {str(e)}\n")
-            print(f"Error executing {exe_path}: {e}")
+            log.exception("Error executing %s: %s", exe_path, e)
             return None
+        except Exception:
+            # Never leave a reserved slot behind on unexpected errors
+            self.registry.release(exe_path)
+            raise
     
     def _stream_output(self, pipe, log_callback, stream_name="stream"):
         """Stream output with aggressive reading to combat exe-side buffering
@@ -432,9 +446,6 @@ class ProcessExecutor:
         The problem: Many console apps buffer output when stdout is redirected.
         Solution: Read aggressively in small chunks with minimal delay.
         """
-        import select
-        import sys
-        
         try:
             buffer = ""
             
@@ -446,7 +457,7 @@ class ProcessExecutor:
                     break
                     
         except Exception as e:
-            print(f"Stream error: {e}")
+            log.error("Stream error: %s", e)
         finally:
             try:
                 pipe.close()
@@ -457,80 +468,85 @@ class ProcessExecutor:
         """Monitor process completion with logging"""
         try:
             process.wait()
-            if exe_path in self.running_processes:
-                del self.running_processes[exe_path]
+            self.registry.release(exe_path, process)
             log_callback(f"\n[+] Process completed (Exit code: {process.returncode})\n")
         except Exception as e:
-            print(f"Error monitoring completion for {exe_path}: {e}")
+            log.error("Error monitoring completion for %s: %s", exe_path, e)
         finally:
             if completion_callback:
                 try:
                     completion_callback()
                 except Exception as e:
-                    print(f"Error in completion callback: {e}")
+                    log.exception("Error in completion callback: %s", e)
     
     def _monitor_completion_simple(self, process, exe_path, completion_callback=None):
         """Monitor process completion without logging (lightweight)"""
         try:
-            print(f"[MONITOR] Starting completion monitor for {os.path.basename(exe_path)}")
+            log.debug("[MONITOR] Starting completion monitor for %s", os.path.basename(exe_path))
             process.wait()
-            print(f"[MONITOR] Process {os.path.basename(exe_path)} completed with code {process.returncode}")
-            if exe_path in self.running_processes:
-                del self.running_processes[exe_path]
+            log.debug("[MONITOR] Process %s completed with code %s", os.path.basename(exe_path), process.returncode)
+            self.registry.release(exe_path, process)
         except Exception as e:
-            print(f"Error monitoring completion for {exe_path}: {e}")
+            log.error("Error monitoring completion for %s: %s", exe_path, e)
         finally:
             if completion_callback:
                 try:
-                    print(f"[MONITOR] Calling completion callback for {os.path.basename(exe_path)}")
+                    log.debug("[MONITOR] Calling completion callback for %s", os.path.basename(exe_path))
                     completion_callback()
                 except Exception as e:
-                    print(f"Error in completion callback: {e}")
+                    log.exception("Error in completion callback: %s", e)
+    
+    def kill_process_tree(self, proc, timeout=1, reason="cancelled"):
+        """Terminate a process and all of its children (graceful, then forced)
+        The reason is kept on the process as kill_reason for the completion handler."""
+        if proc.poll() is not None:
+            return
+        proc.kill_reason = reason
+        try:
+            try:
+                parent = psutil.Process(proc.pid)
+                children = parent.children(recursive=True)
+                
+                # Terminate all children
+                for child in children:
+                    try:
+                        child.terminate()
+                    except psutil.NoSuchProcess:
+                        pass
+                
+                # Terminate parent
+                parent.terminate()
+                
+                # Wait for processes to die
+                gone, alive = psutil.wait_procs([parent] + children, timeout=timeout)
+                
+                # Force kill survivors
+                for p in alive:
+                    try:
+                        p.kill()
+                    except psutil.NoSuchProcess:
+                        pass
+            except psutil.NoSuchProcess:
+                pass  # Process already dead
+        except ImportError:
+            # Fallback without psutil
+            proc.terminate()
+            try:
+                proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        except (OSError, PermissionError) as e:
+            log.error("Error terminating process: %s", e)
     
     def force_cleanup(self, exe_path):
         """Force cleanup of a process from tracking (e.g., when manually terminated)"""
         exe_path = os.path.normpath(exe_path)
-        if exe_path in self.running_processes:
-            proc = self.running_processes[exe_path]
+        entry = self.registry.get(exe_path)
+        if entry is not None and entry.process is not None:
+            proc = entry.process
             # Ensure process is actually dead - kill entire process tree
-            if proc.poll() is None:
-                try:
-                    import psutil
-                    try:
-                        parent = psutil.Process(proc.pid)
-                        children = parent.children(recursive=True)
-                        
-                        # Terminate all children
-                        for child in children:
-                            try:
-                                child.terminate()
-                            except psutil.NoSuchProcess:
-                                pass
-                        
-                        # Terminate parent
-                        parent.terminate()
-                        
-                        # Wait for processes to die
-                        gone, alive = psutil.wait_procs([parent] + children, timeout=1)
-                        
-                        # Force kill survivors
-                        for p in alive:
-                            try:
-                                p.kill()
-                            except psutil.NoSuchProcess:
-                                pass
-                    except psutil.NoSuchProcess:
-                        pass  # Process already dead
-                except ImportError:
-                    # Fallback without psutil
-                    proc.terminate()
-                    try:
-                        proc.wait(timeout=1)
-                    except subprocess.TimeoutExpired:
-                        proc.kill()
-                except (OSError, PermissionError) as e:
-                    print(f"Error terminating process: {e}")
-            del self.running_processes[exe_path]
+            self.kill_process_tree(proc)
+            self.registry.release(exe_path, proc)
 
 
 class VerticalLogContainer:
@@ -663,7 +679,7 @@ class LogTab(ctk.CTkScrollableFrame):
                 self.log_text.see("end")
                 self.log_text.configure(state="disabled")
             except Exception as e:
-                print(f"Error appending log: {e}")
+                log.error("Error appending log: %s", e)
         
         # Ensure UI update happens on main thread
         if threading.current_thread() is threading.main_thread():
@@ -673,35 +689,34 @@ class LogTab(ctk.CTkScrollableFrame):
     
     def close_process(self):
         """Gracefully terminate the running process (only if explicitly requested)"""
-        print(f"[CLOSE_PROCESS] Button clicked. Process={self.process}, auto_closing={self.auto_closing}")
+        log.debug("[CLOSE_PROCESS] Button clicked. Process=%s, auto_closing=%s", self.process, self.auto_closing)
         
         # Only terminate if process exists and we're not auto-closing
         if self.process and not self.auto_closing:
             try:
                 # Check if process is still running
                 poll_result = self.process.poll()
-                print(f"[CLOSE_PROCESS] Process poll result: {poll_result}")
+                log.debug("[CLOSE_PROCESS] Process poll result: %s", poll_result)
                 
                 if poll_result is None:  # Still running
                     # Kill the entire process tree (parent + all children)
                     self.append_log(f"\n[!] Terminating process and all child processes...\n")
-                    print(f"[CLOSE_PROCESS] Killing process tree for PID {self.process.pid}")
+                    log.debug("[CLOSE_PROCESS] Killing process tree for PID %s", self.process.pid)
                     
                     try:
-                        import psutil
                         parent = psutil.Process(self.process.pid)
                         children = parent.children(recursive=True)
                         
                         # Terminate children first
                         for child in children:
-                            print(f"[CLOSE_PROCESS] Terminating child PID {child.pid}")
+                            log.debug("[CLOSE_PROCESS] Terminating child PID %s", child.pid)
                             try:
                                 child.terminate()
                             except psutil.NoSuchProcess:
                                 pass
                         
                         # Terminate parent
-                        print(f"[CLOSE_PROCESS] Terminating parent PID {parent.pid}")
+                        log.debug("[CLOSE_PROCESS] Terminating parent PID %s", parent.pid)
                         parent.terminate()
                         
                         # Wait for graceful shutdown
@@ -709,18 +724,18 @@ class LogTab(ctk.CTkScrollableFrame):
                         
                         # Force kill any remaining
                         for p in alive:
-                            print(f"[CLOSE_PROCESS] Force killing PID {p.pid}")
+                            log.debug("[CLOSE_PROCESS] Force killing PID %s", p.pid)
                             try:
                                 p.kill()
                             except psutil.NoSuchProcess:
                                 pass
                         
                         self.append_log(f"[+] Process tree terminated\n")
-                        print(f"[CLOSE_PROCESS] Process tree terminated")
+                        log.debug("[CLOSE_PROCESS] Process tree terminated")
                         
                     except ImportError:
                         # Fallback if psutil not available
-                        print(f"[CLOSE_PROCESS] psutil not available, using basic terminate")
+                        log.debug("[CLOSE_PROCESS] psutil not available, using basic terminate")
                         self.process.terminate()
                         try:
                             self.process.wait(timeout=2.0)
@@ -730,29 +745,29 @@ class LogTab(ctk.CTkScrollableFrame):
                         self.append_log(f"[+] Process terminated\n")
                 else:
                     self.append_log(f"[i] Process already completed\n")
-                    print(f"[CLOSE_PROCESS] Process already dead")
+                    log.debug("[CLOSE_PROCESS] Process already dead")
                 
                 # Force cleanup from executor's tracking
                 if self.executor and self.exe_path:
-                    print(f"[CLOSE_PROCESS] Calling force_cleanup on executor")
+                    log.debug("[CLOSE_PROCESS] Calling force_cleanup on executor")
                     self.executor.force_cleanup(self.exe_path)
             except (OSError, PermissionError) as e:
                 self.append_log(f"\n[x] Error terminating process: {str(e)}\n")
-                print(f"[CLOSE_PROCESS] Error: {e}")
+                log.error("[CLOSE_PROCESS] Error: %s", e)
             except Exception as e:
-                print(f"[CLOSE_PROCESS] Unexpected error terminating process: {e}")
+                log.error("[CLOSE_PROCESS] Unexpected error terminating process: %s", e)
         elif not self.process:
-            print(f"[CLOSE_PROCESS] No process reference found!")
+            log.debug("[CLOSE_PROCESS] No process reference found!")
             self.append_log(f"[x] No process handle available\n")
         else:
-            print(f"[CLOSE_PROCESS] Skipping termination (auto_closing={self.auto_closing})")
+            log.debug("[CLOSE_PROCESS] Skipping termination (auto_closing=%s)", self.auto_closing)
         
         # Call the callback to close the tab
         if self.on_close_callback:
             try:
                 self.on_close_callback()
             except Exception as e:
-                print(f"Error in close callback: {e}")
+                log.error("Error in close callback: %s", e)
 
 
 class AddTaskDialog(ctk.CTkToplevel):
@@ -914,6 +929,10 @@ class SchedulerApp(ctk.CTk):
         
         # Initialize managers
         self.task_manager = TaskManager()
+        setup_logging(
+            os.path.join(os.path.dirname(self.task_manager.filename), "logs"),
+            **logging_options(self.task_manager.config)
+        )
         
         # Check for orphaned processes from previous crashed sessions
         orphaned_tasks = self.task_manager.cleanup_orphaned_processes()
@@ -940,14 +959,17 @@ class SchedulerApp(ctk.CTk):
             messagebox.showwarning("⚠ Orphaned Processes Detected", warning_message)
         
         self.executor = ProcessExecutor()
-        self.scheduler = BackgroundScheduler()
+        self.watchdog = ProcessWatchdog()  # Run timeouts - kills runaway process trees
+        self.run_history = RunHistory(os.path.join(os.path.dirname(self.task_manager.filename), "logs", "run_history.jsonl"))
+        self.liveness = LivenessSampler(on_change=self.on_liveness_change)  # Busy vs stalled from output, CPU and I/O
+        self.scheduler = aps_background.BackgroundScheduler()
         
         # Start scheduler with error handling
         try:
             self.scheduler.start()
-            print("[SCHEDULER] Started successfully")
+            log.info("[SCHEDULER] Started successfully")
         except Exception as e:
-            print(f"[SCHEDULER] CRITICAL ERROR starting scheduler: {e}")
+            log.critical("[SCHEDULER] CRITICAL ERROR starting scheduler: %s", e)
             messagebox.showerror(
                 "Scheduler Error",
                 f"Failed to start task scheduler:\n{str(e)}\n\nThe application will still run but tasks won't execute automatically."
@@ -1200,7 +1222,7 @@ class SchedulerApp(ctk.CTk):
             # Ignore errors if canvas/scrollbar not ready
             pass
         except Exception as e:
-            print(f"Unexpected error updating scrollbar: {e}")
+            log.error("Unexpected error updating scrollbar: %s", e)
     
     def select_task(self, task_id):
         """Select a task"""
@@ -1342,14 +1364,15 @@ class SchedulerApp(ctk.CTk):
         job_id = f"task_{task['id']}"
         
         self.scheduler.add_job(
-            func=lambda: self.run_task(task),
-            trigger=IntervalTrigger(minutes=task["interval"]),
+            func=lambda: self.run_task(task, source="interval"),
+            trigger=aps_interval.IntervalTrigger(minutes=task["interval"]),
             id=job_id,
             replace_existing=True
         )
     
-    def run_task(self, task):
-        """Run a task (lightweight - only log console apps)"""
+    def run_task(self, task, source="manual"):
+        """Run a task (lightweight - only log console apps)
+        source (manual / interval) is recorded in the run history"""
         # Skip if scheduler is paused
         if self.scheduler_paused:
             return
@@ -1357,14 +1380,15 @@ class SchedulerApp(ctk.CTk):
         exe_path = task["path"]
         task_id = task["id"]
         
-        print(f"[RUN_TASK] Executing task {task_id}: {os.path.basename(exe_path)}")
+        log.debug("[RUN_TASK] Executing task %s: %s", task_id, os.path.basename(exe_path))
         
         # Check if this is a console app that needs logging
         needs_logging = self.executor.is_console_app(exe_path)
-        print(f"[RUN_TASK] Detected as {'CONSOLE' if needs_logging else 'GUI'} app")
+        log.debug("[RUN_TASK] Detected as %s app", 'CONSOLE' if needs_logging else 'GUI')
         
         log_tab = None
         log_callback = None
+        launched = {"started": datetime.now()}  # Filled in by the callbacks below
         
         if needs_logging:
             # Create log tab only for console apps
@@ -1381,14 +1405,11 @@ class SchedulerApp(ctk.CTk):
             log_tab.append_log(f"{timestamp}  Process started\n")
             log_tab.append_log(f"{'='*50}\n")
             
-            # For tif2pdf and similar apps, add a note about buffering
-            if 'tif2pdf' in exe_path.lower() or 'pdf' in exe_path.lower():
-                log_tab.append_log(f"\n⚠ NOTE: This application may buffer output.\n")
-                log_tab.append_log(f"   Output may appear in bursts or only at completion.\n")
-                log_tab.append_log(f"   The process is running - check Task Manager if needed.\n\n")
-            
             # Create log callback
             def log_callback_fn(text):
+                if log_tab.process is not None:
+                    self.liveness.touch(log_tab.process)
+                    self.watchdog.touch(log_tab.process)
                 try:
                     log_tab.append_log(text)
                 except:
@@ -1399,55 +1420,27 @@ class SchedulerApp(ctk.CTk):
         # Update status IMMEDIATELY before execution
         self.update_task_status(task_id, "Running")
         
-        # Status watchdog - prevents stuck "Running" status
-        watchdog_active = True
-        heartbeat_active = True  # For heartbeat indicator
-        
-        def status_watchdog():
-            # Wait 2x the task interval (max expected runtime)
-            timeout_seconds = task["interval"] * 60 * 2
-            time.sleep(timeout_seconds)
-            
-            if watchdog_active and task_id in self.task_rows:
-                current_status = self.task_rows[task_id]["status_label"].cget("text")
-                if current_status == "Running":
-                    print(f"[WATCHDOG] Task {task_id} stuck in Running state - forcing to Idle")
-                    self.update_task_status(task_id, "Idle")
-                    self.task_manager.update_status(task_id, "Idle")
-        
-        # Heartbeat indicator for long-running processes with buffered output
-        def heartbeat():
-            """Show periodic heartbeat for processes that buffer output"""
-            if not needs_logging or task_id not in self.log_tabs:
-                return
-            
-            count = 0
-            while heartbeat_active:
-                time.sleep(10)  # Every 10 seconds
-                if heartbeat_active and task_id in self.log_tabs:
-                    count += 1
-                    # Only show heartbeat for known buffering apps
-                    if 'tif2pdf' in exe_path.lower() or 'pdf' in exe_path.lower():
-                        timestamp = datetime.now().strftime('%H:%M:%S')
-                        self.log_tabs[task_id].append_log(f"[{timestamp}] ⏳ Process running... ({count * 10}s elapsed)\n")
-        
-        watchdog_thread = threading.Thread(target=status_watchdog, daemon=True)
-        watchdog_thread.start()
-        
-        # Start heartbeat for buffering-prone apps
-        if needs_logging and ('tif2pdf' in exe_path.lower() or 'pdf' in exe_path.lower()):
-            heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
-            heartbeat_thread.start()
+        # Run timeouts are opt-in per task (timeout / idle_timeout in seconds).
+        # Kills this run's process tree; completion then frees the slot and sets Idle.
+        def on_timeout(reason):
+            log.warning("[WATCHDOG] Task %s exceeded its %s - killing process tree", task_id, reason.replace("_", " "))
+            if task_id in self.log_tabs:
+                what = "No output for too long" if reason == TIMEOUT_IDLE else "Run time limit reached"
+                self.log_tabs[task_id].append_log(f"\n[x] {what} - terminating process tree\n")
+            self.executor.kill_process_tree(launched["process"], reason=reason)
         
         # Create completion callback to auto-close tab
         def on_completion():
-            nonlocal watchdog_active
-            nonlocal heartbeat_active
-            watchdog_active = False  # Disable watchdog since process completed normally
-            heartbeat_active = False  # Stop heartbeat
+            process = launched.get("process")
+            if process is not None:
+                self.watchdog.unwatch(process)
+            self.run_history.record(
+                task_id, task["name"], launched["started"],
+                getattr(process, "returncode", None), getattr(process, "kill_reason", None), source
+            )
             
             # Update status back to Idle
-            print(f"[COMPLETION] Setting task {task_id} to Idle")
+            log.debug("[COMPLETION] Setting task %s to Idle", task_id)
             self.update_task_status(task_id, "Idle")
             self.task_manager.update_status(
                 task_id,
@@ -1463,6 +1456,15 @@ class SchedulerApp(ctk.CTk):
         def on_process_created(process):
             if task_id in self.log_tabs:
                 self.log_tabs[task_id].process = process
+            launched["process"] = process
+            if task.get("timeout") or task.get("idle_timeout"):
+                self.watchdog.watch(
+                    process,
+                    timeout=task.get("timeout"),
+                    idle_timeout=task.get("idle_timeout") if needs_logging else None,
+                    on_timeout=on_timeout
+                )
+            self.liveness.track(process, task_id, task.get("stall_after"))
         
         # Execute in thread
         def execute_thread():
@@ -1471,7 +1473,8 @@ class SchedulerApp(ctk.CTk):
                 log_callback, 
                 needs_logging, 
                 completion_callback=on_completion,
-                process_ref_callback=on_process_created
+                process_ref_callback=on_process_created,
+                task_id=task_id
             )
             
             # If process was skipped (already running), handle it
@@ -1492,10 +1495,10 @@ class SchedulerApp(ctk.CTk):
                     status_label = self.task_rows[task_id]["status_label"]
                     status_label.configure(
                         text=status,
-                        text_color="#4ade80" if status == "Running" else "#94a3b8"
+                        text_color={"Running": "#4ade80", "Stalled": "#fbbf24"}.get(status, "#94a3b8")
                     )
             except Exception as e:
-                print(f"Error updating status for task {task_id}: {e}")
+                log.error("Error updating status for task %s: %s", task_id, e)
         
         # Ensure update happens on main thread
         if threading.current_thread() is threading.main_thread():
@@ -1503,6 +1506,18 @@ class SchedulerApp(ctk.CTk):
         else:
             self.after(0, _update)
     
+    def on_liveness_change(self, task_id, state):
+        """A run turned stalled or busy again (called from the liveness sampler thread)"""
+        if self.liveness.task_state(task_id) is None:
+            return  # Finished in the meantime
+        
+        stalled = state == LIVE_STALLED
+        self.update_task_status(task_id, "Stalled" if stalled else "Running")
+        if task_id in self.log_tabs:
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            message = "No output, CPU or disk activity - process looks stalled" if stalled else "Activity resumed"
+            self.log_tabs[task_id].append_log(f"[{timestamp}] {'[!]' if stalled else '[+]'} {message}\n")
+    
     def auto_close_panel(self, task_id):
         """Auto-close a log panel after task completion"""
         if task_id in self.log_tabs:
@@ -1514,7 +1529,7 @@ class SchedulerApp(ctk.CTk):
                     self.log_container.delete(task["name"])
                     del self.log_tabs[task_id]
                 except Exception as e:
-                    print(f"Error closing panel for task {task_id}: {e}")
+                    log.error("Error closing panel for task %s: %s", task_id, e)
     
     def toggle_scheduler(self):
         """Toggle scheduler pause/resume"""
@@ -1524,9 +1539,9 @@ class SchedulerApp(ctk.CTk):
             # Pause the scheduler properly
             try:
                 self.scheduler.pause()
-                print("[SCHEDULER] Paused all jobs")
+                log.info("[SCHEDULER] Paused all jobs")
             except Exception as e:
-                print(f"[SCHEDULER] Error pausing: {e}")
+                log.warning("[SCHEDULER] Error pausing: %s", e)
             
             self.control_button.configure(
                 text="▶ Start Scheduler",
@@ -1541,9 +1556,9 @@ class SchedulerApp(ctk.CTk):
             # Resume the scheduler properly
             try:
                 self.scheduler.resume()
-                print("[SCHEDULER] Resumed all jobs")
+                log.info("[SCHEDULER] Resumed all jobs")
             except Exception as e:
-                print(f"[SCHEDULER] Error resuming: {e}")
+                log.warning("[SCHEDULER] Error resuming: %s", e)
             
             self.control_button.configure(
                 text="⏸ Pause Scheduler",
@@ -1561,21 +1576,30 @@ class SchedulerApp(ctk.CTk):
         running_tasks = []
         running_processes_list = []  # Keep track of actual process objects
         
-        # Check processes tracked by executor
-        for exe_path, process in self.executor.running_processes.items():
-            poll_result = process.poll()
+        # Check processes tracked by executor (consistent snapshot - monitor
+        # threads may release entries concurrently)
+        tasks_by_id = {}
+        with self.task_manager._lock:
+            for task in self.task_manager.tasks:
+                tasks_by_id[task["id"]] = task
+        
+        for entry in self.executor.running_snapshot():
+            if entry.process is None:
+                continue  # Launch still in progress
             
-            if poll_result is None:  # Process is still running
-                running_processes_list.append(process)
-                
-                # Find the task that corresponds to this process
+            running_processes_list.append(entry.process)
+            
+            # Find the task that corresponds to this process
+            task = tasks_by_id.get(entry.task_id)
+            if task is None:
                 with self.task_manager._lock:
-                    for task in self.task_manager.tasks:
-                        task_path_normalized = os.path.normpath(task.get("path"))
-                        exe_path_normalized = os.path.normpath(exe_path)
-                        if task_path_normalized == exe_path_normalized:
-                            running_tasks.append(task)
-                            break
+                    task = next(
+                        (t for t in self.task_manager.tasks
+                         if os.path.normpath(t.get("path")) == entry.exe_path),
+                        None
+                    )
+            if task is not None:
+                running_tasks.append(task)
         
         # If there are running tasks, warn user
         if running_tasks:
@@ -1590,27 +1614,26 @@ class SchedulerApp(ctk.CTk):
                 warning_message,
                 icon=messagebox.WARNING
             )
-            print(f"[CLOSE_WARNING] User responded: {result}")
+            log.debug("[CLOSE_WARNING] User responded: %s", result)
             
             if result is False:
                 # User clicked NO - don't close
-                print("[CLOSE] User chose not to close - running tasks detected")
+                log.info("[CLOSE] User chose not to close - running tasks detected")
                 return
             else:
                 # User clicked YES - proceed with close and TERMINATE all running processes
-                print("[CLOSE] User confirmed close despite running tasks - terminating processes")
+                log.info("[CLOSE] User confirmed close despite running tasks - terminating processes")
         
         try:
             # FORCEFULLY TERMINATE all running processes before closing
-            print(f"[CLOSE] Checking {len(running_processes_list)} processes for termination...")
+            log.info("[CLOSE] Checking %s processes for termination...", len(running_processes_list))
             
-            import psutil
             for process in running_processes_list:
                 try:
                     # Check if process is actually still running
                     if process.poll() is None:
                         # Kill entire process tree (parent + children)
-                        print(f"[CLOSE] Terminating process tree for PID {process.pid}...")
+                        log.info("[CLOSE] Terminating process tree for PID %s...", process.pid)
                         
                         try:
                             parent = psutil.Process(process.pid)
@@ -1618,14 +1641,14 @@ class SchedulerApp(ctk.CTk):
                             
                             # Terminate all children first
                             for child in children:
-                                print(f"[CLOSE] Terminating child PID {child.pid}")
+                                log.debug("[CLOSE] Terminating child PID %s", child.pid)
                                 try:
                                     child.terminate()
                                 except psutil.NoSuchProcess:
                                     pass
                             
                             # Terminate parent
-                            print(f"[CLOSE] Terminating parent PID {parent.pid}")
+                            log.debug("[CLOSE] Terminating parent PID %s", parent.pid)
                             parent.terminate()
                             
                             # Wait for graceful shutdown
@@ -1633,28 +1656,28 @@ class SchedulerApp(ctk.CTk):
                             
                             # Force kill survivors
                             for p in alive:
-                                print(f"[CLOSE] Force killing PID {p.pid}")
+                                log.debug("[CLOSE] Force killing PID %s", p.pid)
                                 try:
                                     p.kill()
                                 except psutil.NoSuchProcess:
                                     pass
                             
-                            print(f"[CLOSE] Process tree terminated")
+                            log.debug("[CLOSE] Process tree terminated")
                         except psutil.NoSuchProcess:
-                            print(f"[CLOSE] Process already dead")
+                            log.debug("[CLOSE] Process already dead")
                     else:
                         # Process already terminated
-                        print(f"[CLOSE] Process {process.pid} already terminated (exit code: {process.returncode})")
+                        log.info("[CLOSE] Process %s already terminated (exit code: %s)", process.pid, process.returncode)
                         
                 except Exception as e:
-                    print(f"[CLOSE] Error handling process: {e}")
+                    log.error("[CLOSE] Error handling process: %s", e)
             
-            # Clear the running_processes dict to prevent orphaned tracking
-            self.executor.running_processes.clear()
-            print("[CLOSE] All processes handled and cleared from tracking")
+            # Clear the registry to prevent orphaned tracking
+            self.executor.registry.pop_all()
+            log.info("[CLOSE] All processes handled and cleared from tracking")
             
         except Exception as e:
-            print(f"Warning: Error in process termination: {e}")
+            log.warning("Error in process termination: %s", e)
         
         try:
             # Set all running tasks to Idle before saving
@@ -1665,31 +1688,30 @@ class SchedulerApp(ctk.CTk):
             
             # Save all current tasks to tasks.json
             self.task_manager.save_tasks()
-            print("✓ Tasks saved to disk")
+            log.info("Tasks saved to disk")
         except Exception as e:
-            print(f"Warning: Error saving tasks on close: {e}")
+            log.warning("Error saving tasks on close: %s", e)
         
         try:
             # Remove crash marker file on clean shutdown
             self.task_manager.remove_crash_marker()
         except Exception as e:
-            print(f"Warning: Error removing crash marker: {e}")
+            log.warning("Error removing crash marker: %s", e)
         
         try:
             # Shutdown scheduler gracefully
             self.scheduler.shutdown(wait=False)  # Don't wait - faster shutdown
-            print("✓ Scheduler shut down")
+            log.info("Scheduler shut down")
         except Exception as e:
-            print(f"Warning: Error shutting down scheduler: {e}")
+            log.warning("Error shutting down scheduler: %s", e)
         
         # Force close any remaining threads (output readers, monitors, etc.)
-        print("[CLOSE] Forcing application exit...")
+        log.info("[CLOSE] Forcing application exit...")
         
         # Close application
         self.destroy()
         
         # If destroy() doesn't work, force exit
-        import sys
         sys.exit(0)
 
 
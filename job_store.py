@@ -0,0 +1,225 @@
+"""
+Job Store
+APScheduler jobs kept in SQLite (stdlib sqlite3), so interval jobs survive a restart
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+from app_logging import get_logger
+
+log = get_logger("job_store")
+
+JOB_TARGET = "job_store:fire_task"  # How jobs reference fire_task() in the store
+_task_runner = None  # Callable(task_id) the app registers with set_task_runner()
+
+
+def set_task_runner(runner):
+    """Register what fire_task() calls - the app looks the task up and runs it"""
+    global _task_runner
+    _task_runner = runner
+
+
+def fire_task(task_id):
+    """Target of every task's interval job
+    
+    Jobs are pickled into the store by reference to this function with only the
+    task id as argument, so a job never carries a copy of the task: edits made
+    after the job was added are what runs.
+    """
+    if _task_runner is None:
+        log.warning("Job for task %s fired before the app registered a task runner", task_id)
+        return
+    _task_runner(task_id)
+
+
+class SQLiteJobStore(BaseJobStore):
+    """APScheduler job store on stdlib sqlite3, one row per job
+    
+    Same table layout as APScheduler's SQLAlchemyJobStore (id, next_run_time,
+    pickled job_state) without the SQLAlchemy dependency. Every change commits
+    on its own, except inside batch(), which commits once at the end - adding
+    or removing thousands of jobs is one transaction instead of thousands.
+    
+    The file keeps SQLite's default rollback journal: instances on different
+    PCs share jobs.db over a network drive, where WAL (shared memory on one
+    host) is not safe - the same reason leader.py's lease database avoids it.
+    """
+    
+    def __init__(self, path, pickle_protocol=pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.path = path
+        self.pickle_protocol = pickle_protocol
+        self._conn = None
+        self._lock = threading.RLock()  # Scheduler thread and UI thread share the connection
+        self._batches = {}  # {thread: open batch() depth}
+    
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=DELETE")  # Also converts a jobs.db left in WAL mode
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS apscheduler_jobs ("
+                "id TEXT PRIMARY KEY, next_run_time REAL, job_state BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_next_run ON apscheduler_jobs (next_run_time)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def _commit(self):
+        # Changes from threads without a batch (the scheduler thread's update_job) commit right
+        # away even while another thread's batch is open - with what that batch has written so far
+        if threading.current_thread() not in self._batches:
+            self._conn.commit()
+    
+    @contextmanager
+    def batch(self):
+        """Group this thread's changes into one transaction (committed when the outermost batch ends)
+        The lock is not held in between, so the scheduler thread is never blocked by a batch.
+        Its writes share the connection and are committed as they happen, which also commits the
+        batch's changes up to then - a batch groups commits, it is not an atomic unit."""
+        thread = threading.current_thread()
+        with self._lock:
+            self._connection()
+            self._batches[thread] = self._batches.get(thread, 0) + 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batches[thread] -= 1
+                if not self._batches[thread]:
+                    del self._batches[thread]
+                    self._conn.commit()
+    
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        with self._lock:
+            self._connection()
+    
+    def lookup_job(self, job_id):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT job_state FROM apscheduler_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._reconstitute_job(row[0]) if row else None
+    
+    def get_due_jobs(self, now):
+        return self._get_jobs("WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),))
+    
+    def get_next_run_time(self):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT next_run_time FROM apscheduler_jobs WHERE next_run_time IS NOT NULL "
+                "ORDER BY next_run_time LIMIT 1"
+            ).fetchone()
+        return utc_timestamp_to_datetime(row[0]) if row else None
+    
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+    
+    def add_job(self, job):
+        with self._lock:
+            try:
+                self._connection().execute(
+                    "INSERT INTO apscheduler_jobs (id, next_run_time, job_state) VALUES (?, ?, ?)",
+                    (job.id, datetime_to_utc_timestamp(job.next_run_time),
+                     pickle.dumps(job.__getstate__(), self.pickle_protocol))
+                )
+            except sqlite3.IntegrityError:
+                raise ConflictingIdError(job.id)
+            self._commit()
+    
+    def update_job(self, job):
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE apscheduler_jobs SET next_run_time = ?, job_state = ? WHERE id = ?",
+                (datetime_to_utc_timestamp(job.next_run_time),
+                 pickle.dumps(job.__getstate__(), self.pickle_protocol), job.id)
+            )
+            if cursor.rowcount == 0:
+                raise JobLookupError(job.id)
+            self._commit()
+    
+    def remove_job(self, job_id):
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM apscheduler_jobs WHERE id = ?", (job_id,))
+            if cursor.rowcount == 0:
+                raise JobLookupError(job_id)
+            self._commit()
+    
+    def remove_jobs(self, job_ids):
+        """Remove many jobs in one statement batch - ids that don't exist are ignored"""
+        with self._lock:
+            self._connection().executemany("DELETE FROM apscheduler_jobs WHERE id = ?", ((job_id,) for job_id in job_ids))
+            self._commit()
+    
+    def remove_all_jobs(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM apscheduler_jobs")
+            self._commit()
+    
+    def job_states(self):
+        """{job id: job state dict} straight from the table - works before the scheduler has started
+        (a state has the job's trigger, func reference, args, misfire options and next_run_time)"""
+        states = {}
+        with self._lock:
+            rows = self._connection().execute("SELECT id, job_state FROM apscheduler_jobs").fetchall()
+        for job_id, job_state in rows:
+            try:
+                states[job_id] = pickle.loads(job_state)
+            except Exception as e:
+                log.warning("Unreadable job %s in the job store: %s", job_id, e)
+                states[job_id] = None
+        return states
+    
+    def next_run_times(self):
+        """{job id: next fire time (aware, UTC) or None if paused} without unpickling any job"""
+        with self._lock:
+            rows = self._connection().execute("SELECT id, next_run_time FROM apscheduler_jobs").fetchall()
+        return {job_id: utc_timestamp_to_datetime(next_run) for job_id, next_run in rows}
+    
+    def shutdown(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job_state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+    
+    def _get_jobs(self, where="", args=()):
+        jobs = []
+        failed = []
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT id, job_state FROM apscheduler_jobs {where} ORDER BY next_run_time", args
+            ).fetchall()
+            for job_id, job_state in rows:
+                try:
+                    jobs.append(self._reconstitute_job(job_state))
+                except Exception:
+                    log.exception("Unable to restore job %s - removing it", job_id)
+                    failed.append(job_id)
+            if failed:
+                self.remove_jobs(failed)
+        return jobs
+    
+    def __repr__(self):
+        return f"<{self.__class__.__name__} (path={self.path})>"
@@ -0,0 +1,75 @@
+"""
+Lazy Import
+Module proxies that import on first attribute access, with load timings
+"""
+
+import importlib
+import sys
+import threading
+import time
+import types
+
+
+_load_times = {}  # {module name: (seconds, thread name)}
+_load_times_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported the first time an attribute is used
+    
+    Safe to use from several threads - the first access imports under a lock,
+    later accesses are forwarded to the real module.
+    """
+    
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+    
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                already_loaded = self.__name__ in sys.modules
+                started = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                if not already_loaded:
+                    with _load_times_lock:
+                        _load_times[self.__name__] = (time.perf_counter() - started, threading.current_thread().name)
+                self.__dict__["_lazy_module"] = module
+        return module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __dir__(self):
+        return dir(self._load())
+    
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if it is already imported, otherwise a LazyModule proxy"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(module):
+    """True if a module (or lazy proxy) has been imported"""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
+
+
+def load_times():
+    """Modules imported through a lazy proxy: {name: (seconds, thread name)}"""
+    with _load_times_lock:
+        return dict(_load_times)
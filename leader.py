@@ -0,0 +1,150 @@
+"""
+Leader Election
+A lease row in a shared SQLite file - only the instance holding it schedules tasks
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from app_logging import get_logger
+
+log = get_logger("leader")
+
+DEFAULT_LEASE_SECONDS = 10.0
+LEASE_NAME = "scheduler"
+
+
+class LeaderElection:
+    """Lease-based leader election between scheduler instances sharing a folder
+    
+    Every instance tries to take or renew the lease every lease_seconds / 3.
+    The holder keeps renewing it; a standby takes over once it has expired - within
+    about lease_seconds of a crash or hang, and right away after release().
+    
+    is_leader also turns false when the local copy of the lease runs out, so a
+    leader that stalled (sleep, a frozen disk) stops firing jobs before a standby
+    can take the lease. Expiry uses the wall clock, so instances on different PCs
+    need synchronized clocks.
+    """
+    
+    def __init__(self, db_path, lease_seconds=DEFAULT_LEASE_SECONDS, instance_id=None, on_elected=None, on_demoted=None):
+        self.db_path = db_path
+        self.lease_seconds = float(lease_seconds)
+        self.instance_id = instance_id or uuid.uuid4().hex
+        self.on_elected = on_elected  # callable() - this instance became the leader
+        self.on_demoted = on_demoted  # callable() - this instance lost the lease
+        self._leader = False
+        self._valid_until = 0.0  # time.monotonic() deadline of our lease
+        self._stop = threading.Event()
+        self._thread = None
+        self._ensure_schema()
+    
+    def _connect(self):
+        # Autocommit mode - transactions are opened explicitly with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+    
+    def _ensure_schema(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lease ("
+                "name TEXT PRIMARY KEY, holder TEXT, host TEXT, pid INTEGER, acquired REAL, expires REAL)"
+            )
+        finally:
+            conn.close()
+    
+    @property
+    def is_leader(self):
+        return self._leader and time.monotonic() < self._valid_until
+    
+    def try_acquire(self):
+        """Take the lease if it is free or expired, renew it if we hold it
+        Returns: True if this instance holds the lease"""
+        started = time.monotonic()
+        now = time.time()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock, so check-and-take is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT holder, acquired, expires FROM lease WHERE name = ?", (LEASE_NAME,)).fetchone()
+            acquired = row is None or row[0] == self.instance_id or row[2] < now
+            if acquired:
+                since = row[1] if row is not None and row[0] == self.instance_id else now
+                conn.execute(
+                    "INSERT OR REPLACE INTO lease (name, holder, host, pid, acquired, expires) VALUES (?, ?, ?, ?, ?, ?)",
+                    (LEASE_NAME, self.instance_id, socket.gethostname(), os.getpid(), since, now + self.lease_seconds)
+                )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            log.warning("Leader lease check failed: %s", e)
+            return self.is_leader
+        finally:
+            conn.close()
+        
+        if acquired:
+            self._valid_until = started + self.lease_seconds
+        self._leader = acquired
+        return acquired
+    
+    def holder(self):
+        """Current lease holder: {holder, host, pid, acquired, expires} or None"""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT holder, host, pid, acquired, expires FROM lease WHERE name = ?", (LEASE_NAME,)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return dict(zip(("holder", "host", "pid", "acquired", "expires"), row))
+    
+    def start(self):
+        """Try once right away, then keep campaigning from a background thread
+        Returns: True if this instance is the leader"""
+        leader = self.try_acquire()
+        log.info("Leader election: %s", "this instance is the leader" if leader else "standby")
+        self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+        return leader
+    
+    def _run(self):
+        was_leader = self.is_leader
+        while not self._stop.wait(self.lease_seconds / 3):
+            self.try_acquire()
+            leader = self.is_leader
+            if leader == was_leader:
+                continue
+            was_leader = leader
+            log.warning("Leader election: %s", "took over as leader" if leader else "lost the lease - standing by")
+            callback = self.on_elected if leader else self.on_demoted
+            if callback:
+                try:
+                    callback()
+                except Exception:
+                    log.exception("Error in leader election callback")
+    
+    def release(self):
+        """Stop campaigning and hand the lease over right away"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if not self._leader:
+            return
+        self._leader = False
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("UPDATE lease SET expires = 0 WHERE name = ? AND holder = ?", (LEASE_NAME, self.instance_id))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            log.warning("Error releasing leader lease: %s", e)
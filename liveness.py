@@ -0,0 +1,169 @@
+"""
+Liveness
+Busy vs stalled detection for running processes from output, CPU time and disk I/O
+"""
+
+import threading
+import time
+
+from app_logging import get_logger
+from lazy_import import lazy_import
+
+log = get_logger("liveness")
+
+psutil = lazy_import("psutil")
+
+LIVE_BUSY = "busy"        # Output, CPU or I/O progress within the stall window
+LIVE_STALLED = "stalled"  # No signal at all for stall_after seconds
+LIVE_STATES = (LIVE_BUSY, LIVE_STALLED)
+
+DEFAULT_SAMPLE_INTERVAL = 2.0
+DEFAULT_STALL_AFTER = 60.0
+CPU_PROGRESS_SHARE = 0.05  # CPU use below 5% of one core between samples counts as idle
+
+
+class _Tracked:
+    __slots__ = ("process", "task_id", "stall_after", "started", "last_output", "last_cpu", "last_io",
+                 "cpu_time", "io_bytes", "state", "_ps")
+    
+    def __init__(self, process, task_id, stall_after):
+        now = time.monotonic()
+        self.process = process
+        self.task_id = task_id
+        self.stall_after = stall_after
+        self.started = now
+        self.last_output = now  # Start counts as activity - a run is busy until proven otherwise
+        self.last_cpu = now
+        self.last_io = now
+        self.cpu_time = 0.0
+        self.io_bytes = 0
+        self.state = LIVE_BUSY
+        self._ps = None
+    
+    def last_activity(self):
+        return max(self.last_output, self.last_cpu, self.last_io)
+
+
+class LivenessSampler:
+    """One thread samples every tracked process tree (CPU time and I/O bytes via psutil)
+    
+    Output is reported through touch(). A run is stalled when it produced no output,
+    used no CPU and did no I/O for its stall_after seconds. on_change(task_id, state)
+    fires on each busy <-> stalled transition, from the sampler thread.
+    """
+    
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL, stall_after=DEFAULT_STALL_AFTER, on_change=None):
+        self.interval = interval
+        self.stall_after = stall_after
+        self.on_change = on_change
+        self._tracked = {}  # {process: _Tracked}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    def track(self, process, task_id=None, stall_after=None):
+        with self._lock:
+            self._tracked[process] = _Tracked(process, task_id, stall_after or self.stall_after)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="liveness-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+    
+    def touch(self, process):
+        """Record output from a process"""
+        tracked = self._tracked.get(process)
+        if tracked is not None:
+            tracked.last_output = time.monotonic()
+    
+    def untrack(self, process):
+        with self._lock:
+            self._tracked.pop(process, None)
+    
+    def snapshot(self):
+        """Liveness of every tracked run: [{task_id, pid, state, running_s, idle_s, cpu_s, io_bytes}]"""
+        now = time.monotonic()
+        with self._lock:
+            tracked = list(self._tracked.values())
+        return [
+            {
+                "task_id": t.task_id, "pid": t.process.pid, "state": t.state,
+                "running_s": round(now - t.started, 1), "idle_s": round(now - t.last_activity(), 1),
+                "cpu_s": round(t.cpu_time, 2), "io_bytes": t.io_bytes,
+            }
+            for t in tracked
+        ]
+    
+    def count(self, state):
+        with self._lock:
+            return sum(1 for t in self._tracked.values() if t.state == state)
+    
+    def task_state(self, task_id):
+        """busy if any run of the task is busy, stalled if all are, None if none is tracked"""
+        with self._lock:
+            states = [t.state for t in self._tracked.values() if t.task_id == task_id]
+        if not states:
+            return None
+        return LIVE_BUSY if LIVE_BUSY in states else LIVE_STALLED
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._tracked
+            if idle:
+                self._wake.wait()
+            self._wake.clear()
+            
+            with self._lock:
+                tracked = list(self._tracked.values())
+            changes = []
+            for t in tracked:
+                if t.process.poll() is not None:
+                    self.untrack(t.process)
+                    continue
+                self._sample(t)
+                state = LIVE_STALLED if time.monotonic() - t.last_activity() >= t.stall_after else LIVE_BUSY
+                if state != t.state:
+                    t.state = state
+                    changes.append(t)
+            
+            for t in changes:
+                log.info("PID %s (task %s) is %s", t.process.pid, t.task_id, t.state, extra={"task_id": t.task_id})
+                if self.on_change:
+                    try:
+                        self.on_change(t.task_id, t.state)
+                    except Exception:
+                        log.exception("Error in liveness callback")
+            
+            time.sleep(self.interval)
+    
+    def _sample(self, t):
+        """Update CPU time and I/O counters of the process and its children"""
+        try:
+            if t._ps is None:
+                t._ps = psutil.Process(t.process.pid)
+            procs = [t._ps] + t._ps.children(recursive=True)
+        except psutil.Error:
+            return
+        
+        cpu_time = 0.0
+        io_bytes = 0
+        for proc in procs:
+            try:
+                times = proc.cpu_times()
+                cpu_time += times.user + times.system
+            except psutil.Error:
+                pass
+            try:
+                io = proc.io_counters()
+                io_bytes += io.read_bytes + io.write_bytes
+            except (psutil.Error, AttributeError):
+                pass  # Not available on every platform / for every process
+        
+        now = time.monotonic()
+        if cpu_time - t.cpu_time >= CPU_PROGRESS_SHARE * self.interval:
+            t.last_cpu = now
+        if io_bytes > t.io_bytes:
+            t.last_io = now
+        # Totals drop when a child exits - the next sample compares against the new total
+        t.cpu_time = cpu_time
+        t.io_bytes = io_bytes
@@ -0,0 +1,206 @@
+"""
+Log Archive
+Finished run logs compressed into append-only day files, with a chunk index for random access
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from app_logging import get_logger
+
+log = get_logger("log_archive")
+
+CHUNK_BYTES = 1024 * 1024  # Raw output per compressed chunk - the unit of random access
+COMPRESS_LEVEL = 6
+FILE_SUFFIX = ".zlog"
+
+
+class LogArchive:
+    """Compressed long-term storage for run logs
+    
+    Each run's log is split into 1 MiB chunks that are compressed on their
+    own (zlib) and appended to the archive file of the day the run started.
+    index.db records where every chunk sits (file, offset, length), so one
+    run is read back by decompressing just its chunks - never a whole file.
+    Retention drops whole day files, oldest first, by age and total size.
+    """
+    
+    def __init__(self, directory, level=COMPRESS_LEVEL, chunk_bytes=CHUNK_BYTES):
+        self.directory = directory
+        self.level = level
+        self.chunk_bytes = chunk_bytes
+        self._lock = threading.Lock()  # One writer at a time per archive file
+        os.makedirs(directory, exist_ok=True)
+        self._ensure_schema()
+    
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=10)
+    
+    def _ensure_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id INTEGER PRIMARY KEY, task_id INTEGER, task_name TEXT, source TEXT, started REAL, "
+                "finished REAL, exit_code INTEGER, file TEXT, raw_bytes INTEGER, stored_bytes INTEGER)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "run_id INTEGER, seq INTEGER, offset INTEGER, length INTEGER, raw_length INTEGER, "
+                "PRIMARY KEY (run_id, seq))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_file ON runs (file)")
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_task ON runs (task_id, started)")
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def write_run(self, info, chunks):
+        """Archive one run
+        info: {run_id, task_id, task_name, source, started, finished, exit_code}
+        chunks: the run's output as an iterable of str, in order
+        Returns: (raw bytes, stored bytes)"""
+        started = info.get("started") or time.time()
+        file = datetime.fromtimestamp(started).strftime("%Y-%m-%d") + FILE_SUFFIX
+        index = []
+        raw_total = stored_total = 0
+        
+        with self._lock, open(os.path.join(self.directory, file), "ab") as f:
+            offset = f.tell()
+            pending = bytearray()
+            for text in self._rechunk(chunks):
+                data = text.encode("utf-8")
+                compressed = zlib.compress(data, self.level)
+                pending += compressed
+                index.append((info["run_id"], len(index), offset, len(compressed), len(data)))
+                offset += len(compressed)
+                raw_total += len(data)
+                stored_total += len(compressed)
+                if len(pending) >= self.chunk_bytes:
+                    f.write(pending)
+                    pending.clear()
+            f.write(pending)
+            f.flush()
+        
+        conn = self._connect()
+        try:
+            with conn:
+                # A re-archived run replaces its old index (the old bytes stay until the file is dropped)
+                conn.execute("DELETE FROM chunks WHERE run_id = ?", (info["run_id"],))
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs (run_id, task_id, task_name, source, started, finished, exit_code, "
+                    "file, raw_bytes, stored_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (info["run_id"], info.get("task_id"), info.get("task_name"), info.get("source"), started,
+                     info.get("finished"), info.get("exit_code"), file, raw_total, stored_total)
+                )
+                conn.executemany(
+                    "INSERT INTO chunks (run_id, seq, offset, length, raw_length) VALUES (?, ?, ?, ?, ?)", index
+                )
+        finally:
+            conn.close()
+        return raw_total, stored_total
+    
+    def _rechunk(self, chunks):
+        """Regroup text into pieces of about chunk_bytes, cut at line ends where possible"""
+        buffer = []
+        size = 0
+        for text in chunks:
+            buffer.append(text)
+            size += len(text)
+            while size >= self.chunk_bytes:
+                joined = "".join(buffer)
+                cut = joined.rfind("\n", 0, self.chunk_bytes) + 1 or self.chunk_bytes
+                yield joined[:cut]
+                buffer = [joined[cut:]]
+                size = len(joined) - cut
+        if size:
+            yield "".join(buffer)
+    
+    def has_run(self, run_id):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is not None
+        finally:
+            conn.close()
+    
+    def run_info(self, run_id):
+        """{run_id, task_id, task_name, source, started, finished, exit_code, raw_bytes, stored_bytes} or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT run_id, task_id, task_name, source, started, finished, exit_code, raw_bytes, stored_bytes "
+                "FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        keys = ("run_id", "task_id", "task_name", "source", "started", "finished", "exit_code", "raw_bytes", "stored_bytes")
+        return dict(zip(keys, row))
+    
+    def read_run(self, run_id):
+        """Stream a run's log back, one decompressed chunk (str) at a time"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT file FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            chunks = conn.execute(
+                "SELECT offset, length FROM chunks WHERE run_id = ? ORDER BY seq", (run_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        if row is None:
+            return
+        
+        with open(os.path.join(self.directory, row[0]), "rb") as f:
+            for offset, length in chunks:
+                f.seek(offset)
+                yield zlib.decompress(f.read(length)).decode("utf-8", errors="replace")
+    
+    def files(self):
+        """Archive files oldest first: [(name, bytes)]"""
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(FILE_SUFFIX))
+        return [(name, os.path.getsize(os.path.join(self.directory, name))) for name in names]
+    
+    def total_bytes(self):
+        return sum(size for _, size in self.files())
+    
+    def apply_retention(self, max_age_days=None, max_bytes=None):
+        """Drop whole day files older than max_age_days, then the oldest ones until the archive fits in max_bytes
+        The current day's file is never dropped by size.
+        Returns: names of the dropped files"""
+        files = self.files()
+        today = datetime.now().strftime("%Y-%m-%d") + FILE_SUFFIX
+        dropped = []
+        if max_age_days is not None:
+            cutoff = datetime.fromtimestamp(time.time() - max_age_days * 86400).strftime("%Y-%m-%d") + FILE_SUFFIX
+            dropped += [name for name, _ in files if name < cutoff]
+        if max_bytes is not None:
+            total = sum(size for name, size in files if name not in dropped)
+            for name, size in files:
+                if total <= max_bytes or name == today:
+                    break
+                if name not in dropped:
+                    dropped.append(name)
+                    total -= size
+        if not dropped:
+            return []
+        
+        conn = self._connect()
+        try:
+            with self._lock, conn:
+                for name in dropped:
+                    conn.execute("DELETE FROM chunks WHERE run_id IN (SELECT run_id FROM runs WHERE file = ?)", (name,))
+                    conn.execute("DELETE FROM runs WHERE file = ?", (name,))
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError as e:
+                        log.warning("Could not remove archive file %s: %s", name, e)
+        finally:
+            conn.close()
+        log.info("Log archive retention dropped %s", ", ".join(dropped))
+        return dropped
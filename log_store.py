@@ -0,0 +1,370 @@
+"""
+Log Store
+Run output persisted in SQLite and indexed with FTS5 while it streams in
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from app_logging import get_logger
+
+log = get_logger("log_store")
+
+SEGMENT_LINES = 200     # A buffered stream becomes a segment at this many lines...
+SEGMENT_SECONDS = 5.0   # ...or when its oldest line is this old
+FLUSH_INTERVAL = 1.0    # The writer commits queued segments at least this often
+MAINTENANCE_INTERVAL = 3600.0  # How often old runs leave the search index and archive retention runs
+SEARCH_LIMIT = 100
+SNIPPET_TOKENS = 12
+
+STREAM_SCHEDULER = "scheduler"  # The scheduler's own messages in a run's log
+
+
+def _fts5_available():
+    try:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        finally:
+            conn.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def match_query(text):
+    """FTS5 query for what a user typed: every word must appear, the last one as a prefix
+    Words are quoted, so FTS5 operators and punctuation in the text are matched literally."""
+    terms = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class _Buffer:
+    __slots__ = ("run_id", "task_id", "stream", "parts", "lines", "started")
+    
+    def __init__(self, run_id, task_id, stream):
+        self.run_id = run_id
+        self.task_id = task_id
+        self.stream = stream
+        self.parts = []
+        self.lines = 0
+        self.started = time.time()
+
+
+class LogStore:
+    """Keeps every run's output in a SQLite database with a full-text index
+    
+    append() only buffers. Each stream of a run is cut into segments of up to
+    200 lines (or 5 s of output), and one writer thread inserts them together
+    with their index entries in one transaction per batch. Searches by task,
+    time range and text use the index and never scan the stored text.
+    
+    With an archive (log_archive.LogArchive) every finished run is also
+    compressed into it. Runs older than search_days leave the database and
+    the index; they can still be read and exported from the archive.
+    """
+    
+    def __init__(self, db_path, segment_lines=SEGMENT_LINES, segment_seconds=SEGMENT_SECONDS,
+                 archive=None, search_days=None, archive_days=None, archive_max_bytes=None):
+        self.db_path = db_path
+        self.segment_lines = segment_lines
+        self.segment_seconds = segment_seconds
+        self.archive = archive
+        self.search_days = search_days  # None = keep every run searchable
+        self.archive_days = archive_days
+        self.archive_max_bytes = archive_max_bytes
+        self.fts = _fts5_available()
+        self._buffers = {}  # {(run_id, stream): _Buffer}
+        self._run_tasks = {}  # {run_id: task_id} of unfinished runs
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._ensure_schema()
+        self._runs_conn = self._connect(check_same_thread=False)  # start_run() - any thread, under _runs_lock
+        self._runs_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-store", daemon=True)
+        self._thread.start()
+    
+    def _connect(self, check_same_thread=True):
+        return sqlite3.connect(self.db_path, timeout=10, check_same_thread=check_same_thread)
+    
+    def _ensure_schema(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")  # Searches don't wait for the writer
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id INTEGER PRIMARY KEY, task_id INTEGER, task_name TEXT, source TEXT, "
+                "started REAL, finished REAL, exit_code INTEGER)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "id INTEGER PRIMARY KEY, run_id INTEGER, task_id INTEGER, stream TEXT, started REAL, ended REAL, text TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS segments_task ON segments (task_id, started)")
+            conn.execute("CREATE INDEX IF NOT EXISTS segments_run ON segments (run_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_task ON runs (task_id, started)")
+            if self.fts:
+                # External content - the index holds no second copy of the text
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts "
+                    "USING fts5(text, content='segments', content_rowid='id')"
+                )
+            else:
+                log.warning("SQLite has no FTS5 - log search falls back to scanning")
+            conn.commit()
+        finally:
+            conn.close()
+    
+    # -- Writing (any thread) ------------------------------------------------
+    
+    def start_run(self, task_id, task_name, source=None):
+        """Open a run's log
+        The runs row is inserted right away and SQLite picks the id, so instances sharing
+        logs.db (leader and standby) never hand out the same run id.
+        Returns: run_id for append() and finish_run()"""
+        with self._runs_lock, self._runs_conn:
+            run_id = self._runs_conn.execute(
+                "INSERT INTO runs (task_id, task_name, source, started) VALUES (?, ?, ?, ?)",
+                (task_id, task_name, source, time.time())
+            ).lastrowid
+        with self._lock:
+            self._run_tasks[run_id] = task_id
+        return run_id
+    
+    def append(self, run_id, text, stream=None):
+        """Add output to a run's log (buffered - indexed within segment_seconds)"""
+        stream = stream or STREAM_SCHEDULER
+        with self._lock:
+            task_id = self._run_tasks.get(run_id)
+            if task_id is None:
+                return  # Unknown or finished run
+            buffer = self._buffers.get((run_id, stream))
+            if buffer is None:
+                buffer = self._buffers[(run_id, stream)] = _Buffer(run_id, task_id, stream)
+            buffer.parts.append(text)
+            buffer.lines += text.count("\n")
+            if buffer.lines >= self.segment_lines:
+                self._cut(buffer)
+    
+    def finish_run(self, run_id, exit_code=None):
+        """Close a run's log - its remaining output is written right away"""
+        with self._lock:
+            self._run_tasks.pop(run_id, None)
+            for key in [key for key in self._buffers if key[0] == run_id]:
+                self._cut(self._buffers[key])
+        self._queue.put(("finish", (time.time(), exit_code, run_id)))
+    
+    def flush(self, timeout=5):
+        """Write everything appended so far
+        Returns: True if the writer caught up within timeout"""
+        with self._lock:
+            for buffer in list(self._buffers.values()):
+                self._cut(buffer)
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+    
+    def _cut(self, buffer):
+        """Turn a buffer into a segment (caller holds the lock)"""
+        del self._buffers[(buffer.run_id, buffer.stream)]
+        self._queue.put(("segment", (
+            buffer.run_id, buffer.task_id, buffer.stream, buffer.started, time.time(), "".join(buffer.parts)
+        )))
+    
+    def _cut_aged(self):
+        deadline = time.time() - self.segment_seconds
+        with self._lock:
+            for buffer in [b for b in self._buffers.values() if b.started <= deadline]:
+                self._cut(buffer)
+    
+    def _run(self):
+        conn = self._connect()
+        next_maintenance = time.monotonic()
+        while True:
+            try:
+                items = [self._queue.get(timeout=FLUSH_INTERVAL)]
+            except queue.Empty:
+                items = []
+            self._cut_aged()
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if items:
+                self._write(conn, items)
+                if self.archive:
+                    for kind, data in items:
+                        if kind == "finish":
+                            self._archive_run(conn, data[2])
+            if time.monotonic() >= next_maintenance:
+                next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+                self._maintain(conn)
+    
+    def _archive_run(self, conn, run_id):
+        """Compress a finished run into the archive"""
+        row = conn.execute(
+            "SELECT run_id, task_id, task_name, source, started, finished, exit_code FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return
+        info = dict(zip(("run_id", "task_id", "task_name", "source", "started", "finished", "exit_code"), row))
+        texts = (text for (text,) in conn.execute("SELECT text FROM segments WHERE run_id = ? ORDER BY started, id", (run_id,)))
+        try:
+            self.archive.write_run(info, texts)
+        except (OSError, sqlite3.Error) as e:
+            log.warning("Error archiving run %s: %s", run_id, e)
+    
+    def _maintain(self, conn):
+        """Drop runs older than search_days from the database and index, and apply archive retention"""
+        if self.search_days is not None:
+            cutoff = time.time() - self.search_days * 86400
+            try:
+                with conn:
+                    if self.fts:
+                        # External content index - entries are removed by handing back the indexed text
+                        conn.execute(
+                            "INSERT INTO segments_fts (segments_fts, rowid, text) "
+                            "SELECT 'delete', id, text FROM segments WHERE ended < ?", (cutoff,)
+                        )
+                    removed = conn.execute("DELETE FROM segments WHERE ended < ?", (cutoff,)).rowcount
+                if removed:
+                    log.info("Removed %s log segments older than %s days from the search index", removed, self.search_days)
+            except sqlite3.Error as e:
+                log.warning("Error pruning run logs: %s", e)
+        
+        if self.archive and (self.archive_days is not None or self.archive_max_bytes is not None):
+            try:
+                self.archive.apply_retention(self.archive_days, self.archive_max_bytes)
+            except (OSError, sqlite3.Error) as e:
+                log.warning("Error applying log archive retention: %s", e)
+    
+    def _write(self, conn, items):
+        """Write a batch in one transaction
+        If the batch fails, its items are written one transaction each, so one bad item
+        only loses itself - not other runs' segments."""
+        flushed = [data for kind, data in items if kind == "flush"]
+        items = [item for item in items if item[0] != "flush"]
+        try:
+            with conn:
+                for item in items:
+                    self._write_item(conn, item)
+        except sqlite3.Error as e:
+            log.warning("Error writing run logs: %s - retrying item by item", e)
+            for item in items:
+                try:
+                    with conn:
+                        self._write_item(conn, item)
+                except sqlite3.Error as e:
+                    log.warning("Dropped %s for run %s: %s", item[0], item[1][-1] if item[0] == "finish" else item[1][0], e)
+        for done in flushed:
+            done.set()
+    
+    def _write_item(self, conn, item):
+        kind, data = item
+        if kind == "segment":
+            cursor = conn.execute(
+                "INSERT INTO segments (run_id, task_id, stream, started, ended, text) VALUES (?, ?, ?, ?, ?, ?)", data
+            )
+            if self.fts:
+                conn.execute("INSERT INTO segments_fts (rowid, text) VALUES (?, ?)", (cursor.lastrowid, data[5]))
+        elif kind == "finish":
+            conn.execute("UPDATE runs SET finished = ?, exit_code = ? WHERE run_id = ?", data)
+    
+    # -- Reading (any thread) ------------------------------------------------
+    
+    def search(self, text=None, task_id=None, since=None, until=None, stream=None, limit=SEARCH_LIMIT):
+        """Find log segments - text is matched as words (the last one as a prefix), times are epoch seconds
+        Returns: newest first, [{run_id, task_id, task_name, stream, started, snippet}]"""
+        where, params = [], []
+        if task_id is not None:
+            where.append("s.task_id = ?")
+            params.append(task_id)
+        if since is not None:
+            where.append("s.ended >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("s.started <= ?")
+            params.append(until)
+        if stream:
+            where.append("s.stream = ?")
+            params.append(stream)
+        
+        text = (text or "").strip()
+        if text and self.fts:
+            source = "segments_fts JOIN segments s ON s.id = segments_fts.rowid"
+            snippet = f"snippet(segments_fts, 0, '[', ']', '...', {SNIPPET_TOKENS})"
+            order = "segments_fts.rowid"  # Segment ids grow with time - lets FTS5 stop after `limit` hits
+            where.insert(0, "segments_fts MATCH ?")
+            params.insert(0, match_query(text))
+        else:
+            source = "segments s"
+            snippet = "substr(s.text, 1, 200)"
+            order = "s.id"
+            if text:
+                where.append("s.text LIKE ? ESCAPE '\\'")
+                params.append("%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        
+        sql = (
+            f"SELECT s.run_id, s.task_id, r.task_name, s.stream, s.started, {snippet} "
+            f"FROM {source} LEFT JOIN runs r ON r.run_id = s.run_id "
+            + (f"WHERE {' AND '.join(where)} " if where else "")
+            + f"ORDER BY {order} DESC LIMIT ?"
+        )
+        params.append(limit)
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            log.warning("Log search failed: %s", e)
+            return []
+        finally:
+            conn.close()
+        return [
+            dict(zip(("run_id", "task_id", "task_name", "stream", "started", "snippet"), row))
+            for row in rows
+        ]
+    
+    def run_info(self, run_id):
+        """{run_id, task_id, task_name, source, started, finished, exit_code} or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT run_id, task_id, task_name, source, started, finished, exit_code FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return self.archive.run_info(run_id) if self.archive else None
+        return dict(zip(("run_id", "task_id", "task_name", "source", "started", "finished", "exit_code"), row))
+    
+    def iter_run(self, run_id):
+        """Stream a run's output, in the order it was written (per stream segment)
+        Runs no longer in the database are read from the archive."""
+        conn = self._connect()
+        try:
+            found = False
+            for (text,) in conn.execute("SELECT text FROM segments WHERE run_id = ? ORDER BY started, id", (run_id,)):
+                found = True
+                yield text
+        finally:
+            conn.close()
+        if not found and self.archive:
+            yield from self.archive.read_run(run_id)
+    
+    def run_log(self, run_id):
+        """A run's whole output as one string"""
+        return "".join(self.iter_run(run_id))
+    
+    def export_run(self, run_id, filename):
+        """Write a run's output to a text file, chunk by chunk"""
+        self.flush()
+        with open(filename, "w", encoding="utf-8") as f:
+            for text in self.iter_run(run_id):
+                f.write(text)
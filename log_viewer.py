@@ -0,0 +1,260 @@
+"""
+Log Viewer Backend
+Append-only log files read through mmap, with a sparse line-offset index built as text arrives
+"""
+
+import bisect
+import math
+import mmap
+import os
+import re
+import threading
+import time
+from array import array
+from datetime import datetime
+
+CHECKPOINT_LINES = 64     # One index entry (byte offset + time) per this many lines
+TRIM_SLACK = 1024         # Least lines over a stream's limit before the file is rewritten
+SCAN_BLOCK = 4 * 1024 * 1024
+STDERR_MARK = "\x1e"      # Starts every stderr line in the file - the viewer colors those lines
+
+# A leading time in scanned files ("2024-05-02 10:00:01", "[10:00:01]", ...)
+LEADING_TIME = re.compile(rb"^\W{0,2}(?:(\d{4})-(\d{2})-(\d{2})[ T])?(\d{2}):(\d{2}):(\d{2})")
+
+
+class MappedLog:
+    """A log file that is appended to and read back by line number or time
+    
+    Memory does not grow with the file: reads go through mmap, and the index
+    keeps one byte offset per 64 lines (about 16 KB per million lines). Each
+    index entry also records when its line was written, so the viewer can jump
+    to a time. Files written elsewhere are indexed by refresh(), with times
+    taken from a leading timestamp where lines have one.
+    
+    limits caps the lines appended per stream ({"stdout": 100000, "stderr": None},
+    None = keep all): once a stream is half its limit over it (at least
+    TRIM_SLACK lines) the file is rewritten without that stream's oldest lines.
+    Text appended without a stream counts as stdout.
+    """
+    
+    def __init__(self, path, truncate=False, limits=None):
+        self.path = path
+        self.limits = {stream: limit for stream, limit in (limits or {}).items() if limit is not None}
+        self._trim_at = {stream: limit + max(limit // 2, TRIM_SLACK) for stream, limit in self.limits.items()}
+        self._counts = {"stdout": 0, "stderr": 0}  # Complete lines appended per stream
+        self.dropped = 0  # Lines trimmed from the start of the file so far
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "wb" if truncate else "ab")
+        self._lock = threading.Lock()
+        self._map = None
+        self._offsets = array("Q", [0])         # Byte offset of lines 0, 64, 128, ...
+        self._times = array("d", [time.time()])  # When each of those lines was written
+        self._lines = 0       # Complete lines indexed
+        self._indexed = 0     # Bytes indexed
+        self._partial = False  # The last line has no newline yet
+        self.closed = False
+        self.refresh()
+    
+    def append(self, text, stream=None):
+        """Append output (any thread) - stderr lines are marked for the viewer
+        The mark only ever starts a line: stderr that continues an unfinished line is not marked."""
+        with self._lock:
+            if self.closed:
+                return  # Output that arrives after the panel is gone
+            if stream == "stderr":
+                text = text.replace("\n", "\n" + STDERR_MARK)
+                if not self._partial:
+                    text = STDERR_MARK + text
+                if text.endswith(STDERR_MARK):
+                    text = text[:-1]
+            data = text.encode("utf-8", errors="replace")
+            self._file.write(data)
+            self._file.flush()
+            self._index(data, time.time())
+            if self.limits:
+                self._counts["stderr" if stream == "stderr" else "stdout"] += text.count("\n")
+                if any(self._counts[s] > at for s, at in self._trim_at.items()):
+                    self._trim()
+    
+    def refresh(self):
+        """Index bytes written by someone else (and an existing file on open)"""
+        with self._lock:
+            size = os.path.getsize(self.path)
+            if size <= self._indexed:
+                return
+            view = self._view(size)
+            if self._indexed == 0:
+                # Line 0 of an existing file: its own timestamp, else when the file was last written
+                first = self._parse_time(view[:32])
+                self._times[0] = first if first is not None else os.path.getmtime(self.path)
+            while self._indexed < size:
+                data = view[self._indexed:min(size, self._indexed + SCAN_BLOCK)]
+                self._index(data, None)
+    
+    def _index(self, data, when):
+        """Count the lines in newly written data and add index entries (caller holds the lock)"""
+        base = self._indexed
+        self._indexed += len(data)
+        if not data:
+            return
+        self._partial = not data.endswith(b"\n")
+        newlines = data.count(b"\n")
+        to_next = CHECKPOINT_LINES - self._lines % CHECKPOINT_LINES
+        if newlines < to_next:
+            self._lines += newlines
+            return
+        
+        pos = -1
+        for _ in range(to_next):
+            pos = data.find(b"\n", pos + 1)
+        while True:
+            self._lines += to_next
+            newlines -= to_next
+            self._add_checkpoint(base + pos + 1, data, pos + 1, when)
+            to_next = CHECKPOINT_LINES
+            if newlines < to_next:
+                self._lines += newlines
+                return
+            for _ in range(to_next):
+                pos = data.find(b"\n", pos + 1)
+    
+    def _trim(self):
+        """Rewrite the file without each limited stream's oldest lines (caller holds the lock)
+        Kept lines keep the write times of their old index entries."""
+        view = self._view()
+        lines = view[:self._indexed].split(b"\n")
+        mark = STDERR_MARK.encode()
+        counts = {"stdout": 0, "stderr": 0}
+        streams = []
+        for line in lines[:-1]:
+            stream = "stderr" if line.startswith(mark) else "stdout"
+            counts[stream] += 1
+            streams.append(stream)
+        excess = {s: max(0, counts[s] - limit) for s, limit in self.limits.items()}
+        
+        offsets = array("Q", [0])
+        times = array("d", [self._times[0]])
+        kept = []
+        size = 0
+        for number, line in enumerate(lines[:-1]):
+            stream = streams[number]
+            if excess.get(stream):
+                excess[stream] -= 1
+                counts[stream] -= 1
+                continue
+            if kept and len(kept) % CHECKPOINT_LINES == 0:
+                offsets.append(size)
+                times.append(self._times[number // CHECKPOINT_LINES])
+            kept.append(line)
+            size += len(line) + 1
+        if len(kept) == len(lines) - 1:
+            return
+        kept.append(lines[-1])  # The unfinished last line (empty if there is none)
+        
+        temp_path = self.path + ".trim"
+        with open(temp_path, "wb") as f:
+            f.write(b"\n".join(kept))
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "ab")
+        
+        self.dropped += len(lines) - len(kept)
+        self._counts = counts
+        self._offsets = offsets
+        self._times = times
+        self._lines = len(kept) - 1
+        self._indexed = size + len(lines[-1])
+    
+    def _add_checkpoint(self, offset, data, start, when):
+        if when is None:
+            when = self._parse_time(data[start:start + 32])
+            if when is None or when < self._times[-1]:
+                when = self._times[-1]  # No (or an out-of-order) timestamp - keep the index sorted
+        self._offsets.append(offset)
+        self._times.append(when)
+    
+    def _parse_time(self, head):
+        match = LEADING_TIME.match(head)
+        if not match:
+            return None
+        year, month, day, hour, minute, second = match.groups()
+        base = datetime.fromtimestamp(self._times[-1])
+        try:
+            stamp = base.replace(hour=int(hour), minute=int(minute), second=int(second), microsecond=0)
+            if year:
+                stamp = stamp.replace(year=int(year), month=int(month), day=int(day))
+        except ValueError:
+            return None
+        return stamp.timestamp()
+    
+    def _view(self, size=None):
+        """mmap of the file, re-mapped when the file has grown (caller holds the lock)"""
+        size = self._indexed if size is None else size
+        if size == 0:
+            return b""
+        if self._map is None or len(self._map) < size:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+    
+    def __len__(self):
+        return self._lines + (1 if self._partial else 0)
+    
+    def lines(self, start, count):
+        """Up to `count` lines from line number `start` (without newlines, stderr lines still marked)"""
+        with self._lock:
+            if self.closed:
+                return []
+            total = self._lines + (1 if self._partial else 0)
+            start = max(0, min(start, total))
+            count = max(0, min(count, total - start))
+            if not count:
+                return []
+            view = self._view()
+            end_of_data = self._indexed
+            
+            checkpoint = start // CHECKPOINT_LINES
+            pos = self._offsets[checkpoint]
+            for _ in range(start - checkpoint * CHECKPOINT_LINES):
+                pos = view.find(b"\n", pos, end_of_data) + 1
+            
+            result = []
+            for _ in range(count):
+                end = view.find(b"\n", pos, end_of_data)
+                if end == -1:
+                    end = end_of_data
+                result.append(view[pos:end].decode("utf-8", errors="replace"))
+                pos = end + 1
+            return result
+    
+    def line_at_time(self, when):
+        """Number of the first indexed line written at or after `when` (epoch seconds), to within 64 lines"""
+        with self._lock:
+            checkpoint = max(0, bisect.bisect_left(self._times, when) - 1)
+            return checkpoint * CHECKPOINT_LINES
+    
+    def time_of_line(self, line):
+        """When a line was written (the time of its index entry) - NaN if unknown"""
+        with self._lock:
+            checkpoint = min(line // CHECKPOINT_LINES, len(self._times) - 1)
+            return self._times[checkpoint] if checkpoint >= 0 else math.nan
+    
+    def close(self, delete=False):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+        if delete:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,284 @@
+"""
+Metrics
+Prometheus-style counters, gauges and histograms served as text on localhost
+"""
+
+import bisect
+import threading
+import time
+
+from app_logging import get_logger
+
+log = get_logger("metrics")
+
+# Seconds - covers sub-millisecond launches up to slow disk writes
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+    
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+    
+    def samples(self, name, labels):
+        return [(name, labels, self.value)]
+
+
+class _GaugeValue:
+    __slots__ = ("value", "function", "_lock")
+    
+    def __init__(self):
+        self.value = 0
+        self.function = None
+        self._lock = threading.Lock()
+    
+    def set(self, value):
+        self.value = value
+    
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount=1):
+        self.inc(-amount)
+    
+    def set_function(self, function):
+        """Compute the value only when scraped (no cost on the hot path)"""
+        self.function = function
+    
+    def samples(self, name, labels):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                return []
+        return [(name, labels, value)]
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+    
+    def samples(self, name, labels):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            result.append((f"{name}_bucket", labels + (("le", _format_value(float(bound))),), cumulative))
+        result.append((f"{name}_sum", labels, total))
+        result.append((f"{name}_count", labels, cumulative))
+        return result
+
+
+class _Timer:
+    """Context manager that observes the elapsed seconds into a histogram"""
+    
+    __slots__ = ("histogram", "start")
+    
+    def __init__(self, histogram):
+        self.histogram = histogram
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Metric:
+    """A named metric family, optionally split by label values"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}  # {label values: value object}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self._child(())
+    
+    def _new_value(self):
+        raise NotImplementedError
+    
+    def _child(self, key):
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_value())
+        return child
+    
+    def labels(self, *values, **labels):
+        """Get the child for a set of label values"""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return self._child(tuple(str(value) for value in values))
+    
+    def expose(self):
+        """Text exposition lines for this family"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            labels = tuple(zip(self.labelnames, key))
+            for name, sample_labels, value in child.samples(self.name, labels):
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in sample_labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def _new_value(self):
+        return _CounterValue()
+    
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+    
+    def _new_value(self):
+        return _GaugeValue()
+    
+    def set(self, value):
+        self._default.set(value)
+    
+    def inc(self, amount=1):
+        self._default.inc(amount)
+    
+    def dec(self, amount=1):
+        self._default.dec(amount)
+    
+    def set_function(self, function):
+        self._default.set_function(function)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_value(self):
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value):
+        self._default.observe(value)
+    
+    def time(self):
+        """with HISTOGRAM.time(): ... - observes the block's duration"""
+        return _Timer(self._default)
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together on scrape"""
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def get(self, name):
+        return self._metrics.get(name)
+    
+    def expose(self):
+        """Render every metric in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, documentation, labelnames=(), registry=REGISTRY):
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=(), registry=REGISTRY):
+    return registry.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def start_metrics_server(port, registry=REGISTRY):
+    """Serve /metrics on 127.0.0.1 from a daemon thread
+    Nothing is computed until a scraper connects.
+    Returns: the server (call shutdown() to stop it)"""
+    # http.server is only imported when the endpoint is enabled
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            log.debug("Metrics request: " + format, *args)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", int(port)), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    log.info("Metrics endpoint on http://127.0.0.1:%s/metrics", server.server_address[1])
+    return server
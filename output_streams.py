@@ -0,0 +1,224 @@
+"""
+Output Streams
+stdout / stderr capture for every run multiplexed on one reader thread
+"""
+
+import codecs
+import io
+import locale
+import os
+import re
+import selectors
+import threading
+
+from app_logging import get_logger
+
+log = get_logger("output_streams")
+
+STREAM_STDOUT = "stdout"
+STREAM_STDERR = "stderr"
+STREAMS = (STREAM_STDOUT, STREAM_STDERR)
+DEFAULT_RETENTION = {STREAM_STDOUT: 100000, STREAM_STDERR: None}  # Lines kept per log panel (None = all)
+
+READ_CHUNK = 65536          # Bytes per os.read()
+READ_BATCH = 1024 * 1024    # Bytes drained from one source before serving the others
+MAX_PARTIAL_LINE = 65536    # Flush a line without newline once it gets this long
+POLL_INTERVAL = 0.05        # ConPTY handles can't be selected - poll them this often
+DRAIN_TIMEOUT = 2.0         # How long completion waits for the last output after exit
+
+# Colors, cursor movement and window titles - a terminal would interpret them, the log panel can't
+ANSI_ESCAPE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])")
+
+
+def selectable():
+    """True if pipes can be multiplexed with a selector here (not on Windows)"""
+    return os.name == "posix"
+
+
+class _Run:
+    """The sources of one process - on_close fires when the last one ends"""
+    
+    __slots__ = ("on_output", "on_close", "open")
+    
+    def __init__(self, on_output, on_close, count):
+        self.on_output = on_output
+        self.on_close = on_close
+        self.open = count
+
+
+class LineDecoder:
+    """Incremental decoding and line assembly for one output stream"""
+    
+    __slots__ = ("decoder", "newlines", "partial", "strip_ansi")
+    
+    def __init__(self, encoding=None, strip_ansi=False):
+        self.decoder = codecs.getincrementaldecoder(encoding or locale.getpreferredencoding(False))(errors="replace")
+        # Same newline handling as a text-mode pipe: "\r\n" and "\r" become "\n"
+        self.newlines = io.IncrementalNewlineDecoder(None, translate=True)
+        self.partial = ""
+        self.strip_ansi = strip_ansi
+    
+    def feed(self, data, final=False):
+        """Decode bytes (pipes, POSIX PTYs) or take text (ConPTY)
+        Returns: the complete lines so far ("" if none) - everything once final"""
+        if isinstance(data, bytes):
+            data = self.decoder.decode(data, final)
+        text = self.partial + self.newlines.decode(data, final)
+        cut = len(text) if final or len(text) > MAX_PARTIAL_LINE else text.rfind("\n") + 1
+        self.partial = text[cut:]
+        text = text[:cut]
+        if text and self.strip_ansi:
+            text = ANSI_ESCAPE.sub("", text)
+        return text
+
+
+class _Source:
+    """One pipe or PTY being read by the OutputReader"""
+    
+    __slots__ = ("run", "stream", "source", "fd", "lines")
+    
+    def __init__(self, run, stream, source, encoding=None, strip_ansi=False):
+        self.run = run
+        self.stream = stream
+        self.source = source
+        self.fd = None if hasattr(source, "at_eof") else (source if isinstance(source, int) else source.fileno())
+        self.lines = LineDecoder(encoding, strip_ansi)
+    
+    def feed(self, data, final=False):
+        """Pass on the complete lines in newly read data"""
+        text = self.lines.feed(data, final)
+        if text:
+            try:
+                self.run.on_output(text, self.stream)
+            except Exception:
+                log.exception("Error in output callback")
+    
+    def close(self):
+        """Close the source; the run's on_close fires after its last source"""
+        if self.fd is not None:
+            try:
+                if isinstance(self.source, int):
+                    os.close(self.fd)
+                else:
+                    self.source.close()
+            except OSError:
+                pass
+        self.run.open -= 1
+        if self.run.open == 0:
+            try:
+                self.run.on_close()
+            except Exception:
+                log.exception("Error in output close callback")
+
+
+class OutputReader:
+    """Reads the output of every captured run from one background thread
+    
+    Pipes and POSIX PTYs are multiplexed with a selector; each ready source is
+    drained in 64 KiB reads (up to 1 MiB per turn) and handed on as one block of
+    whole lines tagged with its stream, so a chatty process costs one callback
+    per burst instead of one per line. ConPTY handles can't be selected and are
+    polled with non-blocking reads.
+    """
+    
+    def __init__(self):
+        self._pending = []  # Sources added since the reader last looked
+        self._polled = []   # ConPTY sources
+        self._lock = threading.Lock()
+        self._thread = None
+        self._selector = None
+        self._wake_fds = None
+        self._wake = threading.Event()
+    
+    def add(self, sources, on_output, on_close=None, encoding=None, strip_ansi=False):
+        """Start reading a process's output
+        sources: [(source, stream name)] - a pipe, a file descriptor or a ConPtyProcess
+        on_output(text, stream) gets blocks of whole lines; on_close() runs once every source has ended."""
+        run = _Run(on_output, on_close or (lambda: None), len(sources))
+        with self._lock:
+            for source, stream in sources:
+                self._pending.append(_Source(run, stream, source, encoding, strip_ansi))
+            if self._thread is None:
+                if selectable():
+                    self._selector = selectors.DefaultSelector()
+                    self._wake_fds = os.pipe()
+                    os.set_blocking(self._wake_fds[0], False)
+                    self._selector.register(self._wake_fds[0], selectors.EVENT_READ)
+                self._thread = threading.Thread(target=self._run, name="output-reader", daemon=True)
+                self._thread.start()
+        # Interrupt select() so the new sources are registered right away
+        if self._wake_fds is not None:
+            os.write(self._wake_fds[1], b"\0")
+        self._wake.set()
+    
+    def _take_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for source in pending:
+            if source.fd is not None:
+                os.set_blocking(source.fd, False)
+                self._selector.register(source.fd, selectors.EVENT_READ, source)
+            else:
+                self._polled.append(source)
+    
+    def _run(self):
+        while True:
+            self._take_pending()
+            if self._selector is not None:
+                for key, _ in self._selector.select(POLL_INTERVAL if self._polled else None):
+                    if key.data is None:
+                        try:
+                            os.read(key.fd, 4096)  # Wake-up bytes
+                        except BlockingIOError:
+                            pass
+                    else:
+                        self._read_fd(key.data)
+            elif not self._polled:
+                self._wake.wait()
+            self._wake.clear()
+            
+            if self._polled and not self._poll_conpty() and self._selector is None:
+                self._wake.wait(POLL_INTERVAL)
+    
+    def _read_fd(self, source):
+        """Drain a ready source - EOF (or EIO from a PTY on Linux) means every writer has closed it"""
+        chunks = []
+        size = 0
+        eof = False
+        while size < READ_BATCH:
+            try:
+                data = os.read(source.fd, READ_CHUNK)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""
+            if not data:
+                eof = True
+                break
+            chunks.append(data)
+            size += len(data)
+        
+        source.feed(b"".join(chunks), final=eof)
+        if eof:
+            self._selector.unregister(source.fd)
+            source.close()
+    
+    def _poll_conpty(self):
+        """One non-blocking read of each ConPTY
+        Returns: True if any of them had output"""
+        got_output = False
+        for source in list(self._polled):
+            try:
+                text = source.source.read()
+                eof = not text and source.source.at_eof()
+            except Exception:
+                text, eof = "", True
+            if text:
+                got_output = True
+                source.feed(text)
+            if eof:
+                source.feed("", final=True)
+                self._polled.remove(source)
+                source.close()
+        return got_output
+
@@ -0,0 +1,164 @@
+"""
+Process Registry
+Thread-safe tracking of running processes for the scheduler
+"""
+
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+
+# Immutable view of a registry entry (safe to hand to the UI thread)
+ProcessInfo = namedtuple(
+    "ProcessInfo",
+    ["key", "slot_id", "task_id", "exe_path", "pid", "start_time", "process"]
+)
+
+
+class ProcessEntry:
+    """Mutable registry entry - only touched while holding the registry lock"""
+    
+    __slots__ = ("key", "slot_id", "task_id", "exe_path", "process", "pid", "start_time")
+    
+    def __init__(self, key, slot_id, task_id=None, exe_path=None):
+        self.key = key
+        self.slot_id = slot_id
+        self.task_id = task_id
+        self.exe_path = exe_path
+        self.process = None  # Set by attach() once Popen succeeds
+        self.pid = None
+        self.start_time = time.time()
+    
+    def is_alive(self):
+        """True while the slot is reserved or the process has not exited"""
+        if self.process is None:
+            return True  # Reserved, launch in progress
+        return self.process.poll() is None
+    
+    def info(self):
+        """Return an immutable snapshot of this entry"""
+        return ProcessInfo(
+            self.key, self.slot_id, self.task_id, self.exe_path,
+            self.pid, self.start_time, self.process
+        )
+
+
+class ProcessRegistry:
+    """Lock-protected registry of running processes keyed by dedup slot
+    
+    A slot is claimed with try_acquire() before the process is launched, so the
+    check and the claim happen atomically - two triggers firing together can no
+    longer both see the slot as free and double-launch. A key may hold up to
+    `limit` entries to support parallel instances of the same task.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}  # {key: {slot_id: ProcessEntry}}
+        self._slot_ids = itertools.count(1)
+    
+    def _reap(self, key):
+        """Drop dead entries for a key and return the live ones (lock must be held)"""
+        slots = self._entries.get(key)
+        if not slots:
+            return []
+        for slot_id in [s for s, e in slots.items() if not e.is_alive()]:
+            del slots[slot_id]
+        if not slots:
+            del self._entries[key]
+            return []
+        return list(slots.values())
+    
+    def try_acquire(self, key, task_id=None, exe_path=None, limit=1):
+        """Atomically reserve a slot
+        Returns: ProcessInfo for the reservation, or None if `limit` live processes hold the key"""
+        with self._lock:
+            if len(self._reap(key)) >= limit:
+                return None
+            
+            entry = ProcessEntry(key, next(self._slot_ids), task_id=task_id, exe_path=exe_path)
+            self._entries.setdefault(key, {})[entry.slot_id] = entry
+            return entry.info()
+    
+    def attach(self, key, process, slot_id=None):
+        """Attach the launched process to a reserved slot"""
+        with self._lock:
+            slots = self._entries.setdefault(key, {})
+            entry = slots.get(slot_id) if slot_id is not None else next(
+                (e for e in slots.values() if e.process is None), None
+            )
+            if entry is None:
+                # Slot was force-released while launching - track it anyway
+                entry = ProcessEntry(key, slot_id or next(self._slot_ids))
+                slots[entry.slot_id] = entry
+            entry.process = process
+            entry.pid = process.pid
+            entry.start_time = time.time()
+    
+    def release(self, key, process=None, slot_id=None):
+        """Free a slot
+        
+        When process or slot_id is given, only that entry is freed, so a late
+        monitor thread cannot evict a newer run. Otherwise the whole key is freed.
+        Returns: True if an entry was removed
+        """
+        with self._lock:
+            slots = self._entries.get(key)
+            if not slots:
+                return False
+            
+            if slot_id is not None:
+                removed = slots.pop(slot_id, None) is not None
+            elif process is not None:
+                match = next((s for s, e in slots.items() if e.process is process), None)
+                removed = match is not None and slots.pop(match, None) is not None
+            else:
+                slots.clear()
+                removed = True
+            
+            if not slots:
+                del self._entries[key]
+            return removed
+    
+    def is_running(self, key):
+        """Check if a key is held by a live (or launching) process, reaping dead entries"""
+        with self._lock:
+            return bool(self._reap(key))
+    
+    def count(self, key):
+        """Number of live entries holding a key"""
+        with self._lock:
+            return len(self._reap(key))
+    
+    def get(self, key):
+        """Get a snapshot of the oldest live entry for a key (or None)"""
+        with self._lock:
+            entries = self._reap(key)
+            return entries[0].info() if entries else None
+    
+    def entries(self, key):
+        """Get snapshots of every live entry for a key"""
+        with self._lock:
+            return [entry.info() for entry in self._reap(key)]
+    
+    def snapshot(self, alive_only=True):
+        """Return a list of ProcessInfo for all entries under a single lock acquisition"""
+        with self._lock:
+            return [
+                entry.info()
+                for slots in self._entries.values()
+                for entry in slots.values()
+                if not alive_only or entry.is_alive()
+            ]
+    
+    def pop_all(self):
+        """Remove and return every entry (used on shutdown)"""
+        with self._lock:
+            entries = [entry.info() for slots in self._entries.values() for entry in slots.values()]
+            self._entries.clear()
+            return entries
+    
+    def __len__(self):
+        with self._lock:
+            return sum(len(slots) for slots in self._entries.values())
@@ -0,0 +1,99 @@
+"""
+Process Watchdog
+Run timeouts - absolute and no-output - enforced by one background thread
+"""
+
+import threading
+import time
+
+from app_logging import get_logger
+
+log = get_logger("process_watchdog")
+
+TIMEOUT_TOTAL = "timeout"             # Ran longer than the task's timeout
+TIMEOUT_IDLE = "idle_timeout"         # No output for idle_timeout seconds
+CHECK_INTERVAL = 0.5
+
+
+class _Watch:
+    __slots__ = ("process", "deadline", "idle_timeout", "last_output", "on_timeout")
+    
+    def __init__(self, process, deadline, idle_timeout, on_timeout):
+        self.process = process
+        self.deadline = deadline
+        self.idle_timeout = idle_timeout
+        self.last_output = time.monotonic()
+        self.on_timeout = on_timeout
+
+
+class ProcessWatchdog:
+    """Fires a callback once when a watched process exceeds its time limits
+    
+    The callback decides what to do (usually kill the process tree). Output
+    sources call touch() so idle timeouts only fire for silent processes.
+    """
+    
+    def __init__(self, interval=CHECK_INTERVAL):
+        self.interval = interval
+        self._watches = {}  # {process: _Watch}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    def watch(self, process, timeout=None, idle_timeout=None, on_timeout=None):
+        """Start enforcing limits (seconds; None or 0 = no limit) on a process
+        on_timeout(reason) is called from the watchdog thread with TIMEOUT_TOTAL or TIMEOUT_IDLE."""
+        if not timeout and not idle_timeout:
+            return
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._watches[process] = _Watch(process, deadline, idle_timeout or None, on_timeout)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="process-watchdog", daemon=True)
+                self._thread.start()
+        self._wake.set()
+    
+    def touch(self, process):
+        """Record output from a process (resets its idle timer)"""
+        watch = self._watches.get(process)
+        if watch is not None:
+            watch.last_output = time.monotonic()
+    
+    def unwatch(self, process):
+        with self._lock:
+            self._watches.pop(process, None)
+    
+    def __len__(self):
+        return len(self._watches)
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._watches
+            if idle:
+                # Nothing to watch - sleep until watch() adds something
+                self._wake.wait()
+            self._wake.clear()
+            
+            expired = []
+            now = time.monotonic()
+            with self._lock:
+                for process, watch in list(self._watches.items()):
+                    if process.poll() is not None:
+                        del self._watches[process]
+                    elif watch.deadline is not None and now >= watch.deadline:
+                        expired.append((watch, TIMEOUT_TOTAL))
+                        del self._watches[process]
+                    elif watch.idle_timeout and now - watch.last_output >= watch.idle_timeout:
+                        expired.append((watch, TIMEOUT_IDLE))
+                        del self._watches[process]
+            
+            for watch, reason in expired:
+                log.warning("PID %s hit its %s", watch.process.pid, reason.replace("_", " "))
+                if watch.on_timeout:
+                    try:
+                        watch.on_timeout(reason)
+                    except Exception:
+                        log.exception("Error in timeout callback")
+            
+            time.sleep(self.interval)
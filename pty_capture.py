@@ -0,0 +1,118 @@
+"""
+PTY Capture
+Console apps on a pseudo-terminal, so they line-buffer (read by output_streams.OutputReader)
+"""
+
+import importlib.util
+import os
+import signal
+import subprocess
+import time
+
+from lazy_import import lazy_import
+
+winpty = lazy_import("winpty")  # pywinpty - optional ConPTY backend on Windows
+
+# Capture modes (task option `capture`, config.json `capture_mode`)
+CAPTURE_PIPE = "pipe"  # stdout/stderr pipes - apps may block-buffer their output
+CAPTURE_PTY = "pty"    # Pseudo-terminal - apps see a console and flush every line
+CAPTURE_MODES = (CAPTURE_PIPE, CAPTURE_PTY)
+
+COLUMNS, ROWS = 200, 50  # Terminal size reported to the app
+
+
+def available():
+    """True if PTY capture works here (always on POSIX, with pywinpty on Windows)"""
+    if os.name == "posix":
+        return True
+    return importlib.util.find_spec("winpty") is not None
+
+
+def spawn(exe_path, cwd=None):
+    """Start exe_path with stdout and stderr on a new pseudo-terminal (stdin stays closed)
+    Returns: a Popen (POSIX) or ConPtyProcess (Windows) - read it with pty_source()"""
+    if os.name != "posix":
+        return ConPtyProcess(exe_path, cwd=cwd)
+    
+    import pty
+    import termios
+    import fcntl
+    import struct
+    
+    master, slave = pty.openpty()
+    try:
+        # No "\n" -> "\r\n" translation, and a sensible size for apps that ask
+        attrs = termios.tcgetattr(slave)
+        attrs[1] &= ~termios.OPOST
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", ROWS, COLUMNS, 0, 0))
+        
+        process = subprocess.Popen(
+            exe_path,
+            stdout=slave,
+            stderr=slave,
+            stdin=subprocess.DEVNULL,
+            cwd=cwd,
+            env=dict(os.environ, TERM="dumb")  # Ask apps not to send colors
+        )
+    except BaseException:
+        os.close(master)
+        raise
+    finally:
+        os.close(slave)  # The child holds its own copy - EOF arrives when it exits
+    
+    os.set_blocking(master, False)
+    process.pty_fd = master
+    return process
+
+
+def pty_source(process):
+    """What OutputReader reads for a process from spawn(): the PTY's fd, or the ConPtyProcess itself"""
+    return process.pty_fd if process.pty_fd is not None else process
+
+
+class ConPtyProcess:
+    """Popen-like wrapper around a Windows ConPTY process (pywinpty)
+    
+    Has what the executor needs from a Popen: pid, returncode, poll, wait, terminate, kill.
+    """
+    
+    pty_fd = None
+    
+    def __init__(self, exe_path, cwd=None):
+        self.args = exe_path
+        self.returncode = None
+        self.pty = winpty.PTY(COLUMNS, ROWS)
+        if exe_path.lower().endswith((".bat", ".cmd")):
+            appname, cmdline = os.environ.get("COMSPEC", "cmd.exe"), f'/c "{exe_path}"'
+        else:
+            appname, cmdline = exe_path, None
+        if not self.pty.spawn(appname, cmdline=cmdline, cwd=cwd):
+            raise OSError(f"ConPTY could not start {exe_path}")
+        self.pid = self.pty.pid
+    
+    def read(self):
+        """Output available right now ("" if none)"""
+        return self.pty.read(blocking=False)
+    
+    def at_eof(self):
+        return self.pty.iseof()
+    
+    def poll(self):
+        if self.returncode is None and not self.pty.isalive():
+            self.returncode = self.pty.get_exitstatus()
+        return self.returncode
+    
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(0.1)
+        return self.returncode
+    
+    def terminate(self):
+        if self.poll() is None:
+            os.kill(self.pid, signal.SIGTERM)  # TerminateProcess on Windows
+    
+    kill = terminate
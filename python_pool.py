@@ -0,0 +1,173 @@
+"""
+Python Worker Pool
+Pre-started Python interpreters for .py tasks - skips cold start and preload imports
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import deque
+
+from app_logging import get_logger
+
+log = get_logger("python_pool")
+
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# Runs inside each worker: import the preload modules, wait for one job on stdin,
+# then run the script as __main__. Each worker runs a single job and exits, so
+# tasks never share interpreter state. Passed with -c so it also works when the
+# scheduler itself is a frozen executable.
+WORKER_CODE = r"""
+import sys, os, json, runpy, importlib
+for _name in sys.argv[1:]:
+    try:
+        importlib.import_module(_name)
+    except Exception as _e:
+        sys.stderr.write(f"[pool] preload {_name} failed: {_e}\n")
+_line = sys.stdin.readline()
+if not _line:
+    sys.exit(0)
+_job = json.loads(_line)
+sys.stdin.close()
+sys.stdin = open(os.devnull)
+os.chdir(_job["cwd"])
+sys.argv = [_job["script"]] + _job.get("args", [])
+sys.path[0] = os.path.dirname(_job["script"])
+del _line, _job
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def find_interpreter(configured=None):
+    """Python interpreter for workers
+    A frozen scheduler's sys.executable is the scheduler itself, so it needs a configured path.
+    Returns: path or None if no interpreter is available"""
+    if configured:
+        return configured if os.path.exists(configured) else None
+    if getattr(sys, "frozen", False):
+        return None
+    return sys.executable
+
+
+class PythonWorkerPool:
+    """Keeps `size` warm worker processes ready to run .py tasks
+    
+    run() hands a job to a ready worker and returns its Popen - with stdout/stderr
+    pipes just like a normal launch - so the executor streams and monitors it the
+    same way. A replacement worker is started in the background.
+    """
+    
+    def __init__(self, interpreter, size=2, preload=()):
+        self.interpreter = interpreter
+        self.size = max(1, int(size))
+        self.preload = [name for name in preload if name]
+        self._ready = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._refilling = False
+        self.warm_runs = 0
+        self.cold_runs = 0
+    
+    def start(self):
+        """Start the initial workers in the background"""
+        threading.Thread(target=self._refill, name="python-pool-refill", daemon=True).start()
+    
+    def _spawn(self):
+        env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+        return subprocess.Popen(
+            [self.interpreter, "-u", "-c", WORKER_CODE] + self.preload,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=CREATE_NO_WINDOW,
+            text=True,
+            bufsize=1,
+            encoding="utf-8",
+            errors="replace",
+            env=env
+        )
+    
+    def _refill(self):
+        """Top the pool back up to `size` ready workers (one refill thread at a time)"""
+        with self._lock:
+            if self._refilling:
+                return
+            self._refilling = True
+        try:
+            self._refill_loop()
+        finally:
+            with self._lock:
+                self._refilling = False
+    
+    def _refill_loop(self):
+        while True:
+            with self._lock:
+                # Drop workers that died while idle
+                alive = [w for w in self._ready if w.poll() is None]
+                self._ready = deque(alive)
+                if self._closed or len(self._ready) >= self.size:
+                    return
+            try:
+                worker = self._spawn()
+            except OSError as e:
+                log.error("Error starting Python worker: %s", e)
+                return
+            with self._lock:
+                if self._closed:
+                    self._kill(worker)
+                    return
+                self._ready.append(worker)
+    
+    def run(self, script, cwd=None, args=()):
+        """Run a script in a warm worker
+        Returns: the worker's Popen (raises OSError if no worker could be started)"""
+        worker = None
+        with self._lock:
+            while self._ready:
+                candidate = self._ready.popleft()
+                if candidate.poll() is None:
+                    worker = candidate
+                    break
+        
+        if worker is None:
+            worker = self._spawn()
+            self.cold_runs += 1
+        else:
+            self.warm_runs += 1
+        
+        job = {"script": os.path.abspath(script), "cwd": cwd or os.path.dirname(os.path.abspath(script)), "args": list(args)}
+        try:
+            worker.stdin.write(json.dumps(job) + "\n")
+            worker.stdin.flush()
+            worker.stdin.close()
+        except (OSError, ValueError) as e:
+            self._kill(worker)
+            raise OSError(f"Python worker unavailable: {e}")
+        
+        if not self._closed:
+            threading.Thread(target=self._refill, name="python-pool-refill", daemon=True).start()
+        return worker
+    
+    def _kill(self, worker):
+        try:
+            worker.kill()
+            worker.wait(timeout=2)
+        except Exception:
+            pass
+        for pipe in (worker.stdin, worker.stdout, worker.stderr):
+            try:
+                if pipe:
+                    pipe.close()
+            except Exception:
+                pass
+    
+    def shutdown(self):
+        """Stop idle workers (running jobs are left to the executor)"""
+        with self._lock:
+            self._closed = True
+            workers, self._ready = list(self._ready), deque()
+        for worker in workers:
+            self._kill(worker)
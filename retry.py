@@ -0,0 +1,127 @@
+"""
+Retry Policies
+Per-task retries with exponential backoff and jitter, and a circuit breaker
+"""
+
+import random
+import threading
+from collections import namedtuple
+
+
+# Run outcomes
+OUTCOME_SUCCESS = "success"      # Exit code 0
+OUTCOME_RETRY = "retry"          # Failed with a retryable exit code - try again after a delay
+OUTCOME_FAILED = "failed"        # Failed for good (permanent exit code or retries used up)
+OUTCOME_CANCELLED = "cancelled"  # Killed by the scheduler or the user - not counted as a failure
+OUTCOME_TRIPPED = "tripped"      # Failed `circuit_breaker` times in a row - pause the task
+
+DEFAULT_RETRY_DELAY = 10.0       # Seconds before the first retry
+DEFAULT_RETRY_DELAY_MAX = 600.0  # Cap on the backoff
+DEFAULT_RETRY_JITTER = 0.2       # Random fraction taken off each delay
+
+RetryDecision = namedtuple("RetryDecision", "outcome attempt delay failures")
+
+
+def _number(task, key, default, cast=float, minimum=0):
+    try:
+        return max(minimum, cast(task.get(key, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class RetryPolicy:
+    """A task's retry settings (see Advanced Task Options in the README)"""
+    
+    __slots__ = ("max_retries", "delay_base", "delay_max", "jitter", "exit_codes", "breaker")
+    
+    def __init__(self, max_retries=0, delay_base=DEFAULT_RETRY_DELAY, delay_max=DEFAULT_RETRY_DELAY_MAX,
+                 jitter=DEFAULT_RETRY_JITTER, exit_codes=None, breaker=0):
+        self.max_retries = max_retries
+        self.delay_base = delay_base
+        self.delay_max = delay_max
+        self.jitter = min(1.0, jitter)
+        self.exit_codes = exit_codes  # None = every non-zero exit code is retryable
+        self.breaker = breaker        # 0 = circuit breaker off
+    
+    @classmethod
+    def from_task(cls, task):
+        exit_codes = task.get("retry_exit_codes")
+        if exit_codes is not None:
+            try:
+                exit_codes = frozenset(int(code) for code in exit_codes)
+            except (TypeError, ValueError):
+                exit_codes = None
+        return cls(
+            max_retries=_number(task, "max_retries", 0, int),
+            delay_base=_number(task, "retry_delay", DEFAULT_RETRY_DELAY),
+            delay_max=_number(task, "retry_delay_max", DEFAULT_RETRY_DELAY_MAX),
+            jitter=_number(task, "retry_jitter", DEFAULT_RETRY_JITTER),
+            exit_codes=exit_codes,
+            breaker=_number(task, "circuit_breaker", 0, int)
+        )
+    
+    def is_retryable(self, returncode, transient=False):
+        """Classify a failed run
+        Timeouts and cluster runs lost with their worker are transient (a hung share, a stuck
+        server, a dropped connection); a run that could not be launched (returncode None) is
+        permanent - the path is wrong."""
+        if transient:
+            return True
+        if returncode is None:
+            return False
+        return self.exit_codes is None or returncode in self.exit_codes
+    
+    def delay(self, attempt, rng=random):
+        """Backoff before retry number `attempt` (1-based): doubles each time, capped, minus jitter"""
+        delay = min(self.delay_max, self.delay_base * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * rng.random())
+
+
+class RetryTracker:
+    """Counts attempts and consecutive failures per task and decides what happens after a run"""
+    
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self._attempts = {}  # {task_id: retries used in the current failure streak}
+        self._failures = {}  # {task_id: consecutive failed runs}
+        self._lock = threading.Lock()
+    
+    def record(self, task, returncode, kill_reason=None):
+        """Record a finished run - kill_reason is set when the scheduler stopped it ("cancelled", "timeout", ...)
+        or lost it ("lost" - a cluster run that no worker finished)
+        Returns: RetryDecision(outcome, attempt, delay in seconds, consecutive failures)"""
+        policy = RetryPolicy.from_task(task)
+        task_id = task["id"]
+        with self._lock:
+            if kill_reason == "cancelled":
+                self._attempts.pop(task_id, None)
+                return RetryDecision(OUTCOME_CANCELLED, 0, 0.0, self._failures.get(task_id, 0))
+            
+            if returncode == 0:
+                self._attempts.pop(task_id, None)
+                self._failures.pop(task_id, None)
+                return RetryDecision(OUTCOME_SUCCESS, 0, 0.0, 0)
+            
+            failures = self._failures[task_id] = self._failures.get(task_id, 0) + 1
+            if policy.breaker and failures >= policy.breaker:
+                self._attempts.pop(task_id, None)
+                return RetryDecision(OUTCOME_TRIPPED, 0, 0.0, failures)
+            
+            attempt = self._attempts.get(task_id, 0)
+            transient = kill_reason in ("timeout", "idle_timeout", "lost")
+            if attempt < policy.max_retries and policy.is_retryable(returncode, transient):
+                attempt = self._attempts[task_id] = attempt + 1
+                return RetryDecision(OUTCOME_RETRY, attempt, policy.delay(attempt, self.rng), failures)
+            
+            self._attempts.pop(task_id, None)
+            return RetryDecision(OUTCOME_FAILED, attempt, 0.0, failures)
+    
+    def reset(self, task_id):
+        """Forget a task's failure streak (e.g. when it is re-enabled after the breaker tripped)"""
+        with self._lock:
+            self._attempts.pop(task_id, None)
+            self._failures.pop(task_id, None)
+    
+    def failures(self, task_id):
+        with self._lock:
+            return self._failures.get(task_id, 0)
@@ -0,0 +1,78 @@
+"""
+Run History
+One JSON line per finished run - outcome, exit code, duration and why it ended
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from app_logging import get_logger
+
+log = get_logger("run_history")
+
+# Outcomes recorded per run
+RUN_SUCCESS = "success"
+RUN_FAILED = "failed"
+RUN_TIMEOUT = "timeout"
+RUN_CANCELLED = "cancelled"
+RUN_LAUNCH_FAILED = "launch_failed"
+
+HISTORY_PER_TASK = 50
+
+
+def classify_run(returncode, kill_reason=None):
+    """Outcome of a finished run from its exit code and why the scheduler killed it (if it did)"""
+    if kill_reason in ("timeout", "idle_timeout"):
+        return RUN_TIMEOUT
+    if kill_reason == "cancelled":
+        return RUN_CANCELLED
+    if returncode is None:
+        return RUN_LAUNCH_FAILED
+    return RUN_SUCCESS if returncode == 0 else RUN_FAILED
+
+
+class RunHistory:
+    """Appends finished runs to a JSON-lines file and keeps the latest per task in memory"""
+    
+    def __init__(self, filename=None, per_task=HISTORY_PER_TASK):
+        self.filename = filename
+        self.per_task = per_task
+        self._recent = {}  # {task_id: deque of records}
+        self._lock = threading.Lock()
+    
+    def record(self, task_id, task_name, started, returncode, kill_reason=None, source=None, stderr_lines=None):
+        """Record a finished run (started is a datetime or None if it never launched)
+        stderr_lines is the number of lines the run wrote to stderr (None if output was not captured)
+        Returns: the record"""
+        finished = datetime.now()
+        entry = {
+            "task_id": task_id,
+            "task": task_name,
+            "started": started.strftime('%Y-%m-%d %H:%M:%S') if started else None,
+            "finished": finished.strftime('%Y-%m-%d %H:%M:%S'),
+            "duration": round((finished - started).total_seconds(), 3) if started else 0.0,
+            "exit_code": returncode,
+            "outcome": classify_run(returncode, kill_reason),
+            "reason": kill_reason,
+            "source": source,
+            "stderr_lines": stderr_lines,
+        }
+        with self._lock:
+            self._recent.setdefault(task_id, deque(maxlen=self.per_task)).append(entry)
+            if self.filename:
+                try:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+                    with open(self.filename, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    log.warning("Error writing run history: %s", e)
+        return entry
+    
+    def recent(self, task_id, limit=None):
+        """Latest runs of a task, oldest first"""
+        with self._lock:
+            entries = list(self._recent.get(task_id, ()))
+        return entries[-limit:] if limit else entries
@@ -0,0 +1,111 @@
+"""
+Scheduling Helpers
+Misfire policies and next-run bookkeeping for interval tasks
+"""
+
+from datetime import datetime, timedelta
+
+
+# Timestamp format used for persisted times in tasks.json (same as last_run)
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Misfire policies - what happens to runs missed while paused, closed or overloaded
+MISFIRE_ONCE = "once"        # Run a single catch-up run, then continue on cadence (default)
+MISFIRE_CATCHUP = "catchup"  # Run every missed run back-to-back, up to max_catchup
+MISFIRE_DROP = "drop"        # Forget missed runs, continue on cadence
+MISFIRE_POLICIES = (MISFIRE_ONCE, MISFIRE_CATCHUP, MISFIRE_DROP)
+
+DEFAULT_MAX_CATCHUP = 3
+
+# Trigger types - how a task is started
+TRIGGER_INTERVAL = "interval"  # Every `interval` minutes (default)
+TRIGGER_FILE = "file"          # When matching files appear in `watch_dir`
+
+
+def format_time(value):
+    """Format a datetime for tasks.json (drops timezone info)"""
+    if value is None:
+        return None
+    return value.strftime(TIME_FORMAT)
+
+
+def parse_time(value):
+    """Parse a persisted timestamp, returns None if missing or invalid"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_trigger_type(task):
+    """Get a task's trigger type (falls back to interval for unknown values)"""
+    trigger = task.get("trigger", TRIGGER_INTERVAL)
+    return trigger if trigger in (TRIGGER_INTERVAL, TRIGGER_FILE) else TRIGGER_INTERVAL
+
+
+def get_misfire_policy(task):
+    """Get a task's misfire policy (falls back to the default for unknown values)"""
+    policy = task.get("misfire_policy", MISFIRE_ONCE)
+    return policy if policy in MISFIRE_POLICIES else MISFIRE_ONCE
+
+
+def get_max_catchup(task):
+    """Get the cap on catch-up runs for the catchup policy"""
+    try:
+        return max(1, int(task.get("max_catchup", DEFAULT_MAX_CATCHUP)))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_CATCHUP
+
+
+def plan_resume(task, now=None):
+    """Work out how a task resumes from its persisted next_run time
+    
+    Returns: (start_date, missed) - start_date anchors the interval trigger on the
+    original cadence (None if nothing was persisted), missed is the number of runs
+    that were due between next_run and now
+    """
+    now = now or datetime.now()
+    next_run = parse_time(task.get("next_run"))
+    if next_run is None:
+        return None, 0
+    
+    if next_run > now:
+        return next_run, 0
+    
+    interval = timedelta(minutes=task["interval"])
+    missed = int((now - next_run) / interval) + 1
+    return next_run, missed
+
+
+def catchup_runs(task, missed):
+    """Number of runs to start now for `missed` runs under the task's misfire policy"""
+    if missed <= 0:
+        return 0
+    
+    policy = get_misfire_policy(task)
+    if policy == MISFIRE_DROP:
+        return 0
+    if policy == MISFIRE_CATCHUP:
+        return min(missed, get_max_catchup(task))
+    return 1
+
+
+def job_misfire_options(task):
+    """APScheduler job options matching the task's misfire policy
+    
+    Covers runs that fire late because the scheduler's worker threads were busy.
+    """
+    policy = get_misfire_policy(task)
+    interval_seconds = task["interval"] * 60
+    
+    if policy == MISFIRE_DROP:
+        # Late by more than a few seconds - skip it
+        return {"coalesce": True, "misfire_grace_time": 5}
+    if policy == MISFIRE_CATCHUP:
+        # Run each late run, but not ones older than the catch-up window
+        return {"coalesce": False, "misfire_grace_time": interval_seconds * get_max_catchup(task)}
+    # Collapse any number of late runs into one
+    return {"coalesce": True, "misfire_grace_time": max(interval_seconds, 5)}
+
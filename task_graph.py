@@ -0,0 +1,389 @@
+"""
+Task Graph
+Dependency (DAG) execution for tasks that declare upstream tasks
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+
+from app_logging import get_logger
+
+log = get_logger("task_graph")
+
+
+# Node states within a DAG run
+NODE_PENDING = "pending"
+NODE_RUNNING = "running"
+NODE_SUCCESS = "success"
+NODE_FAILED = "failed"
+NODE_SKIPPED = "skipped"  # Upstream failed or the task could not be started
+
+
+class DependencyCycleError(ValueError):
+    """Raised when task dependencies form a cycle"""
+    
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("Dependency cycle: " + " -> ".join(str(t) for t in cycle))
+
+
+def get_dependencies(task):
+    """Get the upstream task ids declared by a task (`depends_on` in tasks.json)"""
+    deps = task.get("depends_on") or []
+    if not isinstance(deps, (list, tuple)):
+        deps = [deps]
+    
+    result = []
+    for dep in deps:
+        try:
+            result.append(int(dep))
+        except (TypeError, ValueError):
+            pass
+    return result
+
+
+class TaskGraph:
+    """Dependency graph built from the task list
+    
+    Unknown ids and self-references are ignored. If the dependencies contain a
+    cycle, it is recorded in `cycle` and the upstream edges of the nodes on it are
+    dropped so the rest of the graph keeps working.
+    """
+    
+    def __init__(self, tasks):
+        ids = {task["id"] for task in tasks}
+        self.upstream = {
+            task["id"]: [d for d in dict.fromkeys(get_dependencies(task)) if d in ids and d != task["id"]]
+            for task in tasks
+        }
+        
+        self.cycle = self.find_cycle()
+        if self.cycle:
+            for task_id in set(self.cycle):
+                self.upstream[task_id] = []
+        
+        self.downstream = {task_id: [] for task_id in ids}
+        for task_id, deps in self.upstream.items():
+            for dep in deps:
+                self.downstream[dep].append(task_id)
+    
+    def find_cycle(self):
+        """Return the ids on a dependency cycle (first node repeated at the end), or None"""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = {task_id: WHITE for task_id in self.upstream}
+        
+        for start in self.upstream:
+            if color[start] != WHITE:
+                continue
+            
+            # Iterative DFS - path holds the current chain of (node, upstream iterator)
+            path = [(start, iter(self.upstream[start]))]
+            color[start] = GREY
+            while path:
+                node, deps = path[-1]
+                dep = next(deps, None)
+                if dep is None:
+                    color[node] = BLACK
+                    path.pop()
+                elif color[dep] == GREY:
+                    chain = [n for n, _ in path]
+                    return chain[chain.index(dep):] + [dep]
+                elif color[dep] == WHITE:
+                    color[dep] = GREY
+                    path.append((dep, iter(self.upstream[dep])))
+        return None
+    
+    def validate(self):
+        """Raise DependencyCycleError if the declared dependencies contain a cycle"""
+        if self.cycle:
+            raise DependencyCycleError(self.cycle)
+    
+    def has_dependencies(self, task_id):
+        """True if the task waits for upstream tasks"""
+        return bool(self.upstream.get(task_id))
+    
+    def has_dependents(self, task_id):
+        """True if other tasks wait for this task"""
+        return bool(self.downstream.get(task_id))
+    
+    def descendants(self, task_id):
+        """All tasks reachable downstream of a task"""
+        seen = set()
+        queue = deque(self.downstream.get(task_id, []))
+        while queue:
+            node = queue.popleft()
+            if node not in seen:
+                seen.add(node)
+                queue.extend(self.downstream.get(node, []))
+        return seen
+    
+    def topological_order(self):
+        """Task ids ordered so every task comes after its upstream tasks"""
+        indegree = {task_id: len(deps) for task_id, deps in self.upstream.items()}
+        queue = deque(task_id for task_id, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for child in self.downstream.get(node, []):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        return order
+
+
+class DagRun:
+    """One execution of a task and everything downstream of it"""
+    
+    def __init__(self, run_id, root_id, members, graph):
+        self.run_id = run_id
+        self.root_id = root_id
+        self.graph = graph
+        self.state = {task_id: NODE_PENDING for task_id in members}
+        self.started = {}  # {task_id: time.time()}
+        self.finished = {}
+        self.created = time.time()
+    
+    def member_upstream(self, task_id):
+        """Upstream tasks of a node that are part of this run"""
+        return [dep for dep in self.graph.upstream.get(task_id, []) if dep in self.state]
+    
+    def mark_running(self, task_id):
+        self.state[task_id] = NODE_RUNNING
+        self.started[task_id] = time.time()
+    
+    def mark_finished(self, task_id, success):
+        self.state[task_id] = NODE_SUCCESS if success else NODE_FAILED
+        self.finished[task_id] = time.time()
+    
+    def mark_skipped(self, task_id):
+        self.state[task_id] = NODE_SKIPPED
+        self.finished.setdefault(task_id, time.time())
+    
+    def propagate_failures(self):
+        """Skip pending nodes whose upstream failed or was skipped"""
+        changed = True
+        while changed:
+            changed = False
+            for task_id, state in self.state.items():
+                if state != NODE_PENDING:
+                    continue
+                if any(self.state[dep] in (NODE_FAILED, NODE_SKIPPED) for dep in self.member_upstream(task_id)):
+                    self.mark_skipped(task_id)
+                    changed = True
+    
+    def ready(self):
+        """Pending nodes whose upstream tasks in this run all succeeded"""
+        return [
+            task_id for task_id, state in self.state.items()
+            if state == NODE_PENDING
+            and all(self.state[dep] == NODE_SUCCESS for dep in self.member_upstream(task_id))
+        ]
+    
+    def running_count(self):
+        return sum(1 for state in self.state.values() if state == NODE_RUNNING)
+    
+    def is_done(self):
+        return all(state not in (NODE_PENDING, NODE_RUNNING) for state in self.state.values())
+    
+    def critical_path(self):
+        """Chain of tasks that determined the run's total duration
+        
+        Walks back from the last task to finish, always following the upstream task
+        that finished last (the one the node actually waited for).
+        """
+        if not self.finished:
+            return []
+        
+        node = max(self.finished, key=self.finished.get)
+        path = [node]
+        while True:
+            deps = [dep for dep in self.member_upstream(node) if dep in self.finished]
+            if not deps:
+                break
+            node = max(deps, key=self.finished.get)
+            path.append(node)
+        path.reverse()
+        return path
+    
+    def report(self, names=None):
+        """Human-readable timing report with the critical path"""
+        names = names or {}
+        end = max(self.finished.values()) if self.finished else time.time()
+        total = end - self.created
+        counts = {}
+        for state in self.state.values():
+            counts[state] = counts.get(state, 0) + 1
+        
+        lines = [
+            f"DAG run #{self.run_id} from '{names.get(self.root_id, self.root_id)}': "
+            f"{total:.1f}s total, " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items()))
+        ]
+        lines.append("Critical path:")
+        previous_end = self.created
+        for task_id in self.critical_path():
+            start = self.started.get(task_id, previous_end)
+            finish = self.finished[task_id]
+            lines.append(
+                f"  {names.get(task_id, task_id)}: {finish - start:.1f}s "
+                f"(waited {max(0.0, start - previous_end):.1f}s, {self.state[task_id]})"
+            )
+            previous_end = finish
+        return "\n".join(lines)
+
+
+class DagScheduler:
+    """Starts downstream tasks as soon as their upstream tasks finish successfully
+    
+    A DAG run opens when a task with dependents starts (by interval, manually or
+    from a trigger) and covers everything downstream of it. Upstream tasks outside
+    the run are treated as satisfied. Independent branches run in parallel, up to
+    max_parallel tasks launched by the DAG at once.
+    """
+    
+    def __init__(self, launch, max_parallel=4, on_report=None):
+        self.launch = launch  # callable(task_id) -> True if the task started
+        self.max_parallel = max(1, int(max_parallel))
+        self.on_report = on_report  # callable(report_text) when a run finishes
+        self.graph = TaskGraph([])
+        self.names = {}
+        self.runs = {}  # {run_id: DagRun}
+        self.node_runs = {}  # {task_id: run_id} for tasks in an active run
+        self.last_reports = {}  # {root_id: report text}
+        self._lock = threading.RLock()
+        self._run_ids = itertools.count(1)
+    
+    def set_tasks(self, tasks):
+        """Rebuild the graph after tasks were loaded, added, edited or deleted
+        Returns: the cycle that was found (list of ids) or None"""
+        with self._lock:
+            self.graph = TaskGraph(tasks)
+            self.names = {task["id"]: task["name"] for task in tasks}
+            return self.graph.cycle
+    
+    def has_dependencies(self, task_id):
+        with self._lock:
+            return self.graph.has_dependencies(task_id)
+    
+    def task_started(self, task_id):
+        """Called whenever a run of a task starts"""
+        with self._lock:
+            run_id = self.node_runs.get(task_id)
+            if run_id is not None:
+                run = self.runs[run_id]
+                if run.state[task_id] == NODE_PENDING:
+                    # Started by hand while waiting for upstream - count it
+                    run.mark_running(task_id)
+                return
+            
+            if not self.graph.has_dependents(task_id):
+                return
+            
+            # Open a new run; tasks already busy in another run stay with that run
+            members = {task_id} | {
+                node for node in self.graph.descendants(task_id) if node not in self.node_runs
+            }
+            if len(members) == 1:
+                return  # Everything downstream is busy in other runs
+            
+            run = DagRun(next(self._run_ids), task_id, members, self.graph)
+            run.mark_running(task_id)
+            self.runs[run.run_id] = run
+            for node in members:
+                self.node_runs[node] = run.run_id
+    
+    def task_finished(self, task_id, success):
+        """Called when a run of a task completes - starts whatever became ready"""
+        with self._lock:
+            run_id = self.node_runs.get(task_id)
+            run = self.runs.get(run_id)
+            if run is None or run.state.get(task_id) != NODE_RUNNING:
+                return
+            run.mark_finished(task_id, success)
+            to_launch, report = self._advance(run)
+        
+        self._publish(report)
+        self._launch_all(run, to_launch)
+    
+    def _advance(self, run):
+        """Pick the next nodes to launch and close the run if it is done (lock held)
+        Returns: (task ids to launch, timing report of the closed run or None) - publish it after the lock"""
+        run.propagate_failures()
+        
+        budget = self.max_parallel - self._running_total()
+        to_launch = []
+        for task_id in run.ready():
+            if budget <= 0:
+                break
+            run.mark_running(task_id)
+            to_launch.append(task_id)
+            budget -= 1
+        
+        report = None
+        if not to_launch and run.is_done():
+            report = self._close(run)
+        return to_launch, report
+    
+    def _running_total(self):
+        return sum(run.running_count() for run in self.runs.values())
+    
+    def _launch_all(self, run, task_ids):
+        """Launch nodes outside the lock; nodes that cannot start are skipped"""
+        for task_id in task_ids:
+            started = False
+            try:
+                started = self.launch(task_id)
+            except Exception:
+                log.exception("Error launching dependent task %s", task_id)
+                started = False
+            
+            if not started:
+                log.info("[DAG] Task %s could not start - skipping it and its dependents", task_id)
+                with self._lock:
+                    run.mark_skipped(task_id)
+                    more, report = self._advance(run)
+                self._publish(report)
+                self._launch_all(run, more)
+        
+        # Capacity freed up - other runs may have nodes waiting for a slot
+        self._drain_waiting(exclude=run.run_id)
+    
+    def _drain_waiting(self, exclude=None):
+        """Give free concurrency slots to runs that have ready nodes"""
+        with self._lock:
+            pending = []
+            for run in list(self.runs.values()):
+                if run.run_id != exclude and run.ready():
+                    pending.append((run, *self._advance(run)))
+        for run, task_ids, report in pending:
+            self._publish(report)
+            if task_ids:
+                self._launch_all(run, task_ids)
+    
+    def _close(self, run):
+        """Finish a run and build its timing report (lock held)
+        Returns: the report"""
+        self.runs.pop(run.run_id, None)
+        for task_id in run.state:
+            if self.node_runs.get(task_id) == run.run_id:
+                del self.node_runs[task_id]
+        
+        report = run.report(self.names)
+        self.last_reports[run.root_id] = report
+        return report
+    
+    def _publish(self, report):
+        """Hand a closed run's report to on_report - outside the lock, like launches"""
+        if report is None or not self.on_report:
+            return
+        try:
+            self.on_report(report)
+        except Exception:
+            log.exception("Error publishing DAG report")
+    
+    def snapshot(self):
+        """Current state of every active run: {run_id: {task_id: state}}"""
+        with self._lock:
+            return {run_id: dict(run.state) for run_id, run in self.runs.items()}
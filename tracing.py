@@ -0,0 +1,236 @@
+"""
+Launch Tracing
+Span timing from trigger fire to process start and first output byte
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from app_logging import get_logger
+
+log = get_logger("tracing")
+
+# Launch stages in order - each span runs from the previous checkpoint to this one
+STAGE_TRIGGER = "trigger"            # Scheduled fire time -> run_task entered
+STAGE_ADMISSION = "admission"        # Overlap policy + slot reservation
+STAGE_METADATA = "metadata"          # PE header detection (console vs GUI)
+STAGE_UI = "ui"                      # Log panel + status update
+STAGE_SPAWN = "spawn"                # Thread handoff + validation + Popen
+STAGE_FIRST_OUTPUT = "first_output"  # Process started -> first output line
+STAGES = (STAGE_TRIGGER, STAGE_ADMISSION, STAGE_METADATA, STAGE_UI, STAGE_SPAWN, STAGE_FIRST_OUTPUT)
+
+
+class LaunchTrace:
+    """Checkpoints for one launch, from the trigger until first output"""
+    
+    __slots__ = ("trace_id", "task_id", "task_name", "source", "origin", "wall_start",
+                 "checkpoints", "status", "finished", "_tracer")
+    
+    def __init__(self, tracer, trace_id, task_id, task_name, source, lateness=0.0):
+        now = time.perf_counter()
+        self._tracer = tracer
+        self.trace_id = trace_id
+        self.task_id = task_id
+        self.task_name = task_name
+        self.source = source
+        # The trigger span reaches back to when the job was due
+        self.origin = now - max(0.0, lateness)
+        self.wall_start = time.time() - max(0.0, lateness)
+        self.checkpoints = [(STAGE_TRIGGER, now)]
+        self.status = "ok"
+        self.finished = False
+    
+    def mark(self, stage):
+        """Close the span ending at this checkpoint (first call per stage wins)"""
+        at = time.perf_counter()
+        with self._tracer._lock:
+            if self.finished or any(name == stage for name, _ in self.checkpoints):
+                return
+            self.checkpoints.append((stage, at))
+    
+    def finish(self, status=None):
+        """Complete the trace and hand it to the tracer (only the first call counts)"""
+        with self._tracer._lock:
+            if self.finished:
+                return
+            self.finished = True
+            if status:
+                self.status = status
+        self._tracer._finish(self)
+    
+    def spans(self):
+        """List of (stage, start offset, duration) in seconds relative to the trigger"""
+        result = []
+        previous = self.origin
+        for stage, at in self.checkpoints:
+            result.append((stage, previous - self.origin, at - previous))
+            previous = at
+        return result
+    
+    def total(self):
+        return self.checkpoints[-1][1] - self.origin
+
+
+class _NullTrace:
+    """Stand-in when tracing is disabled - every call is a no-op"""
+    
+    finished = True
+    
+    def mark(self, stage):
+        pass
+    
+    def finish(self, status=None):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class LaunchTracer:
+    """Collects launch traces, keeps per-task stage breakdowns and exports a trace file
+    
+    The trace file uses the Chrome trace event format (open it in Perfetto or
+    chrome://tracing). Events are written by a background thread so finishing a
+    trace never blocks on disk.
+    """
+    
+    def __init__(self, trace_file=None, enabled=True, history=200, on_finish=None):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.on_finish = on_finish  # callable(trace), e.g. feed metrics
+        self.recent = deque(maxlen=history)
+        self._durations = {}  # {task_id: {stage: deque of seconds}}
+        self._names = {}
+        self._history = history
+        self._lock = threading.Lock()
+        self._ids = 0
+        self._queue = None
+        self._writer = None
+    
+    def start(self, task_id, task_name, source, lateness=0.0):
+        """Begin a trace at run_task entry
+        Returns: LaunchTrace, or NULL_TRACE when tracing is disabled"""
+        if not self.enabled:
+            return NULL_TRACE
+        with self._lock:
+            self._ids += 1
+            trace_id = self._ids
+        return LaunchTrace(self, trace_id, task_id, task_name, source, lateness)
+    
+    def _finish(self, trace):
+        spans = trace.spans()
+        with self._lock:
+            self.recent.append(trace)
+            self._names[trace.task_id] = trace.task_name
+            stages = self._durations.setdefault(trace.task_id, {})
+            for stage, _, duration in spans:
+                stages.setdefault(stage, deque(maxlen=self._history)).append(duration)
+        
+        if self.on_finish:
+            try:
+                self.on_finish(trace)
+            except Exception:
+                log.exception("Error in trace callback")
+        
+        if self.trace_file:
+            self._write(trace, spans)
+    
+    def breakdown(self, task_id=None):
+        """Per-task latency breakdown
+        Returns: {task_id: {stage: {"count", "mean_ms", "p95_ms", "max_ms"}}}"""
+        with self._lock:
+            items = {
+                tid: {stage: list(values) for stage, values in stages.items()}
+                for tid, stages in self._durations.items()
+                if task_id is None or tid == task_id
+            }
+        
+        result = {}
+        for tid, stages in items.items():
+            result[tid] = {}
+            for stage in STAGES:
+                values = sorted(stages.get(stage, ()))
+                if not values:
+                    continue
+                result[tid][stage] = {
+                    "count": len(values),
+                    "mean_ms": round(sum(values) / len(values) * 1000, 3),
+                    "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 3),
+                    "max_ms": round(values[-1] * 1000, 3),
+                }
+        return result
+    
+    def summary_text(self):
+        """Human-readable breakdown for the log"""
+        lines = []
+        for task_id, stages in sorted(self.breakdown().items()):
+            parts = [f"{stage} {s['mean_ms']:.1f}/{s['p95_ms']:.1f}ms" for stage, s in stages.items()]
+            lines.append(f"{self._names.get(task_id, task_id)} (mean/p95): " + ", ".join(parts))
+        return "\n".join(lines)
+    
+    def _write(self, trace, spans):
+        """Queue the trace's events for the writer thread"""
+        with self._lock:
+            if self._writer is None:
+                self._queue = queue.SimpleQueue()
+                self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                self._writer.start()
+        self._queue.put((trace, spans))
+    
+    def _write_loop(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.trace_file)), exist_ok=True)
+            # JSON array format - the closing bracket is optional, so events can be appended
+            new_file = not os.path.exists(self.trace_file) or os.path.getsize(self.trace_file) == 0
+            with open(self.trace_file, "a", encoding="utf-8") as f:
+                if new_file:
+                    f.write("[\n")
+                while True:
+                    item = self._queue.get()
+                    if item is None:
+                        break
+                    for event in self._events(*item):
+                        f.write(json.dumps(event) + ",\n")
+                    if self._queue.empty():
+                        f.flush()
+        except OSError as e:
+            log.warning("Error writing trace file %s: %s", self.trace_file, e)
+    
+    def _events(self, trace, spans):
+        """Chrome trace events: one complete event per stage plus one for the launch"""
+        base_us = trace.wall_start * 1e6
+        args = {"trace_id": trace.trace_id, "source": trace.source, "status": trace.status}
+        events = [{
+            "name": f"launch {trace.task_name}", "cat": "launch", "ph": "X",
+            "ts": round(base_us), "dur": round(trace.total() * 1e6),
+            "pid": 1, "tid": trace.task_id, "args": args,
+        }]
+        for stage, offset, duration in spans:
+            events.append({
+                "name": stage, "cat": "stage", "ph": "X",
+                "ts": round(base_us + offset * 1e6), "dur": round(duration * 1e6),
+                "pid": 1, "tid": trace.task_id, "args": {"trace_id": trace.trace_id},
+            })
+        return events
+    
+    def export(self, path):
+        """Write the recent traces to a standalone trace file"""
+        with self._lock:
+            traces = list(self.recent)
+        events = []
+        for trace in traces:
+            events.extend(self._events(trace, trace.spans()))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(traces)
+    
+    def close(self):
+        """Flush and stop the writer thread"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=2)
+            self._writer = None